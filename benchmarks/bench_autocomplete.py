@@ -0,0 +1,62 @@
+"""
+Автодополнение GET /api/v1/autocomplete на каталоге из 100 menu x 100 submenu x 100 dish (1M dish).
+
+Названия собираются из словаря utils.WORDS, поэтому префиксы различаются кол-вом совпадений:
+- rare/common - начало редкого и частого слова;
+- typo - слово с опечаткой (только нечёткое совпадение word_similarity);
+- short - префикс из 2 символов.
+
+Каждый префикс замеряется без кэша (cold, LRU сбрасывается перед запросом) и из in-process LRU (warm).
+Перед замерами выводится план запроса, чтобы убедиться, что используются триграммные индексы по title.
+
+Запуск: python benchmarks/bench_autocomplete.py
+"""
+import asyncio
+
+from sqlalchemy import select, text, union_all
+from sqlalchemy.dialects import postgresql
+
+from src.autocomplete.services import _suggestions, suggestions_cache
+from src.dish.models import dish as dish_tbl
+from src.submenu.models import submenu as submenu_tbl
+from utils import bench_client, engine_bench, measure, report, seed_vocabulary_catalog
+
+MENUS = 100
+SUBMENUS_PER_MENU = 100
+DISHES_PER_SUBMENU = 100
+LIMIT = 10
+REPEAT = 20
+
+PREFIXES = {
+	'rare': 'yuz',
+	'common': 'sauc',
+	'typo': 'mushrom',
+	'short': 'tr',
+}
+
+
+async def main():
+	async with bench_client() as ac:
+		await seed_vocabulary_catalog(MENUS, SUBMENUS_PER_MENU, DISHES_PER_SUBMENU)
+		async with engine_bench.connect() as connection:
+			for name, prefix in PREFIXES.items():
+				hits = union_all(_suggestions(submenu_tbl, 'submenu', prefix, LIMIT),
+								 _suggestions(dish_tbl, 'dish', prefix, LIMIT)).subquery('hits')
+				query = select(hits).compile(dialect=postgresql.dialect(), compile_kwargs={'literal_binds': True})
+				plan = (await connection.execute(text(f'EXPLAIN ANALYZE {query}'))).scalars().all()
+				print(f'--- {name}: {prefix}\n' + '\n'.join(plan))
+
+		for name, prefix in PREFIXES.items():
+			async def cold():
+				await suggestions_cache.clear()
+				await ac.get('/api/v1/autocomplete', params={'prefix': prefix, 'limit': LIMIT})
+
+			async def warm():
+				await ac.get('/api/v1/autocomplete', params={'prefix': prefix, 'limit': LIMIT})
+
+			report(f'autocomplete {name} cold', await measure(cold, REPEAT))
+			report(f'autocomplete {name} warm', await measure(warm, REPEAT))
+
+
+if __name__ == '__main__':
+	asyncio.run(main())
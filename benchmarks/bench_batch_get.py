@@ -0,0 +1,62 @@
+"""
+Получение dish заказа по id: N запросов GET .../dishes/{dish_id} против одного GET /api/v1/dishes:batchGet.
+
+Для каждого размера заказа кэш сбрасывается перед замером, выводится время и кол-во выполненных SQL-выражений.
+
+Запуск: python benchmarks/bench_batch_get.py
+"""
+import asyncio
+
+from sqlalchemy import event, select
+
+from src.cache import services as cache_services
+from src.dish.models import dish as dish_tbl
+from src.submenu.models import submenu as submenu_tbl
+from utils import bench_client, engine_bench, measure, report, seed_catalog
+
+MENUS = 10
+SUBMENUS_PER_MENU = 10
+DISHES_PER_SUBMENU = 100
+ORDER_SIZES = (1, 10, 30, 100)
+REPEAT = 50
+
+statements = 0
+
+
+def count_statement(*args):
+	global statements
+	statements += 1
+
+
+async def main():
+	event.listen(engine_bench.sync_engine, 'before_cursor_execute', count_statement)
+	async with bench_client() as ac:
+		await seed_catalog(MENUS, SUBMENUS_PER_MENU, DISHES_PER_SUBMENU)
+		async with engine_bench.connect() as connection:
+			rows = (await connection.execute(
+				select(dish_tbl.c.id, dish_tbl.c.submenu_id, submenu_tbl.c.menu_id)
+				.join(submenu_tbl, submenu_tbl.c.id == dish_tbl.c.submenu_id)
+				.limit(max(ORDER_SIZES))
+			)).fetchall()
+
+		for size in ORDER_SIZES:
+			order = rows[:size]
+
+			async def one_by_one():
+				await cache_services.cache_backend.clear()
+				for row in order:
+					await ac.get(f'/api/v1/menus/{row.menu_id}/submenus/{row.submenu_id}/dishes/{row.id}')
+
+			async def batch():
+				await cache_services.cache_backend.clear()
+				await ac.get('/api/v1/dishes:batchGet', params={'ids': [str(row.id) for row in order]})
+
+			for name, func in (('one by one', one_by_one), ('batchGet', batch)):
+				global statements
+				statements = 0
+				result = await measure(func, REPEAT)
+				report(f'{name} x{size}', dict(result, statements=statements / REPEAT))
+
+
+if __name__ == '__main__':
+	asyncio.run(main())
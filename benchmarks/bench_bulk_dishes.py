@@ -0,0 +1,38 @@
+"""
+Сравнение создания dish по одному (POST .../dishes) и пачкой (POST .../dishes/bulk).
+
+Запуск: python benchmarks/bench_bulk_dishes.py
+"""
+import asyncio
+
+from utils import bench_client, measure, report
+
+BATCH_SIZES = (100, 1000, 5000)
+
+
+async def main():
+	async with bench_client() as ac:
+		menu_id = (await ac.post('/api/v1/menus', json={"title": "bench", "description": "bench"})).json()["id"]
+		for batch_size in BATCH_SIZES:
+			dishes = [{"title": f"dish {i}", "description": "bench", "price": "10.5"} for i in range(batch_size)]
+			url = f"/api/v1/menus/{menu_id}/submenus"
+
+			submenu_id = (await ac.post(url, json={"title": "one", "description": "bench"})).json()["id"]
+
+			async def per_item():
+				for dish in dishes:
+					await ac.post(f"{url}/{submenu_id}/dishes", json=dish)
+
+			report(f"per-item x{batch_size}", await measure(per_item))
+
+			bulk_submenu_id = (await ac.post(url, json={"title": "bulk", "description": "bench"})).json()["id"]
+
+			async def bulk():
+				response = await ac.post(f"{url}/{bulk_submenu_id}/dishes/bulk", json=dishes)
+				assert len(response.json()) == batch_size
+
+			report(f"bulk x{batch_size}", await measure(bulk))
+
+
+if __name__ == '__main__':
+	asyncio.run(main())
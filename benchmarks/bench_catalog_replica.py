@@ -0,0 +1,68 @@
+"""
+Реплика каталога в памяти против чтения из БД на GET-запросах menu и страницы dish.
+
+Для каталога каждого размера выводится время загрузки реплики, память, оставшаяся занятой после неё
+(tracemalloc: индексы и соединение с LISTEN), и median/p99 запросов в трёх режимах: БД без кэша (кэш сбрасывается
+перед каждым запросом), БД с кэшем и реплика в памяти.
+
+Запуск: python benchmarks/bench_catalog_replica.py
+"""
+import asyncio
+import tracemalloc
+
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from src.cache import services as cache_services
+from src.catalog.services import CatalogReplica, get_catalog_replica
+from src.database import get_async_session, get_read_session
+from src.events.services import EventBroadcaster
+from src.main import create_app
+from src.submenu.models import submenu as submenu_tbl
+from utils import BENCH_DATABASE_URL, async_session_maker_bench, bench_client, engine_bench, measure, \
+	override_get_async_session, report, seed_catalog
+
+# (menu, submenu в menu, dish в submenu)
+SIZES = ((10, 10, 10), (10, 10, 100), (10, 10, 1000))
+REPEAT = 500
+
+
+async def main():
+	for size in SIZES:
+		async with bench_client() as ac:
+			await seed_catalog(*size)
+			async with engine_bench.connect() as connection:
+				submenu_id, menu_id = (await connection.execute(select(submenu_tbl.c.id, submenu_tbl.c.menu_id))).first()
+			urls = {'menu': f'/api/v1/menus/{menu_id}', 'dishes': f'/api/v1/menus/{menu_id}/submenus/{submenu_id}/dishes'}
+			name = 'x'.join(map(str, size))
+
+			for kind, url in urls.items():
+				async def cold():
+					await cache_services.cache_backend.clear()
+					await ac.get(url)
+
+				report(f'{name} db {kind}', await measure(cold, REPEAT))
+				report(f'{name} db+cache {kind}', await measure(lambda: ac.get(url), REPEAT))
+
+			replica = CatalogReplica(async_session_maker_bench, EventBroadcaster(BENCH_DATABASE_URL))
+			tracemalloc.start()
+			loaded = await measure(replica.start)
+			footprint, _ = tracemalloc.get_traced_memory()
+			tracemalloc.stop()
+			report(f'{name} replica load', dict(loaded, footprint_mb=footprint / 2 ** 20))
+
+			app = create_app(catalog_in_memory=True)
+			app.dependency_overrides[get_async_session] = override_get_async_session
+			app.dependency_overrides[get_read_session] = override_get_async_session
+			app.dependency_overrides[get_catalog_replica] = lambda: replica
+			try:
+				async with AsyncClient(app=app, base_url='http://localhost:8000') as replica_ac:
+					for kind, url in urls.items():
+						report(f'{name} replica {kind}', await measure(lambda: replica_ac.get(url), REPEAT))
+			finally:
+				await replica.close()
+				await replica.broadcaster.close()
+
+
+if __name__ == '__main__':
+	asyncio.run(main())
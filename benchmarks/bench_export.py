@@ -0,0 +1,60 @@
+"""
+Выгрузка каталога из 100 menu x 100 submenu x 100 dish (1M dish) в NDJSON:
+- list - все строки dish выбираются в список и сериализуются целиком (как списки dish в API);
+- stream - export_catalog: серверный курсор с порциями по EXPORT_FETCH_SIZE строк.
+
+Для каждого пути замеряется время до первой порции данных, общее время, объём и пик выделенной памяти (tracemalloc).
+Выгрузка вызывается напрямую, без HTTP: тестовый клиент httpx буферизует ответ целиком.
+
+Запуск: python benchmarks/bench_export.py
+"""
+import asyncio
+import time
+import tracemalloc
+from typing import AsyncIterator
+
+from sqlalchemy import select
+
+from src.dish.models import dish as dish_tbl
+from src.dish.services import dish_fields
+from src.export.services import export_catalog, gzip_stream
+from src.rendering import render_rows
+from utils import async_session_maker_bench, bench_client, report, seed_catalog
+
+MENUS = 100
+SUBMENUS_PER_MENU = 100
+DISHES_PER_SUBMENU = 100
+
+
+async def list_path() -> AsyncIterator[bytes]:
+	"""Путь через список: все dish в памяти, затем один JSON-массив."""
+	async with async_session_maker_bench() as session:
+		rows = (await session.execute(select(*dish_fields, dish_tbl.c.submenu_id))).fetchall()
+		yield render_rows(rows)
+
+
+async def consume(chunks: AsyncIterator[bytes]) -> dict[str, float]:
+	"""Функция, которая вычитывает поток и возвращает время до первой порции, общее время, объём и пик памяти."""
+	tracemalloc.start()
+	start = time.perf_counter()
+	first_ms, size = None, 0
+	async for chunk in chunks:
+		if first_ms is None:
+			first_ms = (time.perf_counter() - start) * 1000
+		size += len(chunk)
+	total_ms = (time.perf_counter() - start) * 1000
+	peak = tracemalloc.get_traced_memory()[1]
+	tracemalloc.stop()
+	return {'first_chunk_ms': first_ms, 'total_ms': total_ms, 'size_mb': size / 2 ** 20, 'peak_mb': peak / 2 ** 20}
+
+
+async def main():
+	async with bench_client():
+		await seed_catalog(MENUS, SUBMENUS_PER_MENU, DISHES_PER_SUBMENU)
+		report('export list', await consume(list_path()))
+		report('export stream', await consume(export_catalog(async_session_maker_bench)))
+		report('export stream gzip', await consume(gzip_stream(export_catalog(async_session_maker_bench))))
+
+
+if __name__ == '__main__':
+	asyncio.run(main())
@@ -0,0 +1,65 @@
+"""
+Импорт каталога из CSV на 100k строк (100 menu x 10 submenu x 100 dish) через POST /api/v1/import:
+- initial - в пустую БД (все строки добавляются);
+- unchanged - повторный импорт того же файла (изменений нет);
+- changed - в 10% dish изменена цена, 10% dish удалены и столько же добавлено.
+
+Для сравнения замеряется создание тех же 1k dish одного submenu отдельными POST-запросами.
+
+Запуск: python benchmarks/bench_import.py
+"""
+import asyncio
+import csv
+import io
+
+from src.importer.services import IMPORT_COLUMNS
+from utils import bench_client, measure, report
+
+MENUS = 100
+SUBMENUS_PER_MENU = 10
+DISHES_PER_SUBMENU = 100
+SINGLE_POSTS = 1000
+
+
+def make_csv(changed: bool = False) -> bytes:
+	"""Функция, которая формирует файл импорта, при changed - с изменёнными, удалёнными и новыми dish."""
+	buffer = io.StringIO()
+	writer = csv.writer(buffer)
+	writer.writerow(IMPORT_COLUMNS)
+	for m in range(MENUS):
+		for s in range(SUBMENUS_PER_MENU):
+			for d in range(DISHES_PER_SUBMENU):
+				title, price = f'dish {d}', f'{10 + d % 7}.50'
+				if changed and d % 10 == 0:
+					price = '99.99'
+				elif changed and d % 10 == 1:
+					title = f'new dish {d}'
+				writer.writerow((f'menu {m}', f'menu description {m}', f'submenu {s}', f'submenu description {s}',
+								 title, f'dish description {d}', price))
+	return buffer.getvalue().encode()
+
+
+async def main():
+	async with bench_client() as ac:
+		files = {'initial': make_csv(), 'unchanged': make_csv(), 'changed': make_csv(changed=True)}
+		for name, content in files.items():
+			async def post_import():
+				response = await ac.post('/api/v1/import', content=content, headers={'Content-Type': 'text/csv'})
+				print(name, response.json())
+
+			report(f'import {name}', await measure(post_import))
+
+		menu_id = (await ac.post('/api/v1/menus', json={'title': 'menu', 'description': 'menu'})).json()['id']
+		submenu_id = (await ac.post(f'/api/v1/menus/{menu_id}/submenus',
+									json={'title': 'submenu', 'description': 'submenu'})).json()['id']
+
+		async def single_posts():
+			for d in range(SINGLE_POSTS):
+				await ac.post(f'/api/v1/menus/{menu_id}/submenus/{submenu_id}/dishes',
+							  json={'title': f'dish {d}', 'description': 'dish', 'price': '10.50'})
+
+		report(f'{SINGLE_POSTS} single POST', await measure(single_posts))
+
+
+if __name__ == '__main__':
+	asyncio.run(main())
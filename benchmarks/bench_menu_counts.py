@@ -0,0 +1,44 @@
+"""
+Сравнение счётчиков menu из колонок submenus_count/dishes_count (/menus)
+и посчитанных по таблицам submenu и dish (/menus_orm) на каталоге из 10k меню.
+
+Кэш сбрасывается перед каждым запросом, чтобы замерялась именно БД.
+
+Запуск: python benchmarks/bench_menu_counts.py
+"""
+import asyncio
+
+from sqlalchemy import text
+
+from src.cache import services as cache_services
+from utils import bench_client, engine_bench, measure, report, seed_catalog
+
+MENUS = 10000
+SUBMENUS_PER_MENU = 3
+DISHES_PER_SUBMENU = 10
+REPEAT = 200
+
+
+async def main():
+	async with bench_client() as ac:
+		await seed_catalog(MENUS, SUBMENUS_PER_MENU, DISHES_PER_SUBMENU)
+		async with engine_bench.connect() as connection:
+			menu_ids = (await connection.execute(text(f'SELECT id FROM menu LIMIT {REPEAT}'))).scalars().all()
+
+		for prefix, name in (('/api/v1/menus', 'stored'), ('/api/v1/menus_orm', 'live')):
+			ids = iter(menu_ids * 2)
+
+			async def get_one():
+				await cache_services.cache_backend.clear()
+				await ac.get(f"{prefix}/{next(ids)}")
+
+			async def get_page():
+				await cache_services.cache_backend.clear()
+				await ac.get(prefix, params={"limit": 100})
+
+			report(f"{name} menu by id", await measure(get_one, REPEAT))
+			report(f"{name} page of 100 menus", await measure(get_page, REPEAT))
+
+
+if __name__ == '__main__':
+	asyncio.run(main())
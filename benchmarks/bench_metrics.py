@@ -0,0 +1,80 @@
+"""
+Накладные расходы PrometheusMiddleware на один запрос.
+
+Сравнивается одно и то же приложение (роуты API и роут /bench/{menu_id} без БД) с middleware и без неё,
+запросы выполняются напрямую через ASGI;
+разница медиан - стоимость поиска шаблона роута и записи метрик.
+
+Запуск: python benchmarks/bench_metrics.py
+"""
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from fastapi import FastAPI
+
+from src.dish.router import router as dish_router
+from src.menu.router import router as menu_router
+from src.metrics.middleware import PrometheusMiddleware
+from src.submenu.router import router as submenu_router
+
+REPEAT = 5000
+
+
+def build_app(with_metrics: bool) -> FastAPI:
+	"""Функция, которая создаёт приложение с роутами API и тестовым роутом без обращения к БД."""
+	app = FastAPI()
+	# Роуты API нужны, чтобы поиск шаблона роута проходил по реальному списку роутов.
+	app.include_router(menu_router)
+	app.include_router(submenu_router)
+	app.include_router(dish_router)
+
+	@app.get('/bench/{menu_id}')
+	async def bench(menu_id: uuid.UUID):
+		return {'id': menu_id}
+
+	if with_metrics:
+		app.add_middleware(PrometheusMiddleware)
+	return app
+
+
+async def call(app: FastAPI, method: str, path: str) -> None:
+	"""Функция, которая выполняет запрос напрямую через ASGI, без HTTP-клиента."""
+	scope = {'type': 'http', 'http_version': '1.1', 'method': method, 'scheme': 'http', 'path': path,
+			 'raw_path': path.encode(), 'root_path': '', 'query_string': b'', 'headers': [],
+			 'server': ('localhost', 8000), 'client': ('127.0.0.1', 1)}
+
+	async def receive():
+		return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+	async def send(message):
+		pass
+
+	await app(scope, receive, send)
+
+
+async def main():
+	apps = {False: build_app(False), True: build_app(True)}
+	timings = {False: [], True: []}
+	paths = [f'/bench/{uuid.uuid4()}' for _ in range(REPEAT)]
+	for path in paths:
+		# Приложения вызываются поочерёдно, чтобы шум (GC, частота CPU) распределялся между ними поровну.
+		for with_metrics, app in apps.items():
+			start = time.perf_counter()
+			await call(app, 'GET', path)
+			timings[with_metrics].append((time.perf_counter() - start) * 1_000_000)
+	for with_metrics, values in timings.items():
+		values.sort()
+		name = 'with metrics' if with_metrics else 'without metrics'
+		print(f"{name:<40} median_us={statistics.median(values):.1f} p99_us={values[int(len(values) * 0.99)]:.1f}")
+	overhead = statistics.median(timings[True]) - statistics.median(timings[False])
+	print(f"{'overhead per request':<40} median_us={overhead:.1f}")
+
+
+if __name__ == '__main__':
+	asyncio.run(main())
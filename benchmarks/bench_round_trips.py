@@ -0,0 +1,69 @@
+"""
+Кол-во SQL-запросов (round-trip'ов без BEGIN/COMMIT) на один запрос к write-роутерам.
+
+Колонка before - значения до перехода на data-modifying CTE (по коду предыдущей версии сервисов).
+
+Запуск: python benchmarks/bench_round_trips.py
+"""
+import asyncio
+
+from sqlalchemy import event
+
+from utils import bench_client, engine_bench, measure, report
+
+BEFORE = {
+	'create_new_menu': 1,
+	'create_new_submenu': 2,
+	'create_new_dish': 3,
+	'delete_dish': 3,
+	'delete_submenu_by_id': 4,
+	'delete_menu_by_id': 1,
+}
+REPEAT = 200
+
+statements = 0
+
+
+def count_statement(*args):
+	global statements
+	statements += 1
+
+
+async def main():
+	event.listen(engine_bench.sync_engine, 'before_cursor_execute', count_statement)
+	async with bench_client() as ac:
+		async def run(name, coro_factory):
+			global statements
+			statements = 0
+			responses = []
+
+			async def call():
+				responses.append(await coro_factory())
+
+			result = await measure(call, REPEAT)
+			result['before'] = BEFORE[name]
+			result['after'] = statements / REPEAT
+			report(name, result)
+			return responses
+
+		menus = await run('create_new_menu', lambda: ac.post('/api/v1/menus', json={"title": "m", "description": "d"}))
+		menu_id = menus[0].json()["id"]
+		url = f"/api/v1/menus/{menu_id}/submenus"
+
+		submenus = await run('create_new_submenu', lambda: ac.post(url, json={"title": "s", "description": "d"}))
+		submenu_url = f"{url}/{submenus[0].json()['id']}"
+
+		dishes = await run('create_new_dish', lambda: ac.post(
+			f"{submenu_url}/dishes", json={"title": "d", "description": "d", "price": "1"}))
+		dish_ids = iter(response.json()["id"] for response in dishes)
+		await run('delete_dish', lambda: ac.delete(f"{submenu_url}/dishes/{next(dish_ids)}"))
+
+		submenu_ids = iter(response.json()["id"] for response in submenus)
+		await run('delete_submenu_by_id', lambda: ac.delete(f"{url}/{next(submenu_ids)}"))
+
+		menu_ids = iter(response.json()["id"] for response in menus)
+		await run('delete_menu_by_id', lambda: ac.delete(f"/api/v1/menus/{next(menu_ids)}"))
+
+
+if __name__ == '__main__':
+	asyncio.run(main())
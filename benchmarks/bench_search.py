@@ -0,0 +1,62 @@
+"""
+Полнотекстовый поиск GET /api/v1/search на каталоге из 100 menu x 100 submenu x 100 dish (1M dish).
+
+Названия и описания собираются из словаря utils.WORDS, в котором частота слов сильно различается, поэтому замеряются:
+- rare - редкое слово (единицы совпадений);
+- common - частое слово (десятки тысяч совпадений, ранжирование всех найденных строк);
+- multiword - несколько слов (пересечение списков GIN-индекса);
+- page2 - вторая страница по курсору частого слова;
+- title - слово из названия menu/submenu (совпадения во всех трёх ветках поиска).
+
+Перед замерами выводится план запроса, чтобы убедиться, что используются GIN-индексы search_vector.
+
+Запуск: python benchmarks/bench_search.py
+"""
+import asyncio
+
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+
+from src.search.services import _hits_query
+from utils import bench_client, engine_bench, measure, report, seed_vocabulary_catalog
+
+MENUS = 100
+SUBMENUS_PER_MENU = 100
+DISHES_PER_SUBMENU = 100
+REPEAT = 20
+
+QUERIES = {
+	'rare': 'yuzu',
+	'common': 'sauce',
+	'multiword': 'spicy chicken garlic',
+	'title': 'special',
+}
+
+
+async def main():
+	async with bench_client() as ac:
+		await seed_vocabulary_catalog(MENUS, SUBMENUS_PER_MENU, DISHES_PER_SUBMENU)
+		async with engine_bench.connect() as connection:
+			for name, q in QUERIES.items():
+				hits = _hits_query(q)
+				query = select(hits).order_by(hits.c.rank.desc(), hits.c.id).limit(51).compile(
+					dialect=postgresql.dialect(), compile_kwargs={'literal_binds': True})
+				plan = (await connection.execute(text(f'EXPLAIN ANALYZE {query}'))).scalars().all()
+				print(f'--- {name}: {q}\n' + '\n'.join(plan))
+
+		for name, q in QUERIES.items():
+			async def get_search():
+				await ac.get('/api/v1/search', params={'q': q})
+
+			report(f'search {name}', await measure(get_search, REPEAT))
+
+		cursor = (await ac.get('/api/v1/search', params={'q': QUERIES['common']})).headers['x-next-cursor']
+
+		async def get_page2():
+			await ac.get('/api/v1/search', params={'q': QUERIES['common'], 'cursor': cursor})
+
+		report('search page2', await measure(get_page2, REPEAT))
+
+
+if __name__ == '__main__':
+	asyncio.run(main())
@@ -0,0 +1,107 @@
+"""
+Сравнение сериализации ответов /menus и /dishes на страницах из 1k и 10k строк:
+- model - прежний путь: schema pydantic на каждую строку, затем повторная валидация и сериализация
+  по response_model (fastapi.routing.serialize_response) и json.dumps в JSONResponse;
+- orjson - строки результата запроса сразу сериализуются в JSON (src.rendering).
+
+Для каждого пути замеряется время и пик выделенной памяти (tracemalloc) с кол-вом выделенных блоков,
+затем время сквозного GET-запроса к API со сброшенным кэшем.
+
+Запуск: python benchmarks/bench_serialization.py
+"""
+import asyncio
+import os
+import tracemalloc
+from typing import List
+
+# Страница в 10k строк больше лимита по умолчанию, поэтому лимит поднимается до импорта настроек.
+os.environ.setdefault('MAX_PAGE_LIMIT', '10000')
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from sqlalchemy import select, text
+
+from src.cache import services as cache_services
+from src.dish.models import dish as dish_tbl
+from src.dish.schemas import GetSearchDishes
+from src.dish.services import dish_fields
+from src.menu.models import menu as menu_tbl
+from src.menu.schemas import GetSearchMenu
+from src.menu.services import menu_fields
+from src.rendering import render_rows
+from utils import bench_client, engine_bench, measure, report, seed_catalog
+
+SIZES = (1000, 10000)
+REPEAT = 20
+
+
+async def model_path(rows, schema) -> bytes:
+	"""Прежний путь: schema на каждую строку и повторная валидация по response_model."""
+	field = create_response_field(name='response', type_=List[schema], mode='serialization')
+	content = [schema(**row._asdict()) for row in rows]
+	serialized = await serialize_response(field=field, response_content=content)
+	return JSONResponse(serialized).body
+
+
+async def orjson_path(rows, schema) -> bytes:
+	"""Новый путь: строки результата запроса сразу сериализуются в JSON."""
+	return render_rows(rows)
+
+
+async def allocations(func, rows, schema) -> dict[str, float]:
+	"""Функция, которая возвращает пик выделенной памяти и кол-во блоков, выделенных за один вызов."""
+	tracemalloc.start()
+	before = tracemalloc.take_snapshot()
+	tracemalloc.reset_peak()
+	body = await func(rows, schema)
+	peak = tracemalloc.get_traced_memory()[1]
+	after = tracemalloc.take_snapshot()
+	tracemalloc.stop()
+	blocks = sum(stat.count_diff for stat in after.compare_to(before, 'filename') if stat.count_diff > 0)
+	del body
+	return {'peak_kb': peak / 1024, 'blocks': blocks}
+
+
+async def main():
+	async with bench_client() as ac:
+		await seed_catalog(max(SIZES), 0, 0)
+		async with engine_bench.begin() as connection:
+			menu_id = (await connection.execute(text('SELECT id FROM menu LIMIT 1'))).scalar_one()
+			submenu_id = (await connection.execute(text(
+				"INSERT INTO submenu (id, title, description, dishes_count, menu_id) "
+				f"VALUES (gen_random_uuid(), 'submenu', 'submenu description', {max(SIZES)}, :menu_id) RETURNING id"
+			), {'menu_id': menu_id})).scalar_one()
+			await connection.execute(text(
+				"INSERT INTO dish (id, title, description, price, submenu_id) "
+				"SELECT gen_random_uuid(), 'dish ' || d, 'dish description ' || d, '10.00', :submenu_id "
+				f"FROM generate_series(1, {max(SIZES)}) d"
+			), {'submenu_id': submenu_id})
+			await connection.execute(text('ANALYZE'))
+
+		targets = (
+			('menus', select(*menu_fields).order_by(menu_tbl.c.id), GetSearchMenu, '/api/v1/menus'),
+			('dishes', select(*dish_fields).where(dish_tbl.c.submenu_id == submenu_id).order_by(dish_tbl.c.id),
+			 GetSearchDishes, f'/api/v1/menus/{menu_id}/submenus/{submenu_id}/dishes'),
+		)
+		for name, query, schema, url in targets:
+			for size in SIZES:
+				async with engine_bench.connect() as connection:
+					rows = (await connection.execute(query.limit(size))).fetchall()
+
+				for path_name, func in (('model', model_path), ('orjson', orjson_path)):
+					async def serialize():
+						await func(rows, schema)
+
+					report(f"{name} x{size} {path_name}", await measure(serialize, REPEAT))
+					report(f"{name} x{size} {path_name} memory", await allocations(func, rows, schema))
+
+				async def get_page():
+					await cache_services.cache_backend.clear()
+					await ac.get(url, params={"limit": size})
+
+				report(f"{name} x{size} GET", await measure(get_page, REPEAT))
+
+
+if __name__ == '__main__':
+	asyncio.run(main())
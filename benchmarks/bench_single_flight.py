@@ -0,0 +1,55 @@
+"""
+Объединение одновременных промахов кэша (single-flight) на GET /api/v1/menus/{menu_id}/submenus/{submenu_id}/dishes.
+
+Для каждого уровня конкурентности кэш сбрасывается, и N клиентов одновременно запрашивают одну страницу dish.
+Выводится время пачки запросов и кол-во выполненных SQL-выражений: с single-flight оно не зависит от N
+(ETag списка и страница), без него (SINGLE_FLIGHT_TIMEOUT=0) растёт вместе с N.
+
+Запуск: python benchmarks/bench_single_flight.py
+"""
+import asyncio
+
+from sqlalchemy import event, select
+
+from src.cache import services as cache_services
+from src.submenu.models import submenu as submenu_tbl
+from utils import bench_client, engine_bench, measure, report, seed_catalog
+
+MENUS = 10
+SUBMENUS_PER_MENU = 10
+DISHES_PER_SUBMENU = 100
+CONCURRENCY = (1, 10, 50, 100, 500)
+REPEAT = 5
+
+statements = 0
+
+
+def count_statement(*args):
+	global statements
+	statements += 1
+
+
+async def main():
+	event.listen(engine_bench.sync_engine, 'before_cursor_execute', count_statement)
+	async with bench_client() as ac:
+		await seed_catalog(MENUS, SUBMENUS_PER_MENU, DISHES_PER_SUBMENU)
+		async with engine_bench.connect() as connection:
+			submenu_id, menu_id = (await connection.execute(select(submenu_tbl.c.id, submenu_tbl.c.menu_id))).first()
+		url = f'/api/v1/menus/{menu_id}/submenus/{submenu_id}/dishes'
+
+		for timeout in (cache_services.SINGLE_FLIGHT_TIMEOUT, 0):
+			cache_services.SINGLE_FLIGHT_TIMEOUT = timeout
+			mode = 'single-flight' if timeout else 'no coalescing'
+			for concurrency in CONCURRENCY:
+				async def burst():
+					await cache_services.cache_backend.clear()
+					await asyncio.gather(*(ac.get(url) for _ in range(concurrency)))
+
+				global statements
+				statements = 0
+				result = await measure(burst, REPEAT)
+				report(f'{mode} x{concurrency}', dict(result, statements=statements / REPEAT))
+
+
+if __name__ == '__main__':
+	asyncio.run(main())
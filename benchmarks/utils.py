@@ -0,0 +1,124 @@
+import os
+import statistics
+import sys
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, Awaitable, Callable
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from httpx import AsyncClient
+from sqlalchemy import NullPool, text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+
+from src.config import DB_USER_TEST, DB_PASS_TEST, DB_HOST_TEST, DB_PORT_TEST, DB_NAME_TEST
+from src.database import get_async_session, get_read_session, get_read_session_maker
+from src.database import metadata as base_metadata
+from src.main import create_app
+
+# Бенчмарки запускаются на тестовой БД (переменные *_TEST из .env), схема создаётся и удаляется на каждый запуск.
+BENCH_DATABASE_URL = f'postgresql+asyncpg://{DB_USER_TEST}:{DB_PASS_TEST}@{DB_HOST_TEST}:{DB_PORT_TEST}/{DB_NAME_TEST}'
+
+# Слова с индексом i встречаются в ~1/(i + 1) названий: первые - почти везде, последние - единично.
+WORDS = ['grilled', 'sauce', 'fresh', 'chicken', 'cheese', 'tomato', 'garlic', 'spicy', 'beef', 'salad', 'mushroom',
+		 'lemon', 'honey', 'pepper', 'smoked', 'salmon', 'basil', 'ginger', 'truffle', 'saffron', 'quince', 'yuzu']
+
+engine_bench = create_async_engine(BENCH_DATABASE_URL, poolclass=NullPool)
+async_session_maker_bench = async_sessionmaker(bind=engine_bench, class_=AsyncSession, expire_on_commit=False)
+
+
+async def override_get_async_session() -> AsyncGenerator[AsyncSession, None]:
+	async with async_session_maker_bench() as async_session:
+		yield async_session
+
+
+@asynccontextmanager
+async def bench_client() -> AsyncGenerator[AsyncClient, None]:
+	"""Контекстный менеджер, который создаёт схему в тестовой БД и возвращает клиент приложения."""
+	async with engine_bench.begin() as connection:
+		await connection.run_sync(base_metadata.drop_all)
+		await connection.run_sync(base_metadata.create_all)
+	app = create_app()
+	app.dependency_overrides[get_async_session] = override_get_async_session
+	app.dependency_overrides[get_read_session] = override_get_async_session
+	app.dependency_overrides[get_read_session_maker] = lambda: async_session_maker_bench
+	try:
+		async with AsyncClient(app=app, base_url='http://localhost:8000') as ac:
+			yield ac
+	finally:
+		async with engine_bench.begin() as connection:
+			await connection.run_sync(base_metadata.drop_all)
+
+
+async def seed_catalog(menus: int, submenus_per_menu: int, dishes_per_submenu: int) -> None:
+	"""Функция, которая заполняет БД каталогом заданного размера силами Postgres (generate_series)."""
+	async with engine_bench.begin() as connection:
+		await connection.execute(text(
+			"INSERT INTO menu (id, title, description, submenus_count, dishes_count) "
+			f"SELECT gen_random_uuid(), 'menu ' || m, 'menu description ' || m, {submenus_per_menu}, "
+			f"{submenus_per_menu * dishes_per_submenu} FROM generate_series(1, {menus}) m"
+		))
+		await connection.execute(text(
+			"INSERT INTO submenu (id, title, description, dishes_count, menu_id) "
+			f"SELECT gen_random_uuid(), 'submenu ' || s, 'submenu description ' || s, {dishes_per_submenu}, menu.id "
+			f"FROM menu, generate_series(1, {submenus_per_menu}) s"
+		))
+		await connection.execute(text(
+			"INSERT INTO dish (id, title, description, price, submenu_id) "
+			f"SELECT gen_random_uuid(), 'dish ' || d, 'dish description ' || d, '10.00', submenu.id "
+			f"FROM submenu, generate_series(1, {dishes_per_submenu}) d"
+		))
+		await connection.execute(text('ANALYZE'))
+
+
+async def seed_vocabulary_catalog(menus: int, submenus_per_menu: int, dishes_per_submenu: int) -> None:
+	"""
+	Функция, которая заполняет БД каталогом заданного размера с названиями и описаниями из словаря WORDS.
+
+	Каждое десятое menu содержит в названии слово special.
+	"""
+	words = 'ARRAY[' + ', '.join(f"'{word}'" for word in WORDS) + ']'
+	# Номер слова (с 1) с распределением ~1/i: floor((n + 1) ^ random()) для n слов.
+	word = f"({words})[floor(power({len(WORDS) + 1}, random()))::int]"
+	async with engine_bench.begin() as connection:
+		await connection.execute(text(
+			"INSERT INTO menu (id, title, description, submenus_count, dishes_count) "
+			f"SELECT gen_random_uuid(), 'menu ' || m || CASE WHEN m % 10 = 0 THEN ' special' ELSE '' END, "
+			f"'menu description', {submenus_per_menu}, {submenus_per_menu * dishes_per_submenu} "
+			f"FROM generate_series(1, {menus}) m"
+		))
+		await connection.execute(text(
+			"INSERT INTO submenu (id, title, description, dishes_count, menu_id) "
+			f"SELECT gen_random_uuid(), {word} || ' ' || s, 'submenu description', {dishes_per_submenu}, menu.id "
+			f"FROM menu, generate_series(1, {submenus_per_menu}) s"
+		))
+		await connection.execute(text(
+			"INSERT INTO dish (id, title, description, price, submenu_id) "
+			f"SELECT gen_random_uuid(), {word} || ' ' || {word}, "
+			f"{word} || ' ' || {word} || ' with ' || {word} || ' and ' || {word}, 10, submenu.id "
+			f"FROM submenu, generate_series(1, {dishes_per_submenu}) d"
+		))
+		await connection.execute(text('ANALYZE'))
+
+
+async def measure(func: Callable[[], Awaitable], repeat: int = 1) -> dict[str, float]:
+	"""
+	Функция, которая замеряет время выполнения корутины.
+
+	Возвращает медиану, p99 и сумму в миллисекундах.
+	"""
+	timings = []
+	for _ in range(repeat):
+		start = time.perf_counter()
+		await func()
+		timings.append((time.perf_counter() - start) * 1000)
+	timings.sort()
+	return {
+		'median_ms': statistics.median(timings),
+		'p99_ms': timings[min(len(timings) - 1, int(len(timings) * 0.99))],
+		'total_ms': sum(timings),
+	}
+
+
+def report(name: str, result: dict[str, float]) -> None:
+	print(f"{name:<40} " + " ".join(f"{key}={value:.2f}" for key, value in result.items()))
@@ -0,0 +1,31 @@
+"""row versions
+
+Revision ID: 3c8e99974db1
+Revises: 444f0735d5c2
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c8e99974db1'
+down_revision: Union[str, None] = '444f0735d5c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(sa.schema.CreateSequence(sa.Sequence('catalog_version_seq')))
+    for table in ('menu', 'submenu', 'dish'):
+        op.add_column(table, sa.Column('version', sa.BigInteger(), nullable=False,
+                                       server_default=sa.text("nextval('catalog_version_seq')")))
+
+
+def downgrade() -> None:
+    for table in ('dish', 'submenu', 'menu'):
+        op.drop_column(table, 'version')
+    op.execute(sa.schema.DropSequence(sa.Sequence('catalog_version_seq')))
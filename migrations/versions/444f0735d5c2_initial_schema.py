@@ -0,0 +1,63 @@
+"""initial schema
+
+Revision ID: 444f0735d5c2
+Revises: 
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '444f0735d5c2'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'menu',
+        sa.Column('id', sa.Uuid(), nullable=False),
+        sa.Column('title', sa.String(length=50), nullable=False),
+        sa.Column('description', sa.String(length=200), nullable=True),
+        sa.Column('submenus_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('dishes_count', sa.Integer(), server_default='0', nullable=False),
+        sa.CheckConstraint('submenus_count >= 0', name='ck_menu_submenus_count'),
+        sa.CheckConstraint('dishes_count >= 0', name='ck_menu_dishes_count'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_table(
+        'submenu',
+        sa.Column('id', sa.Uuid(), nullable=False),
+        sa.Column('title', sa.String(length=50), nullable=False),
+        sa.Column('description', sa.String(length=200), nullable=True),
+        sa.Column('dishes_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('menu_id', sa.Uuid(), nullable=False),
+        sa.CheckConstraint('dishes_count >= 0', name='ck_submenu_dishes_count'),
+        sa.ForeignKeyConstraint(['menu_id'], ['menu.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_submenu_menu_id_id', 'submenu', ['menu_id', 'id'], unique=False)
+    op.create_table(
+        'dish',
+        sa.Column('id', sa.Uuid(), nullable=False),
+        sa.Column('title', sa.String(length=50), nullable=False),
+        sa.Column('description', sa.String(length=200), nullable=True),
+        sa.Column('price', sa.String(), nullable=True),
+        sa.Column('submenu_id', sa.Uuid(), nullable=False),
+        sa.ForeignKeyConstraint(['submenu_id'], ['submenu.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_dish_submenu_id_id', 'dish', ['submenu_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_dish_submenu_id_id', table_name='dish')
+    op.drop_table('dish')
+    op.drop_index('ix_submenu_menu_id_id', table_name='submenu')
+    op.drop_table('submenu')
+    op.drop_table('menu')
@@ -0,0 +1,31 @@
+"""dish price numeric
+
+Revision ID: 7b2d51e0c9a4
+Revises: 3c8e99974db1
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b2d51e0c9a4'
+down_revision: Union[str, None] = '3c8e99974db1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # API всегда сохранял цену строкой вида '12.50', поэтому значения приводятся к numeric без потерь.
+    op.alter_column('dish', 'price', type_=sa.Numeric(10, 2), existing_type=sa.String(), nullable=False,
+                    postgresql_using='price::numeric(10, 2)')
+    op.create_index('ix_dish_submenu_id_price_id', 'dish', ['submenu_id', 'price', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_dish_submenu_id_price_id', table_name='dish')
+    op.alter_column('dish', 'price', type_=sa.String(), existing_type=sa.Numeric(10, 2), nullable=True,
+                    postgresql_using='price::text')
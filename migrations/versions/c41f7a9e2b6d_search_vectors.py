@@ -0,0 +1,40 @@
+"""search vectors
+
+Revision ID: c41f7a9e2b6d
+Revises: 7b2d51e0c9a4
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41f7a9e2b6d'
+down_revision: Union[str, None] = '7b2d51e0c9a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_VECTORS = {
+    'menu': "setweight(to_tsvector('simple', title), 'A')",
+    'submenu': "setweight(to_tsvector('simple', title), 'A')",
+    'dish': "setweight(to_tsvector('simple', title), 'A') "
+            "|| setweight(to_tsvector('simple', coalesce(description, '')), 'B')",
+}
+
+
+def upgrade() -> None:
+    for table, expression in SEARCH_VECTORS.items():
+        op.add_column(table, sa.Column('search_vector', postgresql.TSVECTOR(),
+                                       sa.Computed(expression, persisted=True), nullable=True))
+        op.create_index(f'ix_{table}_search_vector', table, ['search_vector'], unique=False,
+                        postgresql_using='gin')
+
+
+def downgrade() -> None:
+    for table in SEARCH_VECTORS:
+        op.drop_index(f'ix_{table}_search_vector', table_name=table, postgresql_using='gin')
+        op.drop_column(table, 'search_vector')
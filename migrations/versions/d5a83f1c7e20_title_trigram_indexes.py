@@ -0,0 +1,32 @@
+"""title trigram indexes
+
+Revision ID: d5a83f1c7e20
+Revises: c41f7a9e2b6d
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a83f1c7e20'
+down_revision: Union[str, None] = 'c41f7a9e2b6d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('dish', 'submenu')
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for table in TABLES:
+        op.create_index(f'ix_{table}_title_trgm', table, ['title'], unique=False,
+                        postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    # Расширение pg_trgm не удаляется: его могут использовать объекты вне этой схемы.
+    for table in TABLES:
+        op.drop_index(f'ix_{table}_title_trgm', table_name=table, postgresql_using='gin')
@@ -0,0 +1,24 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.autocomplete.schemas import Suggestion
+from src.autocomplete.services import autocomplete
+from src.config import AUTOCOMPLETE_MAX_LIMIT
+from src.database import get_read_session
+from src.rendering import json_response
+
+# Роутер для подсказок в строке поиска
+router = APIRouter(
+	prefix='/api/v1',
+	tags=['Autocomplete']
+)
+
+
+# Роутер подсказок названий submenu и dish по началу или нечёткому совпадению введённой строки.
+@router.get("/autocomplete", response_model=List[Suggestion])
+async def get_autocomplete(prefix: str = Query(min_length=1, max_length=50),
+						   limit: int = Query(10, ge=1, le=AUTOCOMPLETE_MAX_LIMIT),
+						   session: AsyncSession = Depends(get_read_session)):
+	return json_response(await autocomplete(prefix, limit, session))
@@ -0,0 +1,8 @@
+from typing import Literal
+
+from pydantic import BaseModel
+
+
+class Suggestion(BaseModel):
+	type: Literal['submenu', 'dish']
+	title: str
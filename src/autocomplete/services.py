@@ -0,0 +1,62 @@
+from sqlalchemy import Float, Select, Table, func, literal, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.cache.backends import MemoryCache
+from src.config import AUTOCOMPLETE_CACHE_SIZE, AUTOCOMPLETE_CACHE_TTL
+from src.dish.models import dish as dish_tbl
+from src.rendering import render_rows
+from src.submenu.models import submenu as submenu_tbl
+
+# In-process LRU популярных префиксов: подсказки запрашиваются на каждое нажатие клавиши, и у разных клиентов
+# префиксы в основном совпадают. Устаревание ограничено TTL, записи в каталог кэш не сбрасывают.
+suggestions_cache = MemoryCache(AUTOCOMPLETE_CACHE_SIZE)
+
+
+def _like_prefix(prefix: str) -> str:
+	"""Функция, которая экранирует спецсимволы LIKE в префиксе и возвращает шаблон поиска по началу строки."""
+	return prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+
+def _suggestions(table: Table, type_: str, prefix: str, limit: int) -> Select:
+	"""
+	Функция, которая строит запрос лучших limit различных названий из таблицы для префикса.
+
+	Совпадения по началу названия (ILIKE) идут первыми, затем нечёткие совпадения по word_similarity.
+	Оба условия обслуживаются триграммным GIN-индексом по title.
+	"""
+	is_prefix = table.c.title.ilike(_like_prefix(prefix), escape='\\')
+	score = func.word_similarity(prefix, table.c.title, type_=Float)
+	return select(
+		literal(type_).label('type'), table.c.title,
+		is_prefix.label('is_prefix'), score.label('score'),
+	).where(is_prefix | literal(prefix).bool_op('<%')(table.c.title)) \
+		.group_by(table.c.title).order_by(is_prefix.desc(), score.desc(), table.c.title).limit(limit)
+
+
+async def autocomplete(prefix: str, limit: int, session: AsyncSession) -> bytes:
+	"""
+	Функция, которая возвращает подсказки названий submenu и dish для строки поиска.
+
+	Принимает 3 аргумента:
+	- session - экземпляр, который обеспечивает асинхронное взаимодействие с БД.
+	- prefix - введённая пользователем часть названия.
+	- limit - максимальное кол-во подсказок.
+
+	Возвращает список подсказок (тип и название), сериализованный в JSON.
+	"""
+	prefix = prefix.strip().lower()
+	if not prefix:
+		return render_rows([])
+	key = f'{limit}:{prefix}'
+	cached = await suggestions_cache.get(key)
+	if cached is not None:
+		return cached
+	hits = union_all(
+		_suggestions(submenu_tbl, 'submenu', prefix, limit),
+		_suggestions(dish_tbl, 'dish', prefix, limit),
+	).subquery('hits')
+	query = select(hits.c.type, hits.c.title) \
+		.order_by(hits.c.is_prefix.desc(), hits.c.score.desc(), hits.c.type, hits.c.title).limit(limit)
+	body = render_rows((await session.execute(query)).fetchall())
+	await suggestions_cache.set(key, body, AUTOCOMPLETE_CACHE_TTL)
+	return body
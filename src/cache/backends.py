@@ -0,0 +1,135 @@
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from src.config import CACHE_BACKEND, CACHE_MAX_BYTES, CACHE_MAX_SIZE, REDIS_URL
+
+
+class CacheBackend:
+	"""
+	Базовый класс backend'а кэша.
+
+	Каждый ключ хранит набор полей с сериализованными ответами (bytes),
+	например страницы одного списка. Удаление ключа сбрасывает все его поля.
+	"""
+
+	async def get(self, key: str, field: str = '') -> Optional[bytes]:
+		raise NotImplementedError
+
+	async def set(self, key: str, value: bytes, ttl: int, field: str = '') -> None:
+		raise NotImplementedError
+
+	async def delete(self, *keys: str) -> None:
+		raise NotImplementedError
+
+	async def clear(self) -> None:
+		raise NotImplementedError
+
+
+class MemoryCache(CacheBackend):
+	"""
+	In-process LRU кэш с TTL ключа, который продлевается при каждой записи поля.
+
+	Принимает 3 аргумента:
+	- max_size - максимальное кол-во ключей, при превышении вытесняются самые давно использованные.
+	- max_bytes - максимальный суммарный размер значений в байтах, вытеснение - так же, по давности использования.
+	- clock - источник времени в секундах для TTL (по умолчанию time.monotonic, в тестах - поддельные часы).
+	"""
+
+	def __init__(self, max_size: int = CACHE_MAX_SIZE, max_bytes: int = CACHE_MAX_BYTES,
+				 clock: Optional[Callable[[], float]] = None):
+		self.max_size = max_size
+		self.max_bytes = max_bytes
+		self.clock = clock or time.monotonic
+		self.size = 0
+		self._data: OrderedDict[str, tuple[float, dict[str, bytes]]] = OrderedDict()
+
+	def _remove(self, key: str) -> None:
+		item = self._data.pop(key, None)
+		if item is not None:
+			self.size -= sum(len(value) for value in item[1].values())
+
+	async def get(self, key: str, field: str = '') -> Optional[bytes]:
+		item = self._data.get(key)
+		if item is None:
+			return None
+		expires_at, fields = item
+		if expires_at <= self.clock():
+			self._remove(key)
+			return None
+		self._data.move_to_end(key)
+		return fields.get(field)
+
+	async def set(self, key: str, value: bytes, ttl: int, field: str = '') -> None:
+		if len(value) > self.max_bytes:
+			# Значение не поместится, не вытесняя всё остальное; прежнее значение поля устарело.
+			self._remove(key)
+			return
+		item = self._data.get(key)
+		if item is None or item[0] <= self.clock():
+			self._remove(key)
+			item = (0, {})
+		# Каждая запись продлевает ключ: обновлённое в фоне значение живёт ttl с момента обновления.
+		self._data[key] = (self.clock() + ttl, item[1])
+		previous = item[1].get(field)
+		item[1][field] = value
+		self.size += len(value) - (0 if previous is None else len(previous))
+		self._data.move_to_end(key)
+		while len(self._data) > self.max_size or self.size > self.max_bytes:
+			self._remove(next(iter(self._data)))
+
+	async def delete(self, *keys: str) -> None:
+		for key in keys:
+			self._remove(key)
+
+	async def clear(self) -> None:
+		self._data.clear()
+		self.size = 0
+
+
+class RedisCache(CacheBackend):
+	"""
+	Кэш поверх любого сервера, поддерживающего протокол Redis.
+
+	Ключ хранится как hash, каждая запись поля продлевает TTL ключа.
+
+	Принимает 1 аргумент:
+	- url - адрес сервера, например redis://localhost:6379/0.
+	"""
+
+	def __init__(self, url: str = REDIS_URL):
+		import redis.asyncio as redis
+
+		self._client = redis.from_url(url)
+
+	async def get(self, key: str, field: str = '') -> Optional[bytes]:
+		return await self._client.hget(key, field)
+
+	async def set(self, key: str, value: bytes, ttl: int, field: str = '') -> None:
+		async with self._client.pipeline(transaction=True) as pipe:
+			pipe.hset(key, field, value)
+			pipe.expire(key, ttl)
+			await pipe.execute()
+
+	async def delete(self, *keys: str) -> None:
+		if keys:
+			await self._client.delete(*keys)
+
+	async def clear(self) -> None:
+		await self._client.flushdb()
+
+
+def create_cache_backend(name: str = CACHE_BACKEND) -> CacheBackend:
+	"""
+	Функция, которая создаёт backend кэша по его названию.
+
+	Принимает 1 аргумент:
+	- name - "memory" или "redis".
+
+	Возвращает экземпляр backend'а.
+	"""
+	if name == 'redis':
+		return RedisCache()
+	if name == 'memory':
+		return MemoryCache()
+	raise ValueError(f"unknown cache backend: {name}")
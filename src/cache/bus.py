@@ -0,0 +1,79 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+from fastapi import HTTPException
+
+from src.cache.keys import event_keys
+from src.config import CACHE_BUS_RECONNECT_SECONDS
+from src.events.services import EventBroadcaster
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidationBus:
+	"""
+	Инвалидация in-process кэша воркера по событиям об изменении каталога.
+
+	Воркер, выполнивший запись, удаляет устаревшие ключи у себя сразу. Остальные воркеры узнают о записи из событий
+	notify_change: они отправляются в транзакции записи, поэтому доставляются только после её COMMIT и не требуют
+	отдельной публикации. Шина подписывается на события через общую для воркера рассылку (одно соединение с LISTEN)
+	и удаляет из кэша ключи, которые событие затрагивает (event_keys). Собственные события воркер тоже получает,
+	повторное удаление стоит лишь лишнего промаха. Пока подписки нет, события могут теряться, поэтому после
+	переподключения кэш воркера сбрасывается целиком.
+
+	Принимает 2 аргумента:
+	- broadcaster - рассылка событий об изменении каталога.
+	- handler - корутина, которая удаляет из кэша воркера ключи (None - весь кэш).
+	"""
+
+	def __init__(self, broadcaster: EventBroadcaster, handler: Callable[[Optional[list[str]]], Awaitable[None]]):
+		self.broadcaster = broadcaster
+		self.handler = handler
+		self._queue: Optional[asyncio.Queue] = None
+		self._task: Optional[asyncio.Task] = None
+
+	@property
+	def connected(self) -> bool:
+		return self._queue is not None
+
+	async def start(self) -> None:
+		"""Функция, которая подписывается на события (при старте воркера); при ошибке подписка повторяется в фоне."""
+		try:
+			self._queue = await self.broadcaster.subscribe(maxsize=0)
+		except HTTPException:
+			logger.warning('cannot subscribe to catalog events, retrying')
+		self._task = asyncio.get_running_loop().create_task(self._follow())
+
+	async def close(self) -> None:
+		"""Функция, которая отписывается от событий (при остановке воркера)."""
+		if self._task is not None:
+			self._task.cancel()
+			self._task = None
+		if self._queue is not None:
+			self.broadcaster.unsubscribe(self._queue)
+			self._queue = None
+
+	async def _resubscribe(self) -> None:
+		while self._queue is None:
+			await asyncio.sleep(CACHE_BUS_RECONNECT_SECONDS)
+			try:
+				self._queue = await self.broadcaster.subscribe(maxsize=0)
+			except HTTPException:
+				logger.warning('cannot subscribe to catalog events, retrying')
+		await self.handler(None)
+
+	async def _follow(self) -> None:
+		while True:
+			if self._queue is None:
+				await self._resubscribe()
+			event = await self._queue.get()
+			if event is None:
+				# Подписка закрыта (соединение с LISTEN потеряно): события за это время могли пропасть.
+				self._queue = None
+				await self.handler(None)
+				continue
+			try:
+				await self.handler(event_keys(event.data))
+			except Exception:
+				logger.exception('cannot invalidate cache for catalog event %s', event.data)
@@ -0,0 +1,58 @@
+import uuid
+from typing import Any, Optional
+
+# Ключи кэша для ответов GET-роутеров menu, submenu и dish.
+
+
+def menus_key() -> str:
+	return 'menus'
+
+
+def menu_key(menu_id: uuid.UUID) -> str:
+	return f'menu:{menu_id}'
+
+
+def submenus_key(menu_id: uuid.UUID) -> str:
+	return f'submenus:{menu_id}'
+
+
+def submenu_key(submenu_id: uuid.UUID) -> str:
+	return f'submenu:{submenu_id}'
+
+
+def dishes_key(submenu_id: uuid.UUID) -> str:
+	return f'dishes:{submenu_id}'
+
+
+def dish_key(dish_id: uuid.UUID) -> str:
+	return f'dish:{dish_id}'
+
+
+# Поле ключа, в котором хранится ETag объекта или списка.
+ETAG_FIELD = 'etag'
+
+
+def event_keys(data: dict[str, Any]) -> Optional[list[str]]:
+	"""
+	Функция, которая возвращает ключи, устаревшие после события об изменении каталога (payload notify_change).
+
+	Ключи те же, что удаляет сам воркер, выполнивший запись. None - сброс всего кэша: импорт каталога и удаление
+	menu или submenu, id каскадно удалённых объектов которых в событии нет.
+	"""
+	entity, action = data.get('type'), data.get('action')
+	if entity not in ('menu', 'submenu', 'dish') or action == 'delete' and entity != 'dish':
+		return None
+	menu_id = data['menu_id']
+	if entity == 'menu':
+		return [menus_key(), menu_key(menu_id)]
+	if entity == 'submenu':
+		if action == 'update':
+			return [submenu_key(data['id']), submenus_key(menu_id)]
+		return [menus_key(), menu_key(menu_id), submenus_key(menu_id)]
+	submenu_id = data['submenu_id']
+	if action == 'update':
+		return [dish_key(data['id']), dishes_key(submenu_id)]
+	keys = [menus_key(), menu_key(menu_id), submenus_key(menu_id), submenu_key(submenu_id), dishes_key(submenu_id)]
+	if action == 'delete':
+		keys.append(dish_key(data['id']))
+	return keys
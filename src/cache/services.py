@@ -0,0 +1,266 @@
+import asyncio
+import logging
+import math
+import random
+import struct
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi import HTTPException
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.cache.backends import CacheBackend, create_cache_backend
+from src.config import CACHE_TTL, CACHE_SOFT_TTL, CACHE_EARLY_REFRESH_BETA, SINGLE_FLIGHT_TIMEOUT
+from src.database import primary_bind
+from src.metrics.sql import db_stats
+
+logger = logging.getLogger(__name__)
+
+cache_backend: CacheBackend = create_cache_backend()
+# Backend кэша приложения, обрабатывающего текущий запрос (см. CacheBackendMiddleware); None - cache_backend.
+_app_backend: ContextVar[Optional[CacheBackend]] = ContextVar('cache_backend', default=None)
+# Источник времени для мягкого TTL: общий для воркеров (Redis), поэтому часы, а не time.monotonic.
+clock: Callable[[], float] = time.time
+# Заголовок значения в кэше: до какого момента оно свежее и сколько секунд заняла его загрузка.
+_HEADER = struct.Struct('!dd')
+_codecs: dict[Any, tuple[Callable[[Any], bytes], Callable[[bytes], Any]]] = {bytes: (bytes, bytes)}
+# Загрузки из БД, которые выполняются сейчас, по (ключ, поле): одновременные промахи по одному полю ждут одну загрузку.
+_in_flight: dict[tuple[str, str], asyncio.Future] = {}
+# Фоновые обновления устаревших значений (ссылки держатся, чтобы задачи не собрал GC).
+_refreshes: set[asyncio.Task] = set()
+# Ключ session.info сессии реплики: откуда запрос уже получил поля каждого ключа (True - кэш, False - реплика).
+_SOURCES = 'cache_sources'
+
+
+class LeaderGone(Exception):
+	"""Запрос, выполнявший общую загрузку, отменён (клиент отключился) - ожидающие загружают значение сами."""
+
+
+def set_cache_backend(backend: CacheBackend) -> None:
+	"""Функция, которая подменяет используемый backend кэша (например, в тестах)."""
+	global cache_backend
+	cache_backend = backend
+
+
+def get_cache_backend() -> CacheBackend:
+	"""Функция, которая возвращает backend кэша текущего приложения."""
+	backend = _app_backend.get()
+	return cache_backend if backend is None else backend
+
+
+class CacheBackendMiddleware:
+	"""
+	ASGI middleware, которое направляет кэш запросов приложения в его собственный backend.
+
+	Нужно, если в одном процессе работают несколько приложений со своим кэшем в памяти (например, воркеры в тестах).
+
+	Принимает 2 аргумента:
+	- app - приложение ASGI.
+	- backend - backend кэша приложения.
+	"""
+
+	def __init__(self, app: ASGIApp, backend: CacheBackend) -> None:
+		self.app = app
+		self.backend = backend
+
+	async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+		token = _app_backend.set(self.backend)
+		try:
+			await self.app(scope, receive, send)
+		finally:
+			_app_backend.reset(token)
+
+
+def _get_codec(schema: Any) -> tuple[Callable[[Any], bytes], Callable[[bytes], Any]]:
+	"""
+	Функция, которая возвращает пару (сериализация, десериализация) для типа значения кэша.
+
+	bytes хранится как есть, типы с методами to_bytes/from_bytes - через эти методы,
+	остальные типы - через TypeAdapter pydantic.
+	"""
+	codec = _codecs.get(schema)
+	if codec is None:
+		if hasattr(schema, 'from_bytes'):
+			codec = (schema.to_bytes, schema.from_bytes)
+		else:
+			adapter = TypeAdapter(schema)
+			codec = (adapter.dump_json, adapter.validate_json)
+		_codecs[schema] = codec
+	return codec
+
+
+def _is_fresh(fresh_until: float, load_time: float) -> bool:
+	"""
+	Функция, которая решает, можно ли отдать значение без обновления.
+
+	Значение обновляется досрочно с вероятностью, которая растёт к концу мягкого TTL и с длительностью загрузки
+	(probabilistic early expiration): обновления ключей, закэшированных одновременно, не совпадают во времени.
+	"""
+	return clock() - load_time * CACHE_EARLY_REFRESH_BETA * math.log(1 - random.random()) < fresh_until
+
+
+async def _load(key: str, field: str, dump: Callable[[Any], bytes], loader: Callable[[AsyncSession], Awaitable[Any]],
+				session: AsyncSession, flight: asyncio.Future) -> Any:
+	"""
+	Функция, которая выполняет загрузку, передаёт её результат (или ошибку) ожидающим и записывает его в кэш.
+
+	Если во время загрузки ключ инвалидирован, значение могло устареть и в кэш не записывается.
+	"""
+	flight_key = (key, field)
+	start = clock()
+	try:
+		value = await loader(session)
+	except BaseException as error:
+		flight.set_exception(error if isinstance(error, Exception) else LeaderGone())
+		# Ошибка считается полученной, даже если ожидающих не было.
+		flight.exception()
+		raise
+	finally:
+		is_current = _in_flight.get(flight_key) is flight
+		if is_current:
+			del _in_flight[flight_key]
+	flight.set_result(value)
+	if is_current:
+		now = clock()
+		header = _HEADER.pack(now + CACHE_SOFT_TTL, now - start)
+		await get_cache_backend().set(key, header + dump(value), CACHE_TTL, field)
+	return value
+
+
+async def _refresh(key: str, field: str, dump: Callable[[Any], bytes], loader: Callable[[AsyncSession], Awaitable[Any]],
+				   bind: AsyncEngine, flight: asyncio.Future) -> None:
+	"""Функция, которая обновляет устаревшее значение в фоне, в своей сессии (сессия запроса к этому времени закрыта)."""
+	# Обращения к БД фонового обновления не относятся к запросу, который его запустил.
+	db_stats.set(None)
+	try:
+		async with AsyncSession(bind, expire_on_commit=False) as session:
+			await _load(key, field, dump, loader, session, flight)
+	except HTTPException:
+		# Объекта нет в основной БД (например, загрузка после промаха на реплике): кэшировать нечего.
+		pass
+	except Exception:
+		logger.warning('cannot refresh %s %s', key, field, exc_info=True)
+
+
+def _start_refresh(key: str, field: str, dump: Callable[[Any], bytes],
+				   loader: Callable[[AsyncSession], Awaitable[Any]], bind: AsyncEngine) -> None:
+	"""Функция, которая запускает фоновую загрузку значения в кэш, к которой присоединяются промахи по этому полю."""
+	flight = _in_flight[(key, field)] = asyncio.get_running_loop().create_future()
+	task = asyncio.get_running_loop().create_task(_refresh(key, field, dump, loader, bind, flight))
+	_refreshes.add(task)
+	task.add_done_callback(_refreshes.discard)
+
+
+async def _load_primary(flight_key: tuple[str, str], loader: Callable[[AsyncSession], Awaitable[Any]],
+						bind: AsyncEngine) -> Any:
+	"""Функция, которая ждёт загрузку поля из основной БД в кэш, а если она не успела или прервана - загружает сама."""
+	flight = _in_flight.get(flight_key)
+	if flight is not None:
+		try:
+			return await asyncio.wait_for(asyncio.shield(flight), SINGLE_FLIGHT_TIMEOUT)
+		except (asyncio.TimeoutError, LeaderGone):
+			pass
+	async with AsyncSession(bind, expire_on_commit=False) as session:
+		return await loader(session)
+
+
+async def read_through(key: str, schema: Any, loader: Callable[[AsyncSession], Awaitable[Any]], session: AsyncSession,
+					   field: str = '') -> Any:
+	"""
+	Функция, которая возвращает значение из кэша, а при промахе загружает его из БД и кэширует.
+
+	Значение свежее CACHE_SOFT_TTL секунд и хранится CACHE_TTL секунд (жёсткий TTL). Между ними (или досрочно,
+	см. _is_fresh) отдаётся устаревшее значение, а одна фоновая задача загружает новое (stale-while-revalidate).
+
+	Одновременные промахи по одному полю объединяются (single-flight): запрос к БД выполняет первый, остальные ждут
+	его результат или ошибку, но не дольше SINGLE_FLIGHT_TIMEOUT секунд, после чего загружают значение сами.
+
+	Принимает 5 аргументов:
+	- key - ключ кэша.
+	- schema - тип значения (bytes, RenderedPage, schema pydantic) для сериализации.
+	- loader - корутина, выполняющая запрос к БД в переданной ей сессии.
+	- session - сессия запроса к API; фоновое обновление открывает новую сессию на том же engine. Значения из
+	  сессии реплики в кэш не записываются: кэш заполняет фоновая загрузка из основной БД. Поля одного ключа
+	  (ETag и тело) запрос на реплике получает из одного источника: все из кэша (основной БД) или все из реплики.
+	- field - поле внутри ключа, например страница списка.
+
+	Возвращает результат loader.
+	"""
+	dump, load = _get_codec(schema)
+	flight_key = (key, field)
+	primary = primary_bind(session)
+	sources = None if primary is None else session.info.setdefault(_SOURCES, {})
+	if sources is not None and sources.get(key) is False:
+		# Другое поле ключа (например, ETag) запрос уже получил из реплики: тело берётся оттуда же.
+		return await loader(session)
+	raw = await get_cache_backend().get(key, field)
+	if raw is not None:
+		if flight_key not in _in_flight and not _is_fresh(*_HEADER.unpack_from(raw)):
+			_start_refresh(key, field, dump, loader, primary or session.bind)
+		if sources is not None:
+			sources[key] = True
+		return load(raw[_HEADER.size:])
+
+	if primary is not None:
+		# Сессия реплики: запрос получает данные реплики, а кэш заполняет фоновая загрузка из основной БД. Иначе
+		# значение, прочитанное из отстающей реплики сразу после записи, попало бы в кэш и ко всем клиентам.
+		if flight_key not in _in_flight:
+			_start_refresh(key, field, dump, loader, primary)
+		if sources.get(key):
+			# Другое поле ключа (ETag) запрос уже получил из кэша, т.е. из основной БД: тело из отстающей реплики
+			# отдалось бы под новым ETag, и клиент получал бы на него 304 до следующей записи.
+			return await _load_primary(flight_key, loader, primary)
+		sources[key] = False
+		return await loader(session)
+
+	flight = _in_flight.get(flight_key)
+	if flight is not None:
+		try:
+			return await asyncio.wait_for(asyncio.shield(flight), SINGLE_FLIGHT_TIMEOUT)
+		except (asyncio.TimeoutError, LeaderGone):
+			return await loader(session)
+
+	flight = _in_flight[flight_key] = asyncio.get_running_loop().create_future()
+	return await _load(key, field, dump, loader, session, flight)
+
+
+def _forget_in_flight(keys: Optional[set[str]]) -> None:
+	"""Функция, которая отвязывает от ключей загрузки, начатые до записи: новые промахи выполнят свежий запрос."""
+	for flight_key in list(_in_flight):
+		if keys is None or flight_key[0] in keys:
+			del _in_flight[flight_key]
+
+
+async def invalidate(*keys: str) -> None:
+	"""
+	Функция, которая удаляет из кэша устаревшие после записи ключи.
+
+	Остальные воркеры удаляют их у себя по событию записи (см. InvalidationBus).
+	"""
+	await get_cache_backend().delete(*keys)
+	_forget_in_flight(set(keys))
+
+
+async def invalidate_all() -> None:
+	"""Функция, которая сбрасывает весь кэш после записи, затрагивающей произвольную часть каталога (импорт)."""
+	await get_cache_backend().clear()
+	_forget_in_flight(None)
+
+
+async def drop_invalidated(keys: Optional[list[str]], backend: Optional[CacheBackend] = None) -> None:
+	"""
+	Функция, которая удаляет из кэша воркера ключи, устаревшие после записи другого воркера.
+
+	Принимает 2 аргумента:
+	- keys - ключи кэша, None - весь кэш.
+	- backend - backend кэша приложения (по умолчанию cache_backend).
+	"""
+	backend = cache_backend if backend is None else backend
+	if keys is None:
+		await backend.clear()
+	else:
+		await backend.delete(*keys)
+	_forget_in_flight(None if keys is None else set(keys))
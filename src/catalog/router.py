@@ -0,0 +1,117 @@
+import uuid
+from typing import List
+
+from fastapi import APIRouter, Depends, Query, Request, Response
+
+from src.catalog.services import CatalogReplica, get_catalog_replica
+from src.config import BATCH_GET_MAX_IDS
+from src.dish.schemas import DishFilters
+from src.etag import is_not_modified, not_modified
+from src.pagination import PageParams, set_next_cursor
+from src.rendering import versioned_json_response
+
+# Роутер GET-запросов menu, submenu и dish из реплики каталога в памяти. Подключается в create_app раньше
+# роутеров menu, submenu и dish и перекрывает их GET-маршруты, поэтому в схему OpenAPI не входит.
+router = APIRouter(
+	prefix='/api/v1',
+	tags=['Catalog replica'],
+	include_in_schema=False
+)
+
+
+# Роутер получения всех имеющихся меню.
+@router.get("/menus")
+async def get_menus(request: Request, params: PageParams = Depends(),
+					replica: CatalogReplica = Depends(get_catalog_replica)):
+	index = replica.index
+	etag = index.menus_etag()
+	if is_not_modified(request, etag):
+		return not_modified(request, etag)
+	page = index.menus_page(params)
+	response = await versioned_json_response(request, page.body, etag)
+	set_next_cursor(response, page)
+	return response
+
+
+# Роутер получения дерева всех меню с подменю и блюдами.
+@router.get("/menus/tree")
+async def get_menus_tree(replica: CatalogReplica = Depends(get_catalog_replica)):
+	return Response(content=replica.index.menus_tree(), media_type="application/json")
+
+
+# Роутер получения дерева меню с подменю и блюдами по ид.
+@router.get("/menus/{menu_id}/tree")
+async def get_menu_tree_by_id(menu_id: uuid.UUID, replica: CatalogReplica = Depends(get_catalog_replica)):
+	return Response(content=replica.index.menu_tree(menu_id), media_type="application/json")
+
+
+# Роутер получения меню по ид.
+@router.get("/menus/{menu_id}")
+async def get_menu(menu_id: uuid.UUID, request: Request, replica: CatalogReplica = Depends(get_catalog_replica)):
+	index = replica.index
+	etag = index.menu_etag(menu_id)
+	if is_not_modified(request, etag):
+		return not_modified(request, etag)
+	return await versioned_json_response(request, index.menu(menu_id), etag)
+
+
+# Роутер для получения списка всех submenu.
+@router.get("/menus/{menu_id}/submenus")
+async def get_submenus(menu_id: uuid.UUID, request: Request, params: PageParams = Depends(),
+					   replica: CatalogReplica = Depends(get_catalog_replica)):
+	index = replica.index
+	etag = index.submenus_etag(menu_id)
+	if is_not_modified(request, etag):
+		return not_modified(request, etag)
+	page = index.submenus_page(menu_id, params)
+	response = await versioned_json_response(request, page.body, etag)
+	set_next_cursor(response, page)
+	return response
+
+
+# Роутер для получения нескольких submenu по id.
+@router.get("/submenus:batchGet")
+async def batch_get_submenus(ids: List[uuid.UUID] = Query([], max_length=BATCH_GET_MAX_IDS),
+							 replica: CatalogReplica = Depends(get_catalog_replica)):
+	return Response(content=replica.index.submenus_batch(ids), media_type="application/json")
+
+
+# Роутер для получения submenu по id.
+@router.get("/menus/{menu_id}/submenus/{submenu_id}")
+async def get_submenu(submenu_id: uuid.UUID, request: Request, replica: CatalogReplica = Depends(get_catalog_replica)):
+	index = replica.index
+	etag = index.submenu_etag(submenu_id)
+	if is_not_modified(request, etag):
+		return not_modified(request, etag)
+	return await versioned_json_response(request, index.submenu(submenu_id), etag)
+
+
+# Роутер для получения списка всех dish.
+@router.get("/menus/{menu_id}/submenus/{submenu_id}/dishes")
+async def get_dishes(submenu_id: uuid.UUID, request: Request, params: PageParams = Depends(),
+					 filters: DishFilters = Depends(), replica: CatalogReplica = Depends(get_catalog_replica)):
+	index = replica.index
+	etag = index.dishes_etag(submenu_id)
+	if is_not_modified(request, etag):
+		return not_modified(request, etag)
+	page = index.dishes_page(submenu_id, params, filters)
+	response = await versioned_json_response(request, page.body, etag)
+	set_next_cursor(response, page)
+	return response
+
+
+# Роутер для получения нескольких dish по id.
+@router.get("/dishes:batchGet")
+async def batch_get_dishes(ids: List[uuid.UUID] = Query([], max_length=BATCH_GET_MAX_IDS),
+						   replica: CatalogReplica = Depends(get_catalog_replica)):
+	return Response(content=replica.index.dishes_batch(ids), media_type="application/json")
+
+
+# Роутер для получения dish по id.
+@router.get("/menus/{menu_id}/submenus/{submenu_id}/dishes/{dish_id}")
+async def get_dish_by_id(dish_id: uuid.UUID, request: Request, replica: CatalogReplica = Depends(get_catalog_replica)):
+	index = replica.index
+	etag = index.dish_etag(dish_id)
+	if is_not_modified(request, etag):
+		return not_modified(request, etag)
+	return await versioned_json_response(request, index.dish(dish_id), etag)
@@ -0,0 +1,391 @@
+import asyncio
+import bisect
+import logging
+import uuid
+from decimal import Decimal
+from typing import Any, Optional, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import Table, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.config import CATALOG_REPLICA_RETRY_SECONDS
+from src.database import async_session_maker
+from src.dish.models import dish as dish_tbl
+from src.dish.schemas import DishFilters
+from src.etag import make_etag
+from src.events.services import EventBroadcaster, broadcaster
+from src.menu.models import menu as menu_tbl
+from src.pagination import PageParams, RenderedPage, decode_cursor, decode_sort_cursor, encode_cursor
+from src.rendering import render_batch, render_json
+from src.submenu.models import submenu as submenu_tbl
+
+logger = logging.getLogger(__name__)
+
+
+class Record:
+	"""Строка таблицы в памяти: только колонки из __slots__ (в порядке select), без __dict__ у каждого объекта."""
+	__slots__ = ()
+
+	def __init__(self, *values: Any):
+		for name, value in zip(self.__slots__, values):
+			setattr(self, name, value)
+
+	@classmethod
+	def columns(cls, table: Table) -> list:
+		return [table.c[name] for name in cls.__slots__]
+
+
+class MenuRecord(Record):
+	__slots__ = ('id', 'title', 'description', 'version')
+
+
+class SubmenuRecord(Record):
+	__slots__ = ('id', 'title', 'description', 'version', 'menu_id')
+
+
+class DishRecord(Record):
+	__slots__ = ('id', 'title', 'description', 'price', 'version', 'submenu_id')
+
+
+def _discard(ids: list[uuid.UUID], id_: uuid.UUID) -> None:
+	"""Функция, которая удаляет id из отсортированного списка."""
+	position = bisect.bisect_left(ids, id_)
+	if position < len(ids) and ids[position] == id_:
+		del ids[position]
+
+
+def _page(records: list, params: PageParams, after: Any = None, key=None) -> list:
+	"""
+	Функция, которая выбирает из упорядоченных записей страницу после курсора, как paginate: на 1 запись больше limit.
+
+	Принимает 4 аргумента:
+	- records - записи (или id), упорядоченные по key.
+	- params - параметры keyset-пагинации.
+	- after - декодированный курсор: значение key у последней записи предыдущей страницы.
+	- key - функция, которая возвращает ключ сортировки записи (None - сама запись).
+	"""
+	start = 0 if after is None else bisect.bisect_right(records, after, key=key)
+	return records[start:start + params.limit + 1]
+
+
+def _version_etag(records: list) -> str:
+	"""Функция, которая формирует ETag списка так же, как запросы count(*), max(version) в сервисах."""
+	return make_etag(len(records), max((record.version for record in records), default=0))
+
+
+def _price_key(dish: DishRecord) -> tuple[Decimal, uuid.UUID]:
+	return dish.price, dish.id
+
+
+class CatalogIndex:
+	"""
+	Индексы каталога в памяти: записи по id и отсортированные списки id потомков по id родителя.
+
+	Списки и объекты отдаются в том же виде и порядке, что и из БД (пагинация по id или (price, id), ETag
+	по версиям строк), поэтому ответы API в обоих режимах совпадают.
+	"""
+
+	def __init__(self):
+		self.menus: dict[uuid.UUID, MenuRecord] = {}
+		self.submenus: dict[uuid.UUID, SubmenuRecord] = {}
+		self.dishes: dict[uuid.UUID, DishRecord] = {}
+		self.menu_ids: list[uuid.UUID] = []
+		self.submenu_ids: dict[uuid.UUID, list[uuid.UUID]] = {}
+		self.dish_ids: dict[uuid.UUID, list[uuid.UUID]] = {}
+
+	@classmethod
+	def build(cls, menus: list[MenuRecord], submenus: list[SubmenuRecord], dishes: list[DishRecord]) -> 'CatalogIndex':
+		"""Функция, которая строит индексы по всем строкам каталога (списки сортируются один раз в конце)."""
+		index = cls()
+		for menu in menus:
+			index.menus[menu.id] = menu
+			index.submenu_ids[menu.id] = []
+		for submenu in submenus:
+			index.submenus[submenu.id] = submenu
+			index.submenu_ids.setdefault(submenu.menu_id, []).append(submenu.id)
+			index.dish_ids[submenu.id] = []
+		for dish in dishes:
+			index.dishes[dish.id] = dish
+			index.dish_ids.setdefault(dish.submenu_id, []).append(dish.id)
+		index.menu_ids = sorted(index.menus)
+		for ids in (*index.submenu_ids.values(), *index.dish_ids.values()):
+			ids.sort()
+		return index
+
+	def put_menu(self, menu: MenuRecord) -> None:
+		if menu.id not in self.menus:
+			bisect.insort(self.menu_ids, menu.id)
+			self.submenu_ids.setdefault(menu.id, [])
+		self.menus[menu.id] = menu
+
+	def put_submenu(self, submenu: SubmenuRecord) -> None:
+		if submenu.id not in self.submenus:
+			bisect.insort(self.submenu_ids.setdefault(submenu.menu_id, []), submenu.id)
+			self.dish_ids.setdefault(submenu.id, [])
+		self.submenus[submenu.id] = submenu
+
+	def put_dish(self, dish: DishRecord) -> None:
+		if dish.id not in self.dishes:
+			bisect.insort(self.dish_ids.setdefault(dish.submenu_id, []), dish.id)
+		self.dishes[dish.id] = dish
+
+	def remove_menu(self, menu_id: uuid.UUID) -> None:
+		if self.menus.pop(menu_id, None) is None:
+			return
+		_discard(self.menu_ids, menu_id)
+		for submenu_id in self.submenu_ids.pop(menu_id, []):
+			self._drop_submenu(submenu_id)
+
+	def remove_submenu(self, submenu_id: uuid.UUID) -> None:
+		submenu = self.submenus.get(submenu_id)
+		if submenu is None:
+			return
+		_discard(self.submenu_ids.get(submenu.menu_id, []), submenu_id)
+		self._drop_submenu(submenu_id)
+
+	def _drop_submenu(self, submenu_id: uuid.UUID) -> None:
+		self.submenus.pop(submenu_id, None)
+		for dish_id in self.dish_ids.pop(submenu_id, []):
+			self.dishes.pop(dish_id, None)
+
+	def remove_dish(self, dish_id: uuid.UUID) -> None:
+		dish = self.dishes.pop(dish_id, None)
+		if dish is not None:
+			_discard(self.dish_ids.get(dish.submenu_id, []), dish_id)
+
+	def replace_dishes(self, submenu_id: uuid.UUID, dishes: list[DishRecord]) -> None:
+		"""Функция, которая заменяет все dish submenu (после создания пачки dish)."""
+		for dish_id in list(self.dish_ids.get(submenu_id, [])):
+			self.remove_dish(dish_id)
+		for dish in dishes:
+			self.put_dish(dish)
+
+	def _menu_object(self, menu: MenuRecord) -> dict[str, Any]:
+		submenu_ids = self.submenu_ids.get(menu.id, [])
+		return {'id': menu.id, 'title': menu.title, 'description': menu.description,
+				'submenus_count': len(submenu_ids),
+				'dishes_count': sum(len(self.dish_ids.get(submenu_id, [])) for submenu_id in submenu_ids)}
+
+	def _submenu_object(self, submenu: SubmenuRecord) -> dict[str, Any]:
+		return {'id': submenu.id, 'title': submenu.title, 'description': submenu.description,
+				'dishes_count': len(self.dish_ids.get(submenu.id, []))}
+
+	@staticmethod
+	def _dish_object(dish: DishRecord) -> dict[str, Any]:
+		return {'id': dish.id, 'title': dish.title, 'description': dish.description, 'price': dish.price}
+
+	@staticmethod
+	def _get(records: dict, id_: uuid.UUID, name: str) -> Any:
+		record = records.get(id_)
+		if record is None:
+			raise HTTPException(status_code=404, detail=f"{name} not found")
+		return record
+
+	def menu_etag(self, menu_id: uuid.UUID) -> Optional[str]:
+		menu = self.menus.get(menu_id)
+		return None if menu is None else make_etag(menu.version)
+
+	def menus_etag(self) -> str:
+		return _version_etag(list(self.menus.values()))
+
+	def menu(self, menu_id: uuid.UUID) -> bytes:
+		return render_json(self._menu_object(self._get(self.menus, menu_id, 'menu')))
+
+	def menus_page(self, params: PageParams) -> RenderedPage:
+		after = None if params.cursor is None else decode_cursor(params.cursor)
+		ids = _page(self.menu_ids, params, after)
+		return self._render_page([self._menu_object(self.menus[menu_id]) for menu_id in ids], params)
+
+	def submenus_batch(self, submenu_ids: Sequence[uuid.UUID]) -> bytes:
+		found = {id_: self._submenu_object(self.submenus[id_]) for id_ in submenu_ids if id_ in self.submenus}
+		return render_batch(submenu_ids, found, 'submenu')
+
+	def submenu_etag(self, submenu_id: uuid.UUID) -> Optional[str]:
+		submenu = self.submenus.get(submenu_id)
+		return None if submenu is None else make_etag(submenu.version)
+
+	def submenus_etag(self, menu_id: uuid.UUID) -> str:
+		return _version_etag([self.submenus[submenu_id] for submenu_id in self.submenu_ids.get(menu_id, [])])
+
+	def submenu(self, submenu_id: uuid.UUID) -> bytes:
+		return render_json(self._submenu_object(self._get(self.submenus, submenu_id, 'submenu')))
+
+	def submenus_page(self, menu_id: uuid.UUID, params: PageParams) -> RenderedPage:
+		after = None if params.cursor is None else decode_cursor(params.cursor)
+		ids = _page(self.submenu_ids.get(menu_id, []), params, after)
+		return self._render_page([self._submenu_object(self.submenus[submenu_id]) for submenu_id in ids], params)
+
+	def dish_etag(self, dish_id: uuid.UUID) -> Optional[str]:
+		dish = self.dishes.get(dish_id)
+		return None if dish is None else make_etag(dish.version)
+
+	def dishes_etag(self, submenu_id: uuid.UUID) -> str:
+		return _version_etag([self.dishes[dish_id] for dish_id in self.dish_ids.get(submenu_id, [])])
+
+	def dish(self, dish_id: uuid.UUID) -> bytes:
+		return render_json(self._dish_object(self._get(self.dishes, dish_id, 'dish')))
+
+	def dishes_batch(self, dish_ids: Sequence[uuid.UUID]) -> bytes:
+		found = {id_: self._dish_object(self.dishes[id_]) for id_ in dish_ids if id_ in self.dishes}
+		return render_batch(dish_ids, found, 'dish')
+
+	def dishes_page(self, submenu_id: uuid.UUID, params: PageParams, filters: DishFilters) -> RenderedPage:
+		dishes = [self.dishes[dish_id] for dish_id in self.dish_ids.get(submenu_id, [])]
+		if filters.min_price is not None:
+			dishes = [dish for dish in dishes if dish.price >= filters.min_price]
+		if filters.max_price is not None:
+			dishes = [dish for dish in dishes if dish.price <= filters.max_price]
+		if filters.sort == 'price':
+			dishes.sort(key=_price_key)
+			after = None if params.cursor is None else decode_sort_cursor(params.cursor, dish_tbl.c.price)
+			page = _page(dishes, params, after, _price_key)
+		else:
+			after = None if params.cursor is None else decode_cursor(params.cursor)
+			page = _page(dishes, params, after, lambda dish: dish.id)
+		sort_field = 'price' if filters.sort == 'price' else None
+		return self._render_page([self._dish_object(dish) for dish in page], params, sort_field)
+
+	@staticmethod
+	def _render_page(objects: list[dict[str, Any]], params: PageParams, sort_field: Optional[str] = None) -> RenderedPage:
+		"""Функция, которая сериализует страницу, выбранную _page, как render_page: лишний объект - признак курсора."""
+		if len(objects) > params.limit:
+			objects = objects[:params.limit]
+			sort_value = None if sort_field is None else objects[-1][sort_field]
+			return RenderedPage(render_json(objects), encode_cursor(objects[-1]['id'], sort_value))
+		return RenderedPage(render_json(objects))
+
+	def _menu_tree_object(self, menu: MenuRecord) -> dict[str, Any]:
+		submenus = []
+		for submenu_id in self.submenu_ids.get(menu.id, []):
+			submenu = self._submenu_object(self.submenus[submenu_id])
+			submenu['dishes'] = [self._dish_object(self.dishes[dish_id]) for dish_id in self.dish_ids.get(submenu_id, [])]
+			submenus.append(submenu)
+		return {**self._menu_object(menu), 'submenus': submenus}
+
+	def menu_tree(self, menu_id: uuid.UUID) -> bytes:
+		return render_json(self._menu_tree_object(self._get(self.menus, menu_id, 'menu')))
+
+	def menus_tree(self) -> bytes:
+		return render_json([self._menu_tree_object(self.menus[menu_id]) for menu_id in self.menu_ids])
+
+
+# Таблицы и записи реплики по типу объекта в событии об изменении каталога.
+RECORDS = {
+	'menu': (menu_tbl, MenuRecord),
+	'submenu': (submenu_tbl, SubmenuRecord),
+	'dish': (dish_tbl, DishRecord),
+}
+
+
+class CatalogReplica:
+	"""
+	Реплика каталога в памяти процесса: GET-запросы menu, submenu и dish обслуживаются из CatalogIndex без БД.
+
+	При старте реплика подписывается на события об изменении каталога (LISTEN/NOTIFY) и загружает все таблицы
+	из одного снимка БД; события, пришедшие во время загрузки, применяются после неё. Событие применяется
+	перечитыванием из БД объекта и его родителей (версии и счётчики родителей меняются вместе с потомками):
+	если строки больше нет, объект удаляется из реплики вместе с потомками. Если события могли потеряться
+	(соединение с LISTEN оборвалось) или событие не удалось применить, каталог загружается заново.
+
+	Принимает 2 аргумента:
+	- session_maker - фабрика сессий основной БД (реплика БД может отставать от событий).
+	- broadcaster - рассылка событий об изменении каталога.
+	"""
+
+	def __init__(self, session_maker: async_sessionmaker, broadcaster: EventBroadcaster):
+		self.session_maker = session_maker
+		self.broadcaster = broadcaster
+		self.index = CatalogIndex()
+		self._queue: Optional[asyncio.Queue] = None
+		self._task: Optional[asyncio.Task] = None
+
+	async def start(self) -> None:
+		"""Функция, которая загружает каталог и начинает применять изменения (при старте приложения)."""
+		self._queue = await self.broadcaster.subscribe(maxsize=0)
+		await self.reload()
+		self._task = asyncio.get_running_loop().create_task(self._follow())
+
+	async def close(self) -> None:
+		"""Функция, которая перестаёт применять изменения (при остановке приложения)."""
+		if self._task is not None:
+			self._task.cancel()
+			self._task = None
+		if self._queue is not None:
+			self.broadcaster.unsubscribe(self._queue)
+			self._queue = None
+
+	async def reload(self) -> None:
+		"""Функция, которая загружает весь каталог из одного снимка БД и заменяет им индексы."""
+		async with self.session_maker() as session:
+			await session.connection(execution_options={'isolation_level': 'REPEATABLE READ'})
+			tables = []
+			for table, record in RECORDS.values():
+				rows = await session.execute(select(*record.columns(table)))
+				tables.append([record(*row) for row in rows])
+		self.index = CatalogIndex.build(*tables)
+		logger.info('catalog replica loaded: %d menus, %d submenus, %d dishes', *map(len, tables))
+
+	async def _refresh(self, session: AsyncSession, entity: str, id_: uuid.UUID) -> None:
+		"""Функция, которая перечитывает объект из БД: обновляет его в индексах или удаляет, если строки нет."""
+		table, record = RECORDS[entity]
+		row = (await session.execute(select(*record.columns(table)).where(table.c.id == id_))).first()
+		if row is None:
+			getattr(self.index, f'remove_{entity}')(id_)
+		else:
+			getattr(self.index, f'put_{entity}')(record(*row))
+
+	async def apply(self, data: dict[str, Any]) -> None:
+		"""
+		Функция, которая применяет событие об изменении каталога (payload notify_change) к индексам.
+
+		Событие без типа объекта (импорт каталога) приводит к полной загрузке.
+		"""
+		entity = data.get('type')
+		if entity not in RECORDS:
+			await self.reload()
+			return
+		async with self.session_maker() as session:
+			if entity == 'dish' and 'id' not in data:
+				# Пачка dish: событие содержит только submenu.
+				submenu_id = uuid.UUID(data['submenu_id'])
+				rows = await session.execute(select(*DishRecord.columns(dish_tbl)).where(dish_tbl.c.submenu_id == submenu_id))
+				self.index.replace_dishes(submenu_id, [DishRecord(*row) for row in rows])
+			elif entity != 'menu':
+				await self._refresh(session, entity, uuid.UUID(data['id']))
+			if 'submenu_id' in data:
+				await self._refresh(session, 'submenu', uuid.UUID(data['submenu_id']))
+			await self._refresh(session, 'menu', uuid.UUID(data['menu_id']))
+
+	async def _recover(self) -> None:
+		"""Функция, которая подписывается на события заново (если нужно) и загружает каталог, пока это не удастся."""
+		while True:
+			try:
+				if self._queue is None:
+					self._queue = await self.broadcaster.subscribe(maxsize=0)
+				await self.reload()
+				return
+			except Exception:
+				logger.exception('cannot reload catalog replica')
+				await asyncio.sleep(CATALOG_REPLICA_RETRY_SECONDS)
+
+	async def _follow(self) -> None:
+		while True:
+			event = await self._queue.get()
+			if event is None:
+				# Подписка закрыта (соединение с LISTEN потеряно): события за это время могли пропасть.
+				self._queue = None
+				await self._recover()
+				continue
+			try:
+				await self.apply(event.data)
+			except Exception:
+				logger.exception('cannot apply catalog event %s', event.data)
+				await self._recover()
+
+
+catalog_replica = CatalogReplica(async_session_maker, broadcaster)
+
+
+def get_catalog_replica() -> CatalogReplica:
+	return catalog_replica
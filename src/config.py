@@ -15,5 +15,102 @@ DB_NAME_TEST = os.environ.get('DB_NAME_TEST')
 DB_USER_TEST = os.environ.get('DB_USER_TEST')
 DB_PASS_TEST = os.environ.get('DB_PASS_TEST')
 
+# Реплика только для чтения, по умолчанию совпадает с основной БД.
+DB_HOST_REPLICA = os.environ.get('DB_HOST_REPLICA', DB_HOST)
+DB_PORT_REPLICA = os.environ.get('DB_PORT_REPLICA', DB_PORT)
+DB_NAME_REPLICA = os.environ.get('DB_NAME_REPLICA', DB_NAME)
+DB_USER_REPLICA = os.environ.get('DB_USER_REPLICA', DB_USER)
+DB_PASS_REPLICA = os.environ.get('DB_PASS_REPLICA', DB_PASS)
+
+DB_HOST_REPLICA_TEST = os.environ.get('DB_HOST_REPLICA_TEST', DB_HOST_TEST)
+DB_PORT_REPLICA_TEST = os.environ.get('DB_PORT_REPLICA_TEST', DB_PORT_TEST)
+DB_NAME_REPLICA_TEST = os.environ.get('DB_NAME_REPLICA_TEST', DB_NAME_TEST)
+DB_USER_REPLICA_TEST = os.environ.get('DB_USER_REPLICA_TEST', DB_USER_TEST)
+DB_PASS_REPLICA_TEST = os.environ.get('DB_PASS_REPLICA_TEST', DB_PASS_TEST)
+
+# Сколько секунд после записи чтения клиента идут в основную БД (read-your-writes), 0 - сразу в реплику.
+READ_YOUR_WRITES_SECONDS = float(os.environ.get('READ_YOUR_WRITES_SECONDS', 5))
+
 
 SECRET = os.environ.get("SECRET")
+
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'memory')
+CACHE_TTL = int(os.environ.get('CACHE_TTL', 60))
+CACHE_MAX_SIZE = int(os.environ.get('CACHE_MAX_SIZE', 1024))
+CACHE_MAX_BYTES = int(os.environ.get('CACHE_MAX_BYTES', 64 * 1024 * 1024))
+REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+
+DEFAULT_PAGE_LIMIT = int(os.environ.get('DEFAULT_PAGE_LIMIT', 100))
+MAX_PAGE_LIMIT = int(os.environ.get('MAX_PAGE_LIMIT', 1000))
+
+BULK_MAX_DISHES = int(os.environ.get('BULK_MAX_DISHES', 10000))
+BULK_COPY_THRESHOLD = int(os.environ.get('BULK_COPY_THRESHOLD', 1000))
+
+# Максимальное кол-во id в одном запросе dishes:batchGet и submenus:batchGet.
+BATCH_GET_MAX_IDS = int(os.environ.get('BATCH_GET_MAX_IDS', 100))
+
+# stored - счётчики submenus_count/dishes_count из колонок menu, live - подсчёт по таблицам submenu и dish.
+MENU_COUNTS_STRATEGY = os.environ.get('MENU_COUNTS_STRATEGY', 'stored')
+
+# Пул соединений с БД. DB_CONNECTION_BUDGET - общий лимит соединений приложения к Postgres,
+# WEB_CONCURRENCY - кол-во воркеров (uvicorn/gunicorn), на каждого воркера приходится своя доля лимита.
+DB_CONNECTION_BUDGET = int(os.environ.get('DB_CONNECTION_BUDGET', 80))
+WEB_CONCURRENCY = int(os.environ.get('WEB_CONCURRENCY', 1))
+_DB_CONNECTIONS_PER_WORKER = max(1, DB_CONNECTION_BUDGET // WEB_CONCURRENCY)
+DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', _DB_CONNECTIONS_PER_WORKER // 4))
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', max(1, _DB_CONNECTIONS_PER_WORKER - DB_MAX_OVERFLOW)))
+DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 30))
+DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true'
+# Кэш подготовленных выражений asyncpg (statement_cache_size) и диалекта SQLAlchemy, 0 - для pgbouncer в режиме transaction.
+DB_STATEMENT_CACHE_SIZE = int(os.environ.get('DB_STATEMENT_CACHE_SIZE', 100))
+DB_PREPARED_STATEMENT_CACHE_SIZE = int(os.environ.get('DB_PREPARED_STATEMENT_CACHE_SIZE', 100))
+
+# Выражения дольше порога (в миллисекундах) пишутся в лог медленных запросов.
+SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 200))
+
+# Автодополнение: максимальное кол-во подсказок и in-process LRU популярных префиксов (размер и TTL в секундах).
+AUTOCOMPLETE_MAX_LIMIT = int(os.environ.get('AUTOCOMPLETE_MAX_LIMIT', 20))
+AUTOCOMPLETE_CACHE_SIZE = int(os.environ.get('AUTOCOMPLETE_CACHE_SIZE', 1024))
+AUTOCOMPLETE_CACHE_TTL = int(os.environ.get('AUTOCOMPLETE_CACHE_TTL', 30))
+
+# Выгрузка каталога: кол-во строк, которое читается из серверного курсора БД за один раз.
+EXPORT_FETCH_SIZE = int(os.environ.get('EXPORT_FETCH_SIZE', 1000))
+
+# Импорт каталога: кол-во строк файла в одной порции COPY и размер тела запроса, до которого оно хранится в памяти
+# (больше - во временном файле).
+IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', 10000))
+IMPORT_SPOOL_SIZE = int(os.environ.get('IMPORT_SPOOL_SIZE', 16 * 1024 * 1024))
+
+# События об изменении каталога (SSE): интервал комментария keepalive, размер очереди подписчика (при переполнении
+# медленный клиент отключается) и пауза перед переподключением клиента в миллисекундах.
+EVENTS_KEEPALIVE_SECONDS = float(os.environ.get('EVENTS_KEEPALIVE_SECONDS', 15))
+EVENTS_QUEUE_SIZE = int(os.environ.get('EVENTS_QUEUE_SIZE', 100))
+EVENTS_RETRY_MS = int(os.environ.get('EVENTS_RETRY_MS', 3000))
+
+# Инвалидация кэша между воркерами (при CACHE_BACKEND=memory): пауза перед повторной подпиской на события каталога,
+# если соединение с LISTEN потеряно.
+CACHE_BUS_RECONNECT_SECONDS = float(os.environ.get('CACHE_BUS_RECONNECT_SECONDS', 1))
+
+# Сколько секунд запрос ждёт загрузку того же значения, начатую другим запросом (single-flight), прежде чем
+# выполнить запрос к БД сам.
+SINGLE_FLIGHT_TIMEOUT = float(os.environ.get('SINGLE_FLIGHT_TIMEOUT', 2))
+
+# Мягкий TTL кэша: сколько секунд значение считается свежим. После него и до CACHE_TTL устаревшее значение отдаётся
+# сразу, а новое загружается в фоне. CACHE_EARLY_REFRESH_BETA - насколько досрочно (случайно) начинается обновление,
+# 0 - ровно по мягкому TTL.
+CACHE_SOFT_TTL = float(os.environ.get('CACHE_SOFT_TTL', 30))
+CACHE_EARLY_REFRESH_BETA = float(os.environ.get('CACHE_EARLY_REFRESH_BETA', 1))
+
+# Сжатие ответов GET menu, submenu и dish: минимальный размер тела в байтах, уровень gzip и лимиты in-process кэша
+# сжатых тел (кол-во и суммарный размер в байтах).
+GZIP_MIN_SIZE = int(os.environ.get('GZIP_MIN_SIZE', 1024))
+GZIP_LEVEL = int(os.environ.get('GZIP_LEVEL', 6))
+GZIP_CACHE_SIZE = int(os.environ.get('GZIP_CACHE_SIZE', 4096))
+GZIP_CACHE_MAX_BYTES = int(os.environ.get('GZIP_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+
+# Режим реплики каталога в памяти процесса: menu, submenu и dish загружаются при старте, GET-запросы каталога
+# обслуживаются из памяти, изменения применяются по событиям LISTEN/NOTIFY. Пауза перед повторной подпиской на
+# события, если соединение потеряно.
+CATALOG_REPLICA = os.environ.get('CATALOG_REPLICA', 'false').lower() == 'true'
+CATALOG_REPLICA_RETRY_SECONDS = float(os.environ.get('CATALOG_REPLICA_RETRY_SECONDS', 1))
@@ -1,21 +1,112 @@
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Callable, Optional, Union
 
-from sqlalchemy import MetaData
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from fastapi import Request
+from sqlalchemy import DDL, URL, MetaData, event, make_url
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeMeta
 from sqlalchemy.orm import declarative_base
 
-from src.config import DB_USER, DB_PASS, DB_HOST, DB_PORT, DB_NAME
+from src.config import DB_USER, DB_PASS, DB_HOST, DB_PORT, DB_NAME, DB_USER_REPLICA, DB_PASS_REPLICA, \
+	DB_HOST_REPLICA, DB_PORT_REPLICA, DB_NAME_REPLICA, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, \
+	DB_POOL_RECYCLE, DB_POOL_PRE_PING, DB_STATEMENT_CACHE_SIZE, DB_PREPARED_STATEMENT_CACHE_SIZE
+from src.metrics.sql import instrument_engine
+from src.pool import MeteredQueuePool
+from src.replica import is_sticky
 
 DATABASE_URL = f'postgresql+asyncpg://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}'
+REPLICA_DATABASE_URL = f'postgresql+asyncpg://{DB_USER_REPLICA}:{DB_PASS_REPLICA}@{DB_HOST_REPLICA}:{DB_PORT_REPLICA}/' \
+					   f'{DB_NAME_REPLICA}'
+
+
+def listen_dsn(url: Union[str, URL]) -> str:
+	"""Функция, которая превращает адрес БД SQLAlchemy в DSN для отдельного соединения asyncpg (LISTEN/NOTIFY)."""
+	return make_url(url).set(drivername='postgresql').render_as_string(hide_password=False)
+
+
+# Ключ session.info, в котором сессия реплики хранит engine основной БД. Реплика может отставать от записей,
+# поэтому значения, загруженные из неё, не записываются в общий кэш (см. read_through).
+PRIMARY_BIND = 'primary_bind'
+
+
+def primary_bind(session: AsyncSession) -> Optional[AsyncEngine]:
+	"""Функция, которая возвращает engine основной БД, если сессия открыта на реплике, иначе None."""
+	return session.info.get(PRIMARY_BIND)
+
 
 Base: DeclarativeMeta = declarative_base()
 metadata = MetaData()
+# Расширения, от которых зависят индексы схемы, для создания схемы без миграций (тесты, бенчмарки).
+event.listen(metadata, 'before_create', DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm').execute_if(dialect='postgresql'))
+
+
+def create_engine(url: str) -> AsyncEngine:
+	"""Функция, которая создаёт engine с настройками пула из src/config.py и учётом выполненных выражений."""
+	new_engine = create_async_engine(
+		url,
+		poolclass=MeteredQueuePool,
+		pool_size=DB_POOL_SIZE,
+		max_overflow=DB_MAX_OVERFLOW,
+		pool_timeout=DB_POOL_TIMEOUT,
+		pool_recycle=DB_POOL_RECYCLE,
+		pool_pre_ping=DB_POOL_PRE_PING,
+		connect_args={
+			'statement_cache_size': DB_STATEMENT_CACHE_SIZE,
+			'prepared_statement_cache_size': DB_PREPARED_STATEMENT_CACHE_SIZE,
+		},
+	)
+	instrument_engine(new_engine)
+	return new_engine
 
-engine = create_async_engine(DATABASE_URL)
+
+engine = create_engine(DATABASE_URL)
+# Если реплика не задана отдельно, чтения идут через тот же engine и пул.
+read_engine = engine if REPLICA_DATABASE_URL == DATABASE_URL else create_engine(REPLICA_DATABASE_URL)
 async_session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+async_read_session_maker = async_sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False)
 
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
 	async with async_session_maker() as session:
 		yield session
+
+
+def read_session_dependency(write_session_maker: async_sessionmaker, read_session_maker: async_sessionmaker) \
+		-> Callable[[Request], AsyncGenerator[AsyncSession, None]]:
+	"""
+	Функция, которая создаёт зависимость сессии для чтения.
+
+	Сессия открывается на реплике, а для клиента, у которого недавно была запись, - на основной БД (read-your-writes).
+	Сессия реплики хранит engine основной БД в session.info[PRIMARY_BIND]: кэш заполняется только из основной БД.
+	"""
+	write_bind = write_session_maker.kw['bind']
+	separate_replica = read_session_maker.kw['bind'] is not write_bind
+
+	async def get_read_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+		if is_sticky(request) or not separate_replica:
+			async with write_session_maker() as session:
+				yield session
+			return
+		async with read_session_maker() as session:
+			session.info[PRIMARY_BIND] = write_bind
+			yield session
+
+	return get_read_session
+
+
+get_read_session = read_session_dependency(async_session_maker, async_read_session_maker)
+
+
+def read_session_maker_dependency(write_session_maker: async_sessionmaker, read_session_maker: async_sessionmaker) \
+		-> Callable[[Request], async_sessionmaker]:
+	"""
+	Функция, которая создаёт зависимость фабрики сессий для чтения (с тем же выбором БД, что и get_read_session).
+
+	Нужна потоковым ответам: они читают из БД после выхода из роутера, когда сессия из get_read_session уже закрыта.
+	"""
+	def get_read_session_maker(request: Request) -> async_sessionmaker:
+		return write_session_maker if is_sticky(request) else read_session_maker
+
+	return get_read_session_maker
+
+
+get_read_session_maker = read_session_maker_dependency(async_session_maker, async_read_session_maker)
@@ -1,7 +1,9 @@
-from sqlalchemy import Table, Column, String, ForeignKey
-from sqlalchemy import Uuid
+from sqlalchemy import Table, Column, String, ForeignKey, Index, Numeric, Computed
+from sqlalchemy import Uuid, BigInteger
+from sqlalchemy.dialects.postgresql import TSVECTOR
 
 from src.database import metadata
+from src.menu.models import catalog_version_seq
 from src.submenu.models import submenu
 
 # Таблица блюд.
@@ -11,6 +13,19 @@ dish = Table(
 	Column('id', Uuid, primary_key=True),
 	Column('title', String(50), nullable=False),
 	Column('description', String(200), default=None),
-	Column('price', String, default=None),
-	Column('submenu_id', Uuid, ForeignKey(submenu.c.id, ondelete='CASCADE')),
+	Column('price', Numeric(10, 2), nullable=False),
+	Column('submenu_id', Uuid, ForeignKey(submenu.c.id, ondelete='CASCADE'), nullable=False),
+	Column('version', BigInteger, nullable=False, server_default=catalog_version_seq.next_value()),
+	# Вектор полнотекстового поиска: название с весом A, описание с весом B.
+	Column('search_vector', TSVECTOR, Computed(
+		"setweight(to_tsvector('simple', title), 'A') || setweight(to_tsvector('simple', coalesce(description, '')), 'B')",
+		persisted=True,
+	)),
+	# Индекс по FK для списка dish (keyset-пагинация по id) и каскадного удаления submenu.
+	Index('ix_dish_submenu_id_id', 'submenu_id', 'id'),
+	# Индекс для фильтра по цене и списка dish, отсортированного по цене (keyset-пагинация по price, id).
+	Index('ix_dish_submenu_id_price_id', 'submenu_id', 'price', 'id'),
+	Index('ix_dish_search_vector', 'search_vector', postgresql_using='gin'),
+	# Триграммный индекс для автодополнения по префиксу и нечёткому совпадению названия (pg_trgm).
+	Index('ix_dish_title_trgm', 'title', postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'}),
 )
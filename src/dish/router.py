@@ -1,12 +1,18 @@
 import uuid
-from typing import List, Union
+from typing import Annotated, List, Union
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Body, Depends, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database import get_async_session
-from src.dish.schemas import GetSearchDishes, CreateDish, ErrorResponse, DataUpdateDish, UpdateDish, DeleteDish
-from src.dish.services import get_all_dishes, create_new_dish, get_dish_id, delete_dish, update_dish
+from src.config import BATCH_GET_MAX_IDS, BULK_MAX_DISHES
+from src.database import get_async_session, get_read_session
+from src.dish.schemas import GetSearchDishes, CreateDish, ErrorResponse, DataUpdateDish, UpdateDish, DeleteDish, \
+	DishFilters, BatchGetDish
+from src.dish.services import get_all_dishes, create_new_dish, create_new_dishes, get_dish_id, delete_dish, update_dish, \
+	get_dish_etag, get_dishes_etag, get_dishes_by_ids
+from src.etag import is_not_modified, not_modified
+from src.pagination import PageParams, set_next_cursor
+from src.rendering import versioned_json_response
 
 # Роутер для управления dish
 router = APIRouter(
@@ -17,9 +23,15 @@ router = APIRouter(
 
 # Роутер для получения списка всех dish.
 @router.get("/menus/{menu_id}/submenus/{submenu_id}/dishes", response_model=List[GetSearchDishes])
-async def get_dishes(submenu_id: uuid.UUID, session: AsyncSession = Depends(get_async_session)):
-	answer = await get_all_dishes(submenu_id, session)
-	return answer
+async def get_dishes(submenu_id: uuid.UUID, request: Request, params: PageParams = Depends(),
+					 filters: DishFilters = Depends(), session: AsyncSession = Depends(get_read_session)):
+	etag = await get_dishes_etag(submenu_id, session)
+	if is_not_modified(request, etag):
+		return not_modified(request, etag)
+	page = await get_all_dishes(submenu_id, params, filters, session)
+	response = await versioned_json_response(request, page.body, etag)
+	set_next_cursor(response, page)
+	return response
 
 
 # Роутер для создания dish.
@@ -31,12 +43,33 @@ async def create_dish(menu_id: uuid.UUID, submenu_id: uuid.UUID,
 	return answer
 
 
+# Роутер для создания пачки dish.
+@router.post("/menus/{menu_id}/submenus/{submenu_id}/dishes/bulk", response_model=List[GetSearchDishes],
+			 status_code=status.HTTP_201_CREATED)
+async def create_dishes(menu_id: uuid.UUID, submenu_id: uuid.UUID,
+						values: Annotated[List[CreateDish], Body(min_length=1, max_length=BULK_MAX_DISHES)],
+						session: AsyncSession = Depends(get_async_session)):
+	answer = await create_new_dishes(menu_id, submenu_id, values, session)
+	return answer
+
+
+# Роутер для получения нескольких dish по id одним запросом (в порядке id, с признаком found).
+@router.get("/dishes:batchGet", response_model=List[BatchGetDish])
+async def batch_get_dishes(ids: List[uuid.UUID] = Query([], max_length=BATCH_GET_MAX_IDS),
+						   session: AsyncSession = Depends(get_read_session)):
+	answer = await get_dishes_by_ids(ids, session)
+	return Response(content=answer, media_type="application/json")
+
+
 # Роутер для получения dish по id.
 @router.get("/menus/{menu_id}/submenus/{submenu_id}/dishes/{dish_id}",
 			response_model=Union[GetSearchDishes, ErrorResponse])
-async def get_dish_by_id(dish_id: uuid.UUID, session: AsyncSession = Depends(get_async_session)):
-	answer = await get_dish_id(dish_id, session)
-	return answer
+async def get_dish_by_id(dish_id: uuid.UUID, request: Request, session: AsyncSession = Depends(get_read_session)):
+	etag = await get_dish_etag(dish_id, session)
+	if is_not_modified(request, etag):
+		return not_modified(request, etag)
+	response = await versioned_json_response(request, await get_dish_id(dish_id, session), etag)
+	return response
 
 
 # Роутер для обновления dish по id.
@@ -1,4 +1,26 @@
-from pydantic import BaseModel, UUID4
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Annotated, Literal, Optional
+
+from fastapi import Query
+from pydantic import AfterValidator, BaseModel, UUID4
+
+# Цена хранится в numeric(10, 2): два знака после запятой и не больше 8 знаков в целой части.
+PRICE_STEP = Decimal('0.01')
+MAX_PRICE = Decimal('100000000')
+
+
+def normalize_price(value: str) -> str:
+	"""Функция, которая приводит цену к строке с двумя знаками после запятой без перехода через float."""
+	try:
+		price = Decimal(value).quantize(PRICE_STEP, rounding=ROUND_HALF_UP)
+	except ArithmeticError:
+		raise ValueError('invalid price')
+	if not price.is_finite() or not 0 <= price < MAX_PRICE:
+		raise ValueError('invalid price')
+	return str(price)
+
+
+Price = Annotated[str, AfterValidator(normalize_price)]
 
 
 class GetSearchDishes(BaseModel):
@@ -11,13 +33,13 @@ class GetSearchDishes(BaseModel):
 class DataUpdateDish(BaseModel):
 	title: str | None = None
 	description: str | None = None
-	price: str | None = None
+	price: Price | None = None
 
 
 class CreateDish(BaseModel):
 	title: str
 	description: str
-	price: str
+	price: Price
 
 
 class UpdateDish(BaseModel):
@@ -34,3 +56,31 @@ class DeleteDish(BaseModel):
 
 class ErrorResponse(BaseModel):
 	detail: str
+
+
+class BatchGetDish(BaseModel):
+	id: UUID4
+	found: bool
+	dish: Optional[GetSearchDishes] = None
+
+
+class DishFilters:
+	"""
+	Фильтры и сортировка списка dish.
+
+	- min_price, max_price - границы цены включительно.
+	- sort - порядок списка: id (по умолчанию) или price (по возрастанию цены).
+	"""
+
+	def __init__(self, min_price: Optional[Decimal] = Query(None, ge=0),
+				 max_price: Optional[Decimal] = Query(None, ge=0),
+				 sort: Literal['id', 'price'] = 'id'):
+		self.min_price = min_price
+		self.max_price = max_price
+		self.sort = sort
+
+	@property
+	def cache_field(self) -> str:
+		# Граница 0 - тоже фильтр (max_price=0 оставляет только бесплатные dish), поэтому сравнение с None.
+		return f'{"" if self.min_price is None else self.min_price}:{"" if self.max_price is None else self.max_price}:' \
+			   f'{self.sort}'
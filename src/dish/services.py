@@ -1,33 +1,59 @@
+import time
 import uuid
-from typing import List, Union
+from decimal import Decimal
+from typing import List, Optional, Sequence, Union
 
 from fastapi import HTTPException
-from sqlalchemy import select, insert, update, delete
+from sqlalchemy import select, insert, update, delete, func, any_, bindparam, Uuid
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.cache.keys import menus_key, menu_key, submenus_key, submenu_key, dishes_key, dish_key, ETAG_FIELD
+from src.cache.services import read_through, invalidate
+from src.config import BULK_COPY_THRESHOLD
 from src.dish.models import dish as dish_tbl
-from src.dish.schemas import GetSearchDishes, CreateDish, ErrorResponse, DataUpdateDish, UpdateDish, DeleteDish
-from src.menu.models import menu as menu_tbl
+from src.dish.schemas import GetSearchDishes, CreateDish, ErrorResponse, DataUpdateDish, UpdateDish, DeleteDish, \
+	DishFilters
+from src.etag import make_etag
+from src.events.services import notify_change
+from src.menu.models import menu as menu_tbl, catalog_version_seq
+from src.metrics.sql import record_statement
+from src.pagination import PageParams, RenderedPage, paginate, render_page
+from src.rendering import render_batch, render_row, row_object
 from src.submenu.models import submenu as submenu_tbl
 
 
-async def get_all_dishes(submenu_id: uuid.UUID, session: AsyncSession) -> List[GetSearchDishes]:
+# Колонки dish, которые отдаются в ответах API.
+dish_fields = (dish_tbl.c.id, dish_tbl.c.title, dish_tbl.c.description, dish_tbl.c.price)
+# Максимальное кол-во параметров в одном запросе asyncpg: multi-row INSERT пачки dish разбивается на части под него.
+MAX_QUERY_PARAMS = 32767
+
+
+async def get_all_dishes(submenu_id: uuid.UUID, params: PageParams, filters: DishFilters,
+						 session: AsyncSession) -> RenderedPage:
 	"""
-	Функция, которая выполняет поиск всех dishes.
+	Функция, которая выполняет поиск страницы dishes.
 
-	Принимает 2 аргумент:
+	Принимает 4 аргумента:
 	- session - экземпляр, который обеспечивает асинхронное взаимодействие с БД.
 	- submenu_id - uuid submenu, к которому относятся искомые dishes.
+	- params - параметры keyset-пагинации (limit и cursor).
+	- filters - фильтр по цене и сортировка (по id или по цене).
 
-	Возвращает найденный список объектов класса dishes.
+	Возвращает найденную страницу объектов класса dishes, сериализованную в JSON.
 	"""
-	query = select(dish_tbl).where(dish_tbl.c.submenu_id == submenu_id)
-	rez_query = await session.execute(query)
-	rezult = [GetSearchDishes(id=data.id, title=data.title,
-							  description=data.description,
-							  price=data.price)
-			  for data in rez_query]
-	return rezult
+	async def load(session: AsyncSession) -> RenderedPage:
+		query = select(*dish_fields).where(dish_tbl.c.submenu_id == submenu_id)
+		if filters.min_price is not None:
+			query = query.where(dish_tbl.c.price >= filters.min_price)
+		if filters.max_price is not None:
+			query = query.where(dish_tbl.c.price <= filters.max_price)
+		sort_column = dish_tbl.c.price if filters.sort == 'price' else None
+		rez_query = await session.execute(paginate(query, dish_tbl.c.id, params, sort_column))
+		return render_page(rez_query.fetchall(), params, sort_column)
+
+	return await read_through(dishes_key(submenu_id), RenderedPage, load, session,
+							  f'{params.cache_field}:{filters.cache_field}')
 
 
 async def create_new_dish(menu_id: uuid.UUID, submenu_id: uuid.UUID,
@@ -45,28 +71,83 @@ async def create_new_dish(menu_id: uuid.UUID, submenu_id: uuid.UUID,
 	Возвращает созданный объект класса dish.
 	"""
 	id_uuid = uuid.uuid4()
-	new_values.price = "{:.2f}".format(float(new_values.price))
-	stmt_create = insert(dish_tbl).values(id=id_uuid, title=new_values.title,
-										  description=new_values.description,
-										  price=new_values.price, submenu_id=submenu_id)
+	created = insert(dish_tbl).values(id=id_uuid, title=new_values.title,
+									  description=new_values.description,
+									  price=Decimal(new_values.price), submenu_id=submenu_id) \
+		.returning(notify_change('create', 'dish', id=dish_tbl.c.id, submenu_id=dish_tbl.c.submenu_id, menu_id=menu_id)) \
+		.cte('created')
 
-	stmt_update_submenu = update(submenu_tbl).where(submenu_tbl.c.id == submenu_id) \
-		.values(dishes_count=submenu_tbl.c.dishes_count + 1)
+	updated_submenu = update(submenu_tbl).where(submenu_tbl.c.id == submenu_id) \
+		.values(dishes_count=submenu_tbl.c.dishes_count + 1, version=catalog_version_seq.next_value()).cte('updated_submenu')
 
-	stmt_update_menu = update(menu_tbl).where(menu_tbl.c.id == menu_id) \
-		.values(dishes_count=menu_tbl.c.dishes_count + 1)
+	stmt = update(menu_tbl).where(menu_tbl.c.id == menu_id) \
+		.values(dishes_count=menu_tbl.c.dishes_count + 1, version=catalog_version_seq.next_value()).add_cte(created, updated_submenu)
 
-	await session.execute(stmt_create)
-	await session.execute(stmt_update_submenu)
-	await session.execute(stmt_update_menu)
+	await session.execute(stmt)
 	await session.commit()
+	await invalidate(menus_key(), menu_key(menu_id), submenus_key(menu_id),
+					 submenu_key(submenu_id), dishes_key(submenu_id))
 	rezult = GetSearchDishes(id=id_uuid, title=new_values.title,
 							 description=new_values.description,
 							 price=new_values.price)
 	return rezult
 
 
-async def get_dish_id(dish_id: uuid.UUID, session: AsyncSession) -> GetSearchDishes:
+async def create_new_dishes(menu_id: uuid.UUID, submenu_id: uuid.UUID,
+							 new_values: List[CreateDish], session: AsyncSession) -> List[GetSearchDishes]:
+	"""
+	Функция, которая создаёт пачку объектов класса dish в одной транзакции.
+	Счётчики submenu и menu увеличиваются на размер пачки одним запросом.
+
+	Принимает 4 аргументa:
+	- session - экземпляр, который обеспечивает асинхронное взаимодействие с БД.
+	- new_values - список schema pydantic c атрибутами для создания объектов класса dish.
+	- submenu_id - uuid submenu, к которому должны относятся объекты dish.
+	- menu_id - uuid menu, к которому должны относятся объекты dish.
+
+	Возвращает созданные объекты класса dish в порядке запроса.
+	"""
+	batch_size = len(new_values)
+	bumped_submenu = update(submenu_tbl).where(submenu_tbl.c.id == submenu_id) \
+		.values(dishes_count=submenu_tbl.c.dishes_count + batch_size, version=catalog_version_seq.next_value()) \
+		.returning(submenu_tbl.c.menu_id).cte('bumped_submenu')
+	stmt_update_counters = update(menu_tbl) \
+		.where(menu_tbl.c.id == menu_id, menu_tbl.c.id.in_(select(bumped_submenu.c.menu_id))) \
+		.values(dishes_count=menu_tbl.c.dishes_count + batch_size, version=catalog_version_seq.next_value()) \
+		.returning(menu_tbl.c.id, notify_change('create', 'dish', count=batch_size, submenu_id=submenu_id,
+												menu_id=menu_tbl.c.id))
+	result = await session.execute(stmt_update_counters)
+	if result.fetchone() is None:
+		await session.rollback()
+		raise HTTPException(status_code=404, detail="submenu not found")
+
+	rezult = [GetSearchDishes(id=uuid.uuid4(), title=values.title,
+							  description=values.description,
+							  price=values.price)
+			  for values in new_values]
+	if batch_size >= BULK_COPY_THRESHOLD:
+		connection = await session.connection()
+		raw_connection = await connection.get_raw_connection()
+		# COPY идёт мимо курсора SQLAlchemy, поэтому учитывается в статистике запроса вручную.
+		start = time.perf_counter()
+		await raw_connection.driver_connection.copy_records_to_table(
+			dish_tbl.name,
+			records=[(data.id, data.title, data.description, Decimal(data.price), submenu_id) for data in rezult],
+			columns=['id', 'title', 'description', 'price', 'submenu_id'],
+		)
+		record_statement(f'COPY {dish_tbl.name}', time.perf_counter() - start)
+	else:
+		rows = [dict(data.model_dump(), price=Decimal(data.price), submenu_id=submenu_id) for data in rezult]
+		chunk_size = MAX_QUERY_PARAMS // len(rows[0])
+		for start in range(0, len(rows), chunk_size):
+			await session.execute(insert(dish_tbl).values(rows[start:start + chunk_size]))
+	await session.commit()
+	await invalidate(menus_key(), menu_key(menu_id), submenus_key(menu_id),
+					 submenu_key(submenu_id), dishes_key(submenu_id))
+	return rezult
+
+
+async def get_dish_id(dish_id: uuid.UUID, session: AsyncSession) -> bytes:
 	"""
 	Функция, которая выполняет поиск dish по id.
 
@@ -74,17 +155,69 @@ async def get_dish_id(dish_id: uuid.UUID, session: AsyncSession) -> GetSearchDis
 	- session - экземпляр, который обеспечивает асинхронное взаимодействие с БД.
 	- dish_id - uuid искомого dish.
 
-	Возвращает найденный объект класса dish.
+	Возвращает найденный объект класса dish, сериализованный в JSON.
 	"""
-	query = select(dish_tbl).where(dish_tbl.c.id == dish_id)
-	query_exc = await session.execute(query)
-	result_query = query_exc.fetchone()
-	if result_query is None:
-		raise HTTPException(status_code=404, detail="dish not found")
-	rezult = GetSearchDishes(id=result_query.id, title=result_query.title,
-							 description=result_query.description,
-							 price=result_query.price)
-	return rezult
+	async def load(session: AsyncSession) -> bytes:
+		query = select(*dish_fields).where(dish_tbl.c.id == dish_id)
+		query_exc = await session.execute(query)
+		result_query = query_exc.fetchone()
+		if result_query is None:
+			raise HTTPException(status_code=404, detail="dish not found")
+		return render_row(result_query)
+
+	return await read_through(dish_key(dish_id), bytes, load, session)
+
+
+async def get_dishes_by_ids(dish_ids: Sequence[uuid.UUID], session: AsyncSession) -> bytes:
+	"""
+	Функция, которая выполняет поиск нескольких dish по id одним запросом (id = ANY(:ids)).
+
+	Принимает 2 аргументa:
+	- session - экземпляр, который обеспечивает асинхронное взаимодействие с БД.
+	- dish_ids - uuid искомых dish.
+
+	Возвращает dish в порядке запрошенных id с признаком found (ненайденные - с dish null), сериализованные в JSON.
+	"""
+	if not dish_ids:
+		return b'[]'
+	query = select(*dish_fields).where(dish_tbl.c.id == any_(bindparam('ids', list(dish_ids), type_=ARRAY(Uuid))))
+	rez_query = await session.execute(query)
+	return render_batch(dish_ids, {row.id: row_object(row) for row in rez_query}, 'dish')
+
+
+async def get_dish_etag(dish_id: uuid.UUID, session: AsyncSession) -> Optional[str]:
+	"""
+	Функция, которая возвращает ETag dish по версии строки без загрузки самого объекта.
+
+	Принимает 2 аргументa:
+	- session - экземпляр, который обеспечивает асинхронное взаимодействие с БД.
+	- dish_id - uuid искомого dish.
+
+	Возвращает ETag или None, если объект не найден.
+	"""
+	async def load(session: AsyncSession) -> Optional[str]:
+		version = await session.scalar(select(dish_tbl.c.version).where(dish_tbl.c.id == dish_id))
+		return None if version is None else make_etag(version)
+
+	return await read_through(dish_key(dish_id), Optional[str], load, session, ETAG_FIELD)
+
+
+async def get_dishes_etag(submenu_id: uuid.UUID, session: AsyncSession) -> str:
+	"""
+	Функция, которая возвращает ETag списка dish по кол-ву строк и максимальной версии.
+
+	Принимает 2 аргументa:
+	- session - экземпляр, который обеспечивает асинхронное взаимодействие с БД.
+	- submenu_id - uuid submenu, к которому относятся dishes.
+
+	Возвращает ETag.
+	"""
+	async def load(session: AsyncSession) -> str:
+		query = select(func.count(), func.max(dish_tbl.c.version)).where(dish_tbl.c.submenu_id == submenu_id)
+		count, max_version = (await session.execute(query)).one()
+		return make_etag(count, max_version or 0)
+
+	return await read_through(dishes_key(submenu_id), str, load, session, ETAG_FIELD)
 
 
 async def update_dish(dish_id: uuid.UUID,
@@ -100,17 +233,23 @@ async def update_dish(dish_id: uuid.UUID,
 
 	Возвращает обновлённый объект класса dish.
 	"""
-	update_values.price = "{:.2f}".format(float(update_values.price))
-	stmt = update(dish_tbl).where(dish_tbl.c.id == dish_id).values(update_values.model_dump(exclude_none=True)) \
-		.returning(dish_tbl)
+	values = update_values.model_dump(exclude_none=True)
+	if 'price' in values:
+		values['price'] = Decimal(values['price'])
+	stmt = update(dish_tbl).where(dish_tbl.c.id == dish_id) \
+		.values(**values, version=catalog_version_seq.next_value()) \
+		.returning(*dish_fields, dish_tbl.c.submenu_id, notify_change(
+			'update', 'dish', id=dish_tbl.c.id, submenu_id=dish_tbl.c.submenu_id,
+			menu_id=select(submenu_tbl.c.menu_id).where(submenu_tbl.c.id == dish_tbl.c.submenu_id).scalar_subquery()))
 	result_stmt = await session.execute(stmt)
 	result = result_stmt.fetchone()
 	if result is None:
 		return ErrorResponse(detail="submenu not found")
 	rezult_data = UpdateDish(id=result.id, title=result.title,
 							 description=result.description,
-							 price=result.price)
+							 price=str(result.price))
 	await session.commit()
+	await invalidate(dish_key(dish_id), dishes_key(result.submenu_id))
 	return rezult_data
 
 
@@ -128,15 +267,19 @@ async def delete_dish(menu_id: uuid.UUID, submenu_id: uuid.UUID,
 
 	Возвращает статус выполнения.
 	"""
-	stmt = delete(dish_tbl).where(dish_tbl.c.id == dish_id)
+	# Счётчики обновляются в том же запросе и только если dish действительно удалён.
+	deleted = delete(dish_tbl).where(dish_tbl.c.id == dish_id).returning(dish_tbl.c.id, notify_change(
+		'delete', 'dish', id=dish_tbl.c.id, submenu_id=dish_tbl.c.submenu_id, menu_id=menu_id)).cte('deleted')
+	is_deleted = select(deleted.c.id).exists()
+	updated_submenu = update(submenu_tbl).where(submenu_tbl.c.id == submenu_id, is_deleted) \
+		.values(dishes_count=submenu_tbl.c.dishes_count - 1, version=catalog_version_seq.next_value()).cte('updated_submenu')
+	updated_menu = update(menu_tbl).where(menu_tbl.c.id == menu_id, is_deleted) \
+		.values(dishes_count=menu_tbl.c.dishes_count - 1, version=catalog_version_seq.next_value()).cte('updated_menu')
+	stmt = select(deleted.c.id).add_cte(updated_submenu, updated_menu)
 	result = await session.execute(stmt)
-	if result.rowcount:
-		stmt_update_submenu = update(submenu_tbl).where(submenu_tbl.c.id == submenu_id) \
-			.values(dishes_count=submenu_tbl.c.dishes_count - 1)
-		stmt_update_menu = update(menu_tbl).where(menu_tbl.c.id == menu_id) \
-			.values(dishes_count=menu_tbl.c.dishes_count - 1)
-		await session.execute(stmt_update_submenu)
-		await session.execute(stmt_update_menu)
+	if result.fetchone() is not None:
 		await session.commit()
+		await invalidate(menus_key(), menu_key(menu_id), submenus_key(menu_id),
+						 submenu_key(submenu_id), dishes_key(submenu_id), dish_key(dish_id))
 		return DeleteDish(status=True, message="The dish has been deleted")
 	return DeleteDish(status=False, message="The dish has not been deleted")
@@ -0,0 +1,52 @@
+from typing import Optional
+
+from fastapi import Request, Response, status
+
+
+def make_etag(*parts) -> str:
+	"""Функция, которая формирует strong ETag из версии строки или кол-ва и максимальной версии строк списка."""
+	return '"' + '-'.join(str(part) for part in parts) + '"'
+
+
+def gzip_etag(etag: str) -> str:
+	"""Функция, которая формирует ETag сжатого в gzip представления: у разных представлений strong ETag различаются."""
+	return etag[:-1] + '-gzip"'
+
+
+def _matching_etag(request: Request, etag: Optional[str]) -> Optional[str]:
+	# Возвращает ETag представления (исходного или сжатого), совпавший с If-None-Match.
+	if etag is None:
+		return None
+	header = request.headers.get('if-none-match')
+	if header is None:
+		return None
+	candidates = [candidate.strip().removeprefix('W/') for candidate in header.split(',')]
+	if '*' in candidates or etag in candidates:
+		return etag
+	if gzip_etag(etag) in candidates:
+		return gzip_etag(etag)
+	return None
+
+
+def is_not_modified(request: Request, etag: Optional[str]) -> bool:
+	"""
+	Функция, которая проверяет, совпадает ли ETag c одним из значений заголовка If-None-Match.
+
+	Совпадением считается и ETag сжатого представления той же версии (gzip_etag).
+	"""
+	return _matching_etag(request, etag) is not None
+
+
+def not_modified(request: Request, etag: str) -> Response:
+	"""
+	Функция, которая формирует ответ 304.
+
+	ETag ответа - тот, что прислал клиент (исходного или сжатого представления), Vary - как у ответа 200.
+	"""
+	return Response(status_code=status.HTTP_304_NOT_MODIFIED,
+					headers={'ETag': _matching_etag(request, etag) or etag, 'Vary': 'Accept-Encoding'})
+
+
+def set_etag(response: Response, etag: Optional[str]) -> None:
+	if etag is not None:
+		response.headers['ETag'] = etag
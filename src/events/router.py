@@ -0,0 +1,24 @@
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+
+from src.events.services import EventBroadcaster, event_stream, get_event_broadcaster
+
+# Роутер для событий об изменении каталога
+router = APIRouter(
+	prefix='/api/v1',
+	tags=['Events']
+)
+
+
+# Роутер потока событий (Server-Sent Events) о создании, изменении и удалении menu, submenu и dish.
+@router.get("/events", response_class=StreamingResponse,
+			responses={200: {'content': {'text/event-stream': {}}}})
+async def get_events(menu_id: Optional[UUID] = None,
+					 broadcaster: EventBroadcaster = Depends(get_event_broadcaster)):
+	queue = await broadcaster.subscribe()
+	return StreamingResponse(event_stream(broadcaster, queue, None if menu_id is None else str(menu_id)),
+							 media_type='text/event-stream',
+							 headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
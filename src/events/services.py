@@ -0,0 +1,160 @@
+import asyncio
+import logging
+from itertools import chain
+from typing import Any, AsyncIterator, NamedTuple, Optional, Union
+
+import asyncpg
+import orjson
+from fastapi import HTTPException
+from sqlalchemy import ColumnElement, Label, Text, URL, cast, func, literal
+
+from src.config import EVENTS_KEEPALIVE_SECONDS, EVENTS_QUEUE_SIZE, EVENTS_RETRY_MS
+from src.database import DATABASE_URL, listen_dsn
+
+logger = logging.getLogger(__name__)
+
+# Канал Postgres, в который выражения записи отправляют события об изменении каталога.
+EVENTS_CHANNEL = 'catalog_events'
+
+
+def notify_change(action: str, entity: str, **ids: Any) -> Label:
+	"""
+	Функция, которая возвращает выражение pg_notify с событием об изменении каталога.
+
+	Выражение добавляется в RETURNING выражения записи, поэтому событие не требует отдельного обращения к БД.
+	NOTIFY транзакционный: событие доставляется слушателям только после COMMIT.
+
+	Принимает 3 аргумента:
+	- action - create, update или delete.
+	- entity - menu, submenu или dish.
+	- ids - id объекта и его родителей (колонки или значения), например id=..., submenu_id=..., menu_id=...
+
+	Возвращает колонку для RETURNING.
+	"""
+	fields = chain(('action', action, 'type', entity), *ids.items())
+	payload = func.json_build_object(*(value if isinstance(value, ColumnElement) else literal(value) for value in fields))
+	return func.pg_notify(EVENTS_CHANNEL, cast(payload, Text)).label('notified')
+
+
+class Event(NamedTuple):
+	"""Событие об изменении каталога: menu, к которому оно относится (None - весь каталог), payload и сообщение SSE."""
+	menu_id: Optional[str]
+	data: dict[str, Any]
+	message: bytes
+
+
+def render_event(payload: str) -> Event:
+	"""Функция, которая превращает payload уведомления Postgres в сообщение SSE (event - тип объекта)."""
+	data = orjson.loads(payload)
+	return Event(data.get('menu_id'), data, f"event: {data.get('type', 'message')}\ndata: {payload}\n\n".encode())
+
+
+class EventBroadcaster:
+	"""
+	Рассылка событий об изменении каталога подписчикам (клиентам SSE) внутри одного воркера.
+
+	Все подписчики воркера обслуживаются одним соединением с БД, которое выполняет LISTEN; соединение
+	открывается при первой подписке. Если подписчик не успевает забирать события, очередь переполняется
+	и его поток закрывается: клиент переподключится и перечитает данные.
+
+	Принимает 1 аргумент:
+	- url - адрес основной БД (LISTEN на реплике не поддерживается).
+	"""
+
+	def __init__(self, url: Union[str, URL]):
+		self.dsn = listen_dsn(url)
+		self.subscribers: set[asyncio.Queue] = set()
+		self._connection: Optional[asyncpg.Connection] = None
+		self._lock = asyncio.Lock()
+
+	async def _listen(self) -> None:
+		async with self._lock:
+			if self._connection is not None and not self._connection.is_closed():
+				return
+			try:
+				connection = await asyncpg.connect(self.dsn)
+				await connection.add_listener(EVENTS_CHANNEL, self._on_notification)
+			except (asyncpg.PostgresError, OSError):
+				logger.exception('cannot listen to %s', EVENTS_CHANNEL)
+				raise HTTPException(status_code=503, detail="events unavailable")
+			connection.add_termination_listener(self._on_termination)
+			self._connection = connection
+
+	def _on_notification(self, connection, pid: int, channel: str, payload: str) -> None:
+		event = render_event(payload)
+		for queue in list(self.subscribers):
+			try:
+				queue.put_nowait(event)
+			except asyncio.QueueFull:
+				self._drop(queue)
+
+	def _on_termination(self, connection) -> None:
+		# Соединение потеряно: события могли пропасть, поэтому подписчики отключаются и переподключатся сами.
+		logger.warning('lost %s listener connection', EVENTS_CHANNEL)
+		self._connection = None
+		for queue in list(self.subscribers):
+			self._drop(queue)
+
+	def _drop(self, queue: asyncio.Queue) -> None:
+		"""Функция, которая отключает подписчика: очищает его очередь и кладёт в неё None (конец потока)."""
+		self.subscribers.discard(queue)
+		while not queue.empty():
+			queue.get_nowait()
+		queue.put_nowait(None)
+
+	async def subscribe(self, maxsize: Optional[int] = None) -> asyncio.Queue:
+		"""
+		Функция, которая подписывает на события и возвращает очередь подписчика (None в очереди - конец потока).
+
+		maxsize - размер очереди (по умолчанию EVENTS_QUEUE_SIZE, 0 - без ограничения, для внутренних подписчиков).
+		"""
+		await self._listen()
+		queue: asyncio.Queue = asyncio.Queue(maxsize=EVENTS_QUEUE_SIZE if maxsize is None else maxsize)
+		self.subscribers.add(queue)
+		return queue
+
+	def unsubscribe(self, queue: asyncio.Queue) -> None:
+		self.subscribers.discard(queue)
+
+	async def close(self) -> None:
+		"""Функция, которая отключает подписчиков и закрывает соединение с БД (при остановке приложения)."""
+		for queue in list(self.subscribers):
+			self._drop(queue)
+		connection, self._connection = self._connection, None
+		if connection is not None and not connection.is_closed():
+			await connection.close()
+
+
+async def event_stream(broadcaster: EventBroadcaster, queue: asyncio.Queue,
+					   menu_id: Optional[str] = None) -> AsyncIterator[bytes]:
+	"""
+	Функция, которая отдаёт события подписчика в формате Server-Sent Events.
+
+	Принимает 3 аргумента:
+	- broadcaster - рассылка, на которую подписан клиент.
+	- queue - очередь подписчика из broadcaster.subscribe().
+	- menu_id - если задан, отдаются только события этого menu и события всего каталога.
+
+	Пока событий нет, раз в EVENTS_KEEPALIVE_SECONDS отправляется комментарий, чтобы прокси не закрывали соединение.
+	"""
+	try:
+		yield f'retry: {EVENTS_RETRY_MS}\n\n'.encode()
+		while True:
+			try:
+				event = await asyncio.wait_for(queue.get(), EVENTS_KEEPALIVE_SECONDS)
+			except asyncio.TimeoutError:
+				yield b': keepalive\n\n'
+				continue
+			if event is None:
+				return
+			if menu_id is None or event.menu_id is None or event.menu_id == menu_id:
+				yield event.message
+	finally:
+		broadcaster.unsubscribe(queue)
+
+
+broadcaster = EventBroadcaster(DATABASE_URL)
+
+
+def get_event_broadcaster() -> EventBroadcaster:
+	return broadcaster
@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends, Header
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from src.database import get_read_session_maker
+from src.export.services import export_catalog, gzip_stream
+from src.rendering import accepts_gzip
+
+# Роутер для выгрузки каталога
+router = APIRouter(
+	prefix='/api/v1',
+	tags=['Export']
+)
+
+
+# Роутер потоковой выгрузки всех menu, submenu и dish в NDJSON, сжимается в gzip, если клиент его принимает.
+@router.get("/export", response_class=StreamingResponse,
+			responses={200: {'content': {'application/x-ndjson': {}}}})
+async def get_export(accept_encoding: str = Header(''),
+					 session_maker: async_sessionmaker = Depends(get_read_session_maker)):
+	content = export_catalog(session_maker)
+	headers = {'Vary': 'Accept-Encoding'}
+	if accepts_gzip(accept_encoding):
+		content = gzip_stream(content)
+		headers['Content-Encoding'] = 'gzip'
+	return StreamingResponse(content, media_type='application/x-ndjson', headers=headers)
@@ -0,0 +1,51 @@
+import zlib
+from typing import AsyncIterator
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from src.config import EXPORT_FETCH_SIZE
+from src.dish.models import dish as dish_tbl
+from src.dish.services import dish_fields
+from src.menu.services import menu_fields
+from src.rendering import render_ndjson
+from src.submenu.models import submenu as submenu_tbl
+from src.submenu.services import submenu_fields
+
+# Выгружаемые объекты в порядке от родителей к потомкам, у потомков - id родителя.
+EXPORT_QUERIES = (
+	('menu', select(*menu_fields)),
+	('submenu', select(*submenu_fields, submenu_tbl.c.menu_id)),
+	('dish', select(*dish_fields, dish_tbl.c.submenu_id)),
+)
+
+
+async def export_catalog(session_maker: async_sessionmaker) -> AsyncIterator[bytes]:
+	"""
+	Функция, которая построчно выгружает весь каталог в NDJSON.
+
+	Принимает 1 аргумент:
+	- session_maker - фабрика сессий: выгрузка продолжается после выхода из роутера, поэтому открывает свою сессию.
+
+	Строки читаются через серверный курсор по EXPORT_FETCH_SIZE штук, каждая порция сразу отдаётся клиенту,
+	поэтому потребление памяти не зависит от размера каталога. Все таблицы читаются в одной транзакции
+	REPEATABLE READ, то есть из одного снимка БД.
+	"""
+	async with session_maker() as session:
+		await session.connection(execution_options={'isolation_level': 'REPEATABLE READ'})
+		for type_, query in EXPORT_QUERIES:
+			result = await session.stream(query.execution_options(yield_per=EXPORT_FETCH_SIZE))
+			async for rows in result.partitions():
+				yield render_ndjson(rows, type=type_)
+
+
+async def gzip_stream(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+	"""
+	Функция, которая сжимает поток в gzip.
+
+	Каждая порция сбрасывается (Z_SYNC_FLUSH), чтобы клиент получал данные по мере выгрузки, а не в конце.
+	"""
+	compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+	async for chunk in chunks:
+		yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+	yield compressor.flush()
@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database import get_async_session
+from src.health.schemas import DbHealth
+from src.health.services import check_db
+
+# Роутер для проверки состояния сервиса
+router = APIRouter(
+	prefix='/health',
+	tags=['Health']
+)
+
+
+# Роутер проверки БД: latency запроса и статистика пула соединений.
+@router.get("/db", response_model=DbHealth, responses={503: {"model": DbHealth}})
+async def get_db_health(response: Response, session: AsyncSession = Depends(get_async_session)):
+	answer = await check_db(session)
+	if answer.status != 'ok':
+		response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+	return answer
@@ -0,0 +1,9 @@
+from typing import Any
+
+from pydantic import BaseModel
+
+
+class DbHealth(BaseModel):
+	status: str
+	latency_ms: float | None = None
+	pool: dict[str, Any]
@@ -0,0 +1,26 @@
+import time
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.health.schemas import DbHealth
+from src.pool import pool_stats
+
+
+async def check_db(session: AsyncSession) -> DbHealth:
+	"""
+	Функция, которая проверяет доступность БД.
+
+	Принимает 1 аргумент:
+	- session - экземпляр, который обеспечивает асинхронное взаимодействие с БД.
+
+	Возвращает состояние БД: время round-trip запроса SELECT 1 и статистику пула соединений.
+	"""
+	start = time.perf_counter()
+	try:
+		await session.execute(text('SELECT 1'))
+	except (SQLAlchemyError, OSError):
+		return DbHealth(status='unavailable', pool=pool_stats(session.bind.pool))
+	latency_ms = (time.perf_counter() - start) * 1000
+	return DbHealth(status='ok', latency_ms=latency_ms, pool=pool_stats(session.bind.pool))
@@ -0,0 +1,42 @@
+"""
+Импорт каталога из файла CSV или XLSX в основную БД (настройки подключения из .env).
+
+Каталог в БД приводится к содержимому файла, см. src.importer.services.import_catalog.
+
+Запуск: python -m src.importer.cli <путь к файлу .csv или .xlsx> [--allow-empty]
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+from fastapi import HTTPException
+
+from src.database import async_session_maker, engine
+from src.importer.services import READERS, file_format_by_name, import_catalog, read_rows
+
+
+async def main(path: str, allow_empty: bool = False) -> int:
+	file_format = file_format_by_name(path)
+	if file_format is None:
+		print(f"unsupported file format, expected one of: {', '.join(READERS)}", file=sys.stderr)
+		return 2
+	try:
+		with open(path, 'rb') as file:
+			async with async_session_maker() as session:
+				summary = await import_catalog(read_rows(file, file_format), session, allow_empty)
+	except HTTPException as error:
+		print(json.dumps(error.detail, ensure_ascii=False, indent=2), file=sys.stderr)
+		return 1
+	finally:
+		await engine.dispose()
+	print(summary.model_dump_json(indent=2))
+	return 0
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description='Импорт каталога из файла CSV или XLSX.')
+	parser.add_argument('path', help='путь к файлу .csv или .xlsx')
+	parser.add_argument('--allow-empty', action='store_true', help='разрешить файл без строк (удаляет весь каталог)')
+	args = parser.parse_args()
+	sys.exit(asyncio.run(main(args.path, args.allow_empty)))
@@ -0,0 +1,24 @@
+from sqlalchemy import Table, Column, Integer, MetaData
+
+from src.dish.models import dish
+from src.menu.models import menu
+from src.submenu.models import submenu
+
+# Промежуточные таблицы импорта временные и живут до конца транзакции, поэтому не входят в схему БД и миграции.
+staging_metadata = MetaData()
+
+# Строки импортируемого файла: одна строка - dish с путём до него (или submenu/menu без потомков).
+import_rows = Table(
+	'import_rows',
+	staging_metadata,
+	Column('line', Integer, nullable=False),
+	Column('menu_title', menu.c.title.type, nullable=False),
+	Column('menu_description', menu.c.description.type, nullable=False),
+	Column('submenu_title', submenu.c.title.type),
+	Column('submenu_description', submenu.c.description.type),
+	Column('dish_title', dish.c.title.type),
+	Column('dish_description', dish.c.description.type),
+	Column('price', dish.c.price.type),
+	prefixes=['TEMPORARY'],
+	postgresql_on_commit='DROP',
+)
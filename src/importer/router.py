@@ -0,0 +1,37 @@
+from tempfile import SpooledTemporaryFile
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import IMPORT_SPOOL_SIZE
+from src.database import get_async_session
+from src.importer.schemas import ImportSummary
+from src.importer.services import import_catalog, read_rows
+
+# Форматы файла импорта по Content-Type тела запроса.
+MEDIA_TYPES = {
+	'text/csv': 'csv',
+	'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet': 'xlsx',
+}
+
+# Роутер для импорта каталога
+router = APIRouter(
+	prefix='/api/v1',
+	tags=['Import']
+)
+
+
+# Роутер импорта каталога из файла CSV или XLSX в теле запроса, каталог в БД приводится к содержимому файла.
+# Файл без строк каталога удаляет весь каталог, поэтому принимается только с allow_empty=true.
+@router.post("/import", response_model=ImportSummary,
+			 openapi_extra={'requestBody': {'content': {media_type: {} for media_type in MEDIA_TYPES}}})
+async def post_import(request: Request, allow_empty: bool = False, session: AsyncSession = Depends(get_async_session)):
+	file_format = MEDIA_TYPES.get(request.headers.get('content-type', '').split(';')[0].strip().lower())
+	if file_format is None:
+		raise HTTPException(status_code=415, detail=f"expected one of: {', '.join(MEDIA_TYPES)}")
+	# Тело читается потоком; небольшой файл остаётся в памяти, большой сбрасывается во временный файл на диске.
+	with SpooledTemporaryFile(max_size=IMPORT_SPOOL_SIZE) as file:
+		async for chunk in request.stream():
+			file.write(chunk)
+		file.seek(0)
+		return await import_catalog(read_rows(file, file_format), session, allow_empty)
@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+
+
+class ImportChanges(BaseModel):
+	inserted: int
+	updated: int
+	deleted: int
+
+
+class ImportSummary(BaseModel):
+	rows: int
+	menu: ImportChanges
+	submenu: ImportChanges
+	dish: ImportChanges
@@ -0,0 +1,325 @@
+import codecs
+import csv
+import time
+import zipfile
+from dataclasses import dataclass, field
+from decimal import Decimal
+from itertools import islice
+from typing import Any, BinaryIO, Iterable, Iterator, Optional, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import Boolean, Select, Subquery, Table, and_, delete, exists, func, literal_column, or_, select, \
+	text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from src.cache.services import invalidate_all
+from src.config import IMPORT_BATCH_SIZE
+from src.dish.models import dish as dish_tbl
+from src.dish.schemas import normalize_price
+from src.events.services import notify_change
+from src.importer.models import import_rows
+from src.importer.schemas import ImportChanges, ImportSummary
+from src.menu.models import menu as menu_tbl, catalog_version_seq
+from src.metrics.sql import record_statement
+from src.submenu.models import submenu as submenu_tbl
+
+# Колонки файла импорта (первая строка файла), порядок колонок в файле может быть любым.
+IMPORT_COLUMNS = ('menu_title', 'menu_description', 'submenu_title', 'submenu_description',
+				  'dish_title', 'dish_description', 'dish_price')
+MAX_REPORTED_ERRORS = 20
+# Импорты выполняются по одному: параллельный импорт удалил бы строки, только что добавленные другим.
+IMPORT_LOCK_ID = 7_318_201
+
+
+class UnreadableFile(Exception):
+	"""Файл импорта не удаётся прочитать (кодировка, формат): разбор останавливается на строке line."""
+
+	def __init__(self, line: int, error: str):
+		super().__init__(error)
+		self.line = line
+		self.error = error
+
+
+def _read_csv(file: BinaryIO) -> Iterator[Sequence[Any]]:
+	reader = csv.reader(codecs.iterdecode(file, 'utf-8-sig'))
+	try:
+		yield from reader
+	except UnicodeDecodeError:
+		raise UnreadableFile(reader.line_num + 1, 'file is not valid UTF-8')
+	except csv.Error as error:
+		raise UnreadableFile(reader.line_num, f'malformed CSV: {error}')
+
+
+def _read_xlsx(file: BinaryIO) -> Iterator[Sequence[Any]]:
+	from openpyxl import load_workbook
+
+	try:
+		workbook = load_workbook(file, read_only=True, data_only=True)
+	except zipfile.BadZipFile:
+		raise UnreadableFile(1, 'file is not a valid XLSX workbook')
+	try:
+		yield from workbook.active.iter_rows(values_only=True)
+	finally:
+		workbook.close()
+
+
+# Форматы файла импорта: функция, которая построчно читает файл (строка - последовательность значений ячеек).
+READERS = {
+	'csv': _read_csv,
+	'xlsx': _read_xlsx,
+}
+
+
+@dataclass
+class ParseReport:
+	"""Итоги разбора файла: кол-во строк и первые MAX_REPORTED_ERRORS ошибок с номерами строк."""
+	rows: int = 0
+	errors: list[dict[str, Any]] = field(default_factory=list)
+
+	def add_error(self, line: int, error: str) -> None:
+		if len(self.errors) < MAX_REPORTED_ERRORS:
+			self.errors.append({'line': line, 'error': error})
+
+
+def _cell(value: Any) -> str:
+	return '' if value is None else str(value).strip()
+
+
+def _check_length(name: str, value: str, column) -> None:
+	if len(value) > column.type.length:
+		raise ValueError(f'{name} is longer than {column.type.length} characters')
+
+
+def _parse_row(line: int, menu_title: str, menu_description: str, submenu_title: str, submenu_description: str,
+			   dish_title: str, dish_description: str, dish_price: str) -> tuple:
+	"""Функция, которая проверяет строку файла и приводит её к строке промежуточной таблицы import_rows."""
+	if not menu_title:
+		raise ValueError('menu_title is required')
+	if dish_title and not submenu_title:
+		raise ValueError('dish_title requires submenu_title')
+	if dish_title and not dish_price:
+		raise ValueError('dish_price is required')
+	if dish_price and not dish_title:
+		raise ValueError('dish_price requires dish_title')
+	for name, value, column in (('menu_title', menu_title, menu_tbl.c.title),
+								('menu_description', menu_description, menu_tbl.c.description),
+								('submenu_title', submenu_title, submenu_tbl.c.title),
+								('submenu_description', submenu_description, submenu_tbl.c.description),
+								('dish_title', dish_title, dish_tbl.c.title),
+								('dish_description', dish_description, dish_tbl.c.description)):
+		_check_length(name, value, column)
+	price = Decimal(normalize_price(dish_price)) if dish_title else None
+	return (line, menu_title, menu_description, submenu_title or None, submenu_description if submenu_title else None,
+			dish_title or None, dish_description if dish_title else None, price)
+
+
+def parse_rows(rows: Iterable[Sequence[Any]], report: ParseReport) -> Iterator[tuple]:
+	"""
+	Функция, которая построчно разбирает файл импорта.
+
+	Первая строка - заголовок с колонками IMPORT_COLUMNS, пустые строки пропускаются.
+	Некорректные строки не возвращаются, а попадают в report; если файл не удаётся дочитать, в report попадает
+	строка, на которой чтение остановилось.
+	"""
+	rows = iter(rows)
+	try:
+		header = [_cell(value).lower() for value in next(rows, ())]
+		missing = [column for column in IMPORT_COLUMNS if column not in header]
+		if missing:
+			raise HTTPException(status_code=422, detail=f"missing columns: {', '.join(missing)}")
+		positions = [header.index(column) for column in IMPORT_COLUMNS]
+		for line, row in enumerate(rows, start=2):
+			values = [_cell(row[position]) if position < len(row) else '' for position in positions]
+			if not any(values):
+				continue
+			try:
+				record = _parse_row(line, *values)
+			except ValueError as error:
+				report.add_error(line, str(error))
+				continue
+			report.rows += 1
+			yield record
+	except UnreadableFile as error:
+		report.add_error(error.line, error.error)
+
+
+def _current(table: Table, *key) -> Subquery:
+	"""Функция, которая выбирает по одной строке таблицы (с наименьшим id) на каждое значение ключа из названий."""
+	return select(table.c.id, *key).distinct(*key).order_by(*key, table.c.id).subquery()
+
+
+def _menu_rows() -> Select:
+	"""Функция, которая строит menu из файла: id существующего menu с тем же названием или новый."""
+	source = select(import_rows.c.menu_title.label('title'), import_rows.c.menu_description.label('description')) \
+		.distinct(import_rows.c.menu_title).order_by(import_rows.c.menu_title, import_rows.c.line).subquery()
+	menus = _current(menu_tbl, menu_tbl.c.title)
+	return select(func.coalesce(menus.c.id, func.gen_random_uuid()).label('id'), source.c.title, source.c.description) \
+		.select_from(source.outerjoin(menus, menus.c.title == source.c.title))
+
+
+def _submenu_rows() -> Select:
+	"""Функция, которая строит submenu из файла: id существующего submenu с тем же названием в menu или новый."""
+	key = (import_rows.c.menu_title, import_rows.c.submenu_title)
+	source = select(*key, import_rows.c.submenu_description).where(import_rows.c.submenu_title.is_not(None)) \
+		.distinct(*key).order_by(*key, import_rows.c.line).subquery()
+	menus = _current(menu_tbl, menu_tbl.c.title)
+	submenus = _current(submenu_tbl, submenu_tbl.c.menu_id, submenu_tbl.c.title)
+	return select(
+		func.coalesce(submenus.c.id, func.gen_random_uuid()).label('id'), source.c.submenu_title.label('title'),
+		source.c.submenu_description.label('description'), menus.c.id.label('menu_id'),
+	).select_from(
+		source.join(menus, menus.c.title == source.c.menu_title)
+		.outerjoin(submenus, and_(submenus.c.menu_id == menus.c.id, submenus.c.title == source.c.submenu_title))
+	)
+
+
+def _dish_rows() -> Select:
+	"""Функция, которая строит dish из файла: id существующего dish с тем же названием в submenu или новый."""
+	key = (import_rows.c.menu_title, import_rows.c.submenu_title, import_rows.c.dish_title)
+	source = select(*key, import_rows.c.dish_description, import_rows.c.price) \
+		.where(import_rows.c.dish_title.is_not(None)).distinct(*key).order_by(*key, import_rows.c.line).subquery()
+	menus = _current(menu_tbl, menu_tbl.c.title)
+	submenus = _current(submenu_tbl, submenu_tbl.c.menu_id, submenu_tbl.c.title)
+	dishes = _current(dish_tbl, dish_tbl.c.submenu_id, dish_tbl.c.title)
+	return select(
+		func.coalesce(dishes.c.id, func.gen_random_uuid()).label('id'), source.c.dish_title.label('title'),
+		source.c.dish_description.label('description'), source.c.price, submenus.c.id.label('submenu_id'),
+	).select_from(
+		source.join(menus, menus.c.title == source.c.menu_title)
+		.join(submenus, and_(submenus.c.menu_id == menus.c.id, submenus.c.title == source.c.submenu_title))
+		.outerjoin(dishes, and_(dishes.c.submenu_id == submenus.c.id, dishes.c.title == source.c.dish_title))
+	)
+
+
+def _upsert(table: Table, rows: Select, changed: Sequence[str]) -> Select:
+	"""
+	Функция, которая строит INSERT ... ON CONFLICT строк из файла с подсчётом добавленных и изменённых строк.
+
+	Существующая строка обновляется (с новой версией), только если отличается одна из колонок changed.
+	"""
+	stmt = insert(table).from_select([column.name for column in rows.selected_columns], rows)
+	stmt = stmt.on_conflict_do_update(
+		index_elements=[table.c.id],
+		set_={**{name: stmt.excluded[name] for name in changed}, 'version': catalog_version_seq.next_value()},
+		where=or_(*(table.c[name].is_distinct_from(stmt.excluded[name]) for name in changed)),
+	).returning(literal_column('xmax = 0', Boolean).label('inserted'))
+	upserted = stmt.cte('upserted')
+	return select(func.count().filter(upserted.c.inserted), func.count().filter(~upserted.c.inserted))
+
+
+def _delete_missing(table: Table, rows: Select) -> Select:
+	"""Функция, которая строит удаление строк таблицы, которых нет в файле, с подсчётом удалённых строк."""
+	kept = rows.subquery()
+	deleted = delete(table).where(~exists().where(kept.c.id == table.c.id)).returning(table.c.id).cte('deleted')
+	return select(func.count()).select_from(deleted)
+
+
+def _recount_submenus():
+	counts = select(submenu_tbl.c.id, func.count(dish_tbl.c.id).label('dishes_count')) \
+		.select_from(submenu_tbl.outerjoin(dish_tbl)).group_by(submenu_tbl.c.id).subquery()
+	return update(submenu_tbl) \
+		.where(submenu_tbl.c.id == counts.c.id, submenu_tbl.c.dishes_count != counts.c.dishes_count) \
+		.values(dishes_count=counts.c.dishes_count, version=catalog_version_seq.next_value())
+
+
+def _recount_menus():
+	counts = select(menu_tbl.c.id, func.count(submenu_tbl.c.id).label('submenus_count'),
+					func.coalesce(func.sum(submenu_tbl.c.dishes_count), 0).label('dishes_count')) \
+		.select_from(menu_tbl.outerjoin(submenu_tbl)).group_by(menu_tbl.c.id).subquery()
+	return update(menu_tbl) \
+		.where(menu_tbl.c.id == counts.c.id, or_(menu_tbl.c.submenus_count != counts.c.submenus_count,
+												 menu_tbl.c.dishes_count != counts.c.dishes_count)) \
+		.values(submenus_count=counts.c.submenus_count, dishes_count=counts.c.dishes_count,
+				version=catalog_version_seq.next_value())
+
+
+def _duplicates_query() -> Select:
+	key = (import_rows.c.menu_title, import_rows.c.submenu_title, import_rows.c.dish_title)
+	return select(func.min(import_rows.c.line), func.max(import_rows.c.line), *key) \
+		.where(import_rows.c.dish_title.is_not(None)).group_by(*key).having(func.count() > 1) \
+		.order_by(func.max(import_rows.c.line)).limit(MAX_REPORTED_ERRORS)
+
+
+async def _copy_rows(records: Iterator[tuple], session: AsyncSession) -> None:
+	"""Функция, которая загружает строки файла в import_rows порциями по IMPORT_BATCH_SIZE через COPY."""
+	connection = await session.connection()
+	await connection.run_sync(import_rows.create)
+	raw_connection = await connection.get_raw_connection()
+	columns = [column.name for column in import_rows.columns]
+	# Разбор файла (особенно XLSX) занимает процессор, поэтому выполняется в пуле потоков.
+	while batch := await run_in_threadpool(list, islice(records, IMPORT_BATCH_SIZE)):
+		# COPY идёт мимо курсора SQLAlchemy, поэтому учитывается в статистике запроса вручную.
+		start = time.perf_counter()
+		await raw_connection.driver_connection.copy_records_to_table(import_rows.name, records=batch,
+																	 columns=columns)
+		record_statement(f'COPY {import_rows.name}', time.perf_counter() - start)
+
+
+async def import_catalog(rows: Iterable[Sequence[Any]], session: AsyncSession,
+						 allow_empty: bool = False) -> ImportSummary:
+	"""
+	Функция, которая приводит каталог в БД к содержимому файла импорта.
+
+	Принимает 3 аргумента:
+	- session - экземпляр, который обеспечивает асинхронное взаимодействие с БД.
+	- rows - строки файла (значения ячеек), первая строка - заголовок с колонками IMPORT_COLUMNS.
+	- allow_empty - разрешить файл без строк каталога, т.е. удаление всего каталога (иначе такой файл отклоняется).
+
+	Строки файла загружаются через COPY во временную таблицу, затем каталог сравнивается с ней несколькими
+	выражениями над множествами строк: menu, submenu и dish сопоставляются по названиям (в пределах родителя),
+	добавляются новые, обновляются изменившиеся и удаляются отсутствующие в файле. Счётчики submenus_count
+	и dishes_count пересчитываются один раз в конце. Всё выполняется в одной транзакции.
+
+	Возвращает кол-во строк файла и кол-во добавленных, изменённых и удалённых menu, submenu и dish.
+	"""
+	report = ParseReport()
+	await session.execute(select(func.pg_advisory_xact_lock(IMPORT_LOCK_ID)))
+	await _copy_rows(parse_rows(rows, report), session)
+	for first_line, line, menu_title, submenu_title, dish_title in await session.execute(_duplicates_query()):
+		report.add_error(line, f'duplicate dish "{dish_title}" in submenu "{submenu_title}" of menu "{menu_title}" '
+							   f'(line {first_line})')
+	if not report.rows and not report.errors and not allow_empty:
+		report.add_error(1, 'file has no catalog rows; pass allow_empty to delete the whole catalog')
+	if report.errors:
+		await session.rollback()
+		raise HTTPException(status_code=422, detail=sorted(report.errors, key=lambda error: error['line']))
+	await session.execute(text(f'ANALYZE {import_rows.name}'))
+
+	changes: dict[str, dict[str, int]] = {}
+	for name, table, rows_query, changed in (('menu', menu_tbl, _menu_rows(), ('description',)),
+											 ('submenu', submenu_tbl, _submenu_rows(), ('description',)),
+											 ('dish', dish_tbl, _dish_rows(), ('description', 'price'))):
+		inserted, updated = (await session.execute(_upsert(table, rows_query, changed))).one()
+		changes[name] = {'inserted': inserted, 'updated': updated}
+	# Потомки удаляются раньше родителей, чтобы каскадно удалённые строки попали в подсчёт.
+	for name, table, rows_query in (('dish', dish_tbl, _dish_rows()), ('submenu', submenu_tbl, _submenu_rows()),
+									('menu', menu_tbl, _menu_rows())):
+		changes[name]['deleted'] = await session.scalar(_delete_missing(table, rows_query))
+	await session.execute(_recount_submenus())
+	await session.execute(_recount_menus())
+	if any(any(counts.values()) for counts in changes.values()):
+		await session.execute(select(notify_change('import', 'catalog')))
+	await session.commit()
+	await invalidate_all()
+	return ImportSummary(rows=report.rows, **{name: ImportChanges(**counts) for name, counts in changes.items()})
+
+
+def read_rows(file: BinaryIO, file_format: str) -> Iterator[Sequence[Any]]:
+	"""
+	Функция, которая построчно читает файл импорта.
+
+	Принимает 2 аргумента:
+	- file - файл, открытый в двоичном режиме.
+	- file_format - формат файла из READERS (csv или xlsx).
+
+	Возвращает итератор строк файла (последовательностей значений ячеек).
+	"""
+	return READERS[file_format](file)
+
+
+def file_format_by_name(name: str) -> Optional[str]:
+	"""Функция, которая определяет формат файла импорта по расширению имени файла."""
+	extension = name.rsplit('.', 1)[-1].lower()
+	return extension if extension in READERS else None
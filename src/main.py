@@ -1,15 +1,59 @@
+from functools import partial
+from typing import Optional
+
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 
+from src.autocomplete.router import router as autocomplete_router
+from src.cache import services as cache_services
+from src.cache.backends import CacheBackend, MemoryCache
+from src.cache.bus import InvalidationBus
+from src.cache.services import CacheBackendMiddleware, drop_invalidated
+from src.catalog.router import router as catalog_router
+from src.catalog.services import catalog_replica
+from src.config import CATALOG_REPLICA
 from src.dish.router import router as dish_router
+from src.events.router import router as events_router
+from src.events.services import broadcaster
+from src.export.router import router as export_router
+from src.health.router import router as health_router
+from src.importer.router import router as import_router
 from src.menu.router import router as menu_router
+from src.metrics.middleware import PrometheusMiddleware, ServerTimingMiddleware
+from src.metrics.router import router as metrics_router
+from src.replica import ReadYourWritesMiddleware
+from src.search.router import router as search_router
 from src.submenu.router import router as submenu_router
 
 
-def create_app():
-	app = FastAPI(title="RestMenu APP")
+def create_app(catalog_in_memory: bool = CATALOG_REPLICA, cache_backend: Optional[CacheBackend] = None):
+	app = FastAPI(title="RestMenu APP", default_response_class=ORJSONResponse)
 
+	if catalog_in_memory:
+		# GET-маршруты реплики каталога подключаются первыми и перекрывают GET-маршруты menu, submenu и dish.
+		app.include_router(catalog_router)
+		app.add_event_handler('startup', catalog_replica.start)
+		app.add_event_handler('shutdown', catalog_replica.close)
 	app.include_router(menu_router)
 	app.include_router(submenu_router)
 	app.include_router(dish_router)
+	app.include_router(search_router)
+	app.include_router(autocomplete_router)
+	app.include_router(export_router)
+	app.include_router(import_router)
+	app.include_router(events_router)
+	app.include_router(health_router)
+	app.include_router(metrics_router)
+	app.add_middleware(ReadYourWritesMiddleware)
+	app.add_middleware(ServerTimingMiddleware)
+	app.add_middleware(PrometheusMiddleware)
+	if cache_backend is not None:
+		app.add_middleware(CacheBackendMiddleware, backend=cache_backend)
+	if isinstance(cache_backend or cache_services.cache_backend, MemoryCache):
+		# Кэш в памяти у каждого воркера свой (Redis - общий): записи других воркеров приходят событиями каталога.
+		app.state.invalidation_bus = InvalidationBus(broadcaster, partial(drop_invalidated, backend=cache_backend))
+		app.add_event_handler('startup', app.state.invalidation_bus.start)
+		app.add_event_handler('shutdown', app.state.invalidation_bus.close)
+	app.add_event_handler('shutdown', broadcaster.close)
 
 	return app
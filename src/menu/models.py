@@ -1,8 +1,13 @@
-from sqlalchemy import Table, Column, String
-from sqlalchemy import Uuid, Integer
+from sqlalchemy import Table, Column, String, CheckConstraint, Sequence, Computed, Index
+from sqlalchemy import Uuid, Integer, BigInteger
+from sqlalchemy.dialects.postgresql import TSVECTOR
 
 from src.database import metadata
 
+# Общая последовательность версий строк menu, submenu и dish. Каждая запись получает новое значение,
+# поэтому версия строки и максимум версий списка меняются при любом изменении данных.
+catalog_version_seq = Sequence('catalog_version_seq', metadata=metadata)
+
 # Таблица меню.
 menu = Table(
 	'menu',
@@ -10,6 +15,12 @@ menu = Table(
 	Column('id', Uuid, primary_key=True),
 	Column('title', String(50), nullable=False),
 	Column('description', String(200), default=None),
-	Column('submenus_count', Integer, default=0),
-	Column('dishes_count', Integer, default=0)
+	Column('submenus_count', Integer, nullable=False, default=0, server_default='0'),
+	Column('dishes_count', Integer, nullable=False, default=0, server_default='0'),
+	Column('version', BigInteger, nullable=False, server_default=catalog_version_seq.next_value()),
+	# Вектор полнотекстового поиска по названию, вычисляется Postgres при записи строки.
+	Column('search_vector', TSVECTOR, Computed("setweight(to_tsvector('simple', title), 'A')", persisted=True)),
+	CheckConstraint('submenus_count >= 0', name='ck_menu_submenus_count'),
+	CheckConstraint('dishes_count >= 0', name='ck_menu_dishes_count'),
+	Index('ix_menu_search_vector', 'search_vector', postgresql_using='gin'),
 )
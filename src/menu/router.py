@@ -1,13 +1,18 @@
 import uuid
 from typing import List, Union
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database import get_async_session
-from src.menu.schemas import GetSearchMenu, UpdateMenu, DeleteMenu, ErrorResponse, CreateMenu, DataUpdateMenu
+from src.database import get_async_session, get_read_session
+from src.etag import is_not_modified, not_modified
+from src.menu.schemas import GetSearchMenu, UpdateMenu, DeleteMenu, ErrorResponse, CreateMenu, DataUpdateMenu, \
+	TreeMenu
 from src.menu.services import get_all_menus, get_meny_by_id, create_new_menu, \
-	update_menu_by_id, delete_menu_by_id, get_data_menu_difficult_query
+	update_menu_by_id, delete_menu_by_id, get_data_menu_difficult_query, get_all_menus_difficult_query, \
+	get_menu_tree, get_all_menus_tree, get_menu_etag, get_menus_etag
+from src.pagination import Page, PageParams, set_next_cursor
+from src.rendering import versioned_json_response
 
 # Роутер для управления menu
 router = APIRouter(
@@ -16,24 +21,56 @@ router = APIRouter(
 )
 
 
-# Роутер получения всех имеющихся меню.
+# Роутер получения всех имеющихся меню со счётчиками, посчитанными по submenu и dish.
+@router.get("/menus_orm", response_model=List[GetSearchMenu])
+async def get_menus_orm(response: Response, page: Page[GetSearchMenu] = Depends(get_all_menus_difficult_query)):
+	set_next_cursor(response, page)
+	return page.items
+
+
+# Роутер получения меню по ид со счётчиками, посчитанными по submenu и dish.
 @router.get("/menus_orm/{menu_id}", response_model=Union[GetSearchMenu, ErrorResponse])
-async def get_menu_orm(menu_id: uuid.UUID, session: AsyncSession = Depends(get_async_session)):
+async def get_menu_orm(menu_id: uuid.UUID, session: AsyncSession = Depends(get_read_session)):
 	answer = await get_data_menu_difficult_query(menu_id, session)
 	return answer
 
 
 # Роутер получения всех имеющихся меню.
 @router.get("/menus", response_model=List[GetSearchMenu])
-async def get_all_menus(answer=Depends(get_all_menus)):
-	return answer
+async def get_menus(request: Request, params: PageParams = Depends(),
+					session: AsyncSession = Depends(get_read_session)):
+	etag = await get_menus_etag(session)
+	if is_not_modified(request, etag):
+		return not_modified(request, etag)
+	page = await get_all_menus(params, session)
+	response = await versioned_json_response(request, page.body, etag)
+	set_next_cursor(response, page)
+	return response
+
+
+# Роутер получения дерева всех меню с подменю и блюдами.
+@router.get("/menus/tree", response_model=None, responses={200: {"model": List[TreeMenu]}})
+async def get_menus_tree(session: AsyncSession = Depends(get_read_session)):
+	answer = await get_all_menus_tree(session)
+	return Response(content=answer, media_type="application/json")
+
+
+# Роутер получения дерева меню с подменю и блюдами по ид.
+@router.get("/menus/{menu_id}/tree", response_model=None,
+			responses={200: {"model": TreeMenu}, 404: {"model": ErrorResponse}})
+async def get_menu_tree_by_id(menu_id: uuid.UUID, session: AsyncSession = Depends(get_read_session)):
+	answer = await get_menu_tree(menu_id, session)
+	return Response(content=answer, media_type="application/json")
 
 
 # Роутер получения меню по ид.
 @router.get("/menus/{menu_id}", response_model=Union[GetSearchMenu, ErrorResponse])
-async def get_menu(menu_id: uuid.UUID, session: AsyncSession = Depends(get_async_session)):
-	answer = await get_meny_by_id(menu_id, session)
-	return answer
+async def get_menu(menu_id: uuid.UUID, request: Request, session: AsyncSession = Depends(get_read_session)):
+	etag = await get_menu_etag(menu_id, session)
+	if is_not_modified(request, etag):
+		return not_modified(request, etag)
+	response = await versioned_json_response(request, await get_meny_by_id(menu_id, session), etag)
+	return response
 
 
 # Роутер создания меню.
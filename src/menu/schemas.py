@@ -34,3 +34,27 @@ class DeleteMenu(BaseModel):
 
 class ErrorResponse(BaseModel):
 	detail: str
+
+
+class TreeDish(BaseModel):
+	id: UUID4
+	title: str
+	description: str
+	price: str
+
+
+class TreeSubmenu(BaseModel):
+	id: UUID4
+	title: str
+	description: str
+	dishes_count: int
+	dishes: list[TreeDish]
+
+
+class TreeMenu(BaseModel):
+	id: UUID4
+	title: str
+	description: str
+	submenus_count: int
+	dishes_count: int
+	submenus: list[TreeSubmenu]
@@ -1,71 +1,208 @@
 import uuid
-from typing import List, Union
+from typing import Optional, Union
 
 from fastapi import Depends, HTTPException
-from sqlalchemy import select, insert, update, delete, func
+from sqlalchemy import select, insert, update, delete, func, cast, distinct, literal_column, Text, FromClause, Select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database import get_async_session
-from src.menu.models import menu as menu_tbl
+from src.cache.keys import menus_key, menu_key, submenus_key, submenu_key, dishes_key, dish_key, ETAG_FIELD
+from src.cache.services import read_through, invalidate
+from src.config import MENU_COUNTS_STRATEGY
+from src.database import get_read_session
+from src.dish.models import dish as dish_tbl
+from src.etag import make_etag
+from src.events.services import notify_change
+from src.menu.models import menu as menu_tbl, catalog_version_seq
 from src.menu.schemas import GetSearchMenu, UpdateMenu, DeleteMenu, ErrorResponse, DataUpdateMenu, CreateMenu
+from src.pagination import Page, PageParams, RenderedPage, paginate, build_page, render_page
+from src.rendering import render_row
 from src.submenu.models import submenu as submenu_tbl
 
 
-async def get_data_menu_difficult_query(menu_id: uuid.UUID, session: AsyncSession = Depends(get_async_session)) \
+# Колонки menu, которые отдаются в ответах API.
+menu_fields = (menu_tbl.c.id, menu_tbl.c.title, menu_tbl.c.description, menu_tbl.c.submenus_count,
+			   menu_tbl.c.dishes_count)
+
+
+def _live_counts_query(menus: FromClause) -> Select:
+	"""
+	Функция, которая строит запрос menu с кол-вом submenu и dish, посчитанным по таблицам submenu и dish.
+
+	Принимает 1 аргумент:
+	- menus - таблица menu или подзапрос с её колонками (например, страница меню).
+
+	Возвращает select c колонками id, title, description, submenus_count, dishes_count.
+	"""
+	return select(
+		menus.c.id,
+		menus.c.title,
+		menus.c.description,
+		func.count(distinct(submenu_tbl.c.id)).label('submenus_count'),
+		func.count(dish_tbl.c.id).label('dishes_count')
+	).select_from(
+		menus.join(submenu_tbl, menus.c.id == submenu_tbl.c.menu_id, isouter=True)
+		.join(dish_tbl, submenu_tbl.c.id == dish_tbl.c.submenu_id, isouter=True)
+	).group_by(
+		menus.c.id, menus.c.title, menus.c.description
+	)
+
+
+def _menu_query(menu_id: uuid.UUID, live: bool) -> Select:
+	"""Функция, которая строит запрос menu по id со счётчиками из колонок menu или посчитанными (live)."""
+	if live:
+		return _live_counts_query(menu_tbl).where(menu_tbl.c.id == menu_id)
+	return select(*menu_fields).where(menu_tbl.c.id == menu_id)
+
+
+def _menus_page_query(params: PageParams, live: bool) -> Select:
+	"""
+	Функция, которая строит запрос страницы menu со счётчиками из колонок menu или посчитанными (live).
+
+	В режиме live сначала выбирается страница menu, и счётчики считаются только для неё.
+	"""
+	query = paginate(select(*menu_fields), menu_tbl.c.id, params)
+	if not live:
+		return query
+	page = query.subquery('page')
+	return _live_counts_query(page).order_by(page.c.id)
+
+
+def _menu_from_row(row) -> GetSearchMenu:
+	return GetSearchMenu(id=row.id, title=row.title, description=row.description,
+						 submenus_count=row.submenus_count, dishes_count=row.dishes_count)
+
+
+async def get_data_menu_difficult_query(menu_id: uuid.UUID, session: AsyncSession = Depends(get_read_session)) \
 		-> GetSearchMenu:
 	"""
-	Функция, которая выполняет поиск кол-ва подменю и блюд для конкретного меню.
+	Функция, которая выполняет поиск меню по id с кол-вом подменю и блюд, посчитанным по таблицам submenu и dish.
 
 	Принимает 2 аргумента:
 	- session - экземпляр, который обеспечивает асинхронное взаимодействие с БД.
 	- menu_id - id меню
 	Возвращает объект класса menu.
 	"""
-	stmt = select(
-		menu_tbl.c.id,
-		menu_tbl.c.title,
-		menu_tbl.c.description,
-		func.count(submenu_tbl.c.id == menu_id).label('submenus_count'),
-		func.sum(submenu_tbl.c.dishes_count).label('dishes_count')
-	).select_from(
-		menu_tbl.join(submenu_tbl, menu_tbl.c.id == submenu_tbl.c.menu_id, isouter=True)
-	).group_by(
-		menu_tbl.c.id, menu_tbl.c.title
-	)
-	rez_query = await session.execute(stmt)
+	rez_query = await session.execute(_menu_query(menu_id, live=True))
 	result = rez_query.fetchone()
 
 	if result is None:
 		raise HTTPException(status_code=404, detail="menu not found")
+	return _menu_from_row(result)
+
+
+async def get_all_menus_difficult_query(params: PageParams = Depends(),
+										session: AsyncSession = Depends(get_read_session)) -> Page[GetSearchMenu]:
+	"""
+	Функция, которая выполняет поиск страницы меню с кол-вом подменю и блюд, посчитанным по таблицам submenu и dish.
+
+	Принимает 2 аргумента:
+	- params - параметры keyset-пагинации (limit и cursor).
+	- session - экземпляр, который обеспечивает асинхронное взаимодействие с БД.
+
+	Возвращает страницу объектов класса menu.
+	"""
+	rez_query = await session.execute(_menus_page_query(params, live=True))
+	return build_page([_menu_from_row(data) for data in rez_query], params)
+
+
+def _json_object(**fields):
+	"""Функция, которая строит выражение json_build_object с ключами-литералами SQL."""
+	args = []
+	for key, value in fields.items():
+		args.extend((literal_column(f"'{key}'"), value))
+	return func.json_build_object(*args)
+
+
+def _menu_tree_object():
+	"""
+	Функция, которая строит выражение json_build_object для menu с вложенными submenu и dish.
+
+	Вложенные списки собираются коррелированными подзапросами json_agg,
+	поэтому всё дерево формируется одним SQL-запросом.
+	"""
+	empty_list = literal_column("'[]'::json")
+	dish_object = _json_object(
+		id=dish_tbl.c.id,
+		title=dish_tbl.c.title,
+		description=dish_tbl.c.description,
+		price=cast(dish_tbl.c.price, Text),
+	)
+	dishes = select(
+		func.coalesce(func.json_agg(aggregate_order_by(dish_object, dish_tbl.c.id)), empty_list)
+	).where(dish_tbl.c.submenu_id == submenu_tbl.c.id).scalar_subquery()
+	submenu_object = _json_object(
+		id=submenu_tbl.c.id,
+		title=submenu_tbl.c.title,
+		description=submenu_tbl.c.description,
+		dishes_count=submenu_tbl.c.dishes_count,
+		dishes=dishes,
+	)
+	submenus = select(
+		func.coalesce(func.json_agg(aggregate_order_by(submenu_object, submenu_tbl.c.id)), empty_list)
+	).where(submenu_tbl.c.menu_id == menu_tbl.c.id).scalar_subquery()
+	return _json_object(
+		id=menu_tbl.c.id,
+		title=menu_tbl.c.title,
+		description=menu_tbl.c.description,
+		submenus_count=menu_tbl.c.submenus_count,
+		dishes_count=menu_tbl.c.dishes_count,
+		submenus=submenus,
+	)
+
 
-	result_dict = result._asdict()
-	if result_dict["dishes_count"] is None:
-		result_dict["dishes_count"] = 0
+async def get_menu_tree(menu_id: uuid.UUID, session: AsyncSession) -> str:
+	"""
+	Функция, которая выполняет поиск menu со всеми submenu и dish одним запросом.
 
-	result_data = GetSearchMenu(id=result_dict["id"], title=result_dict["title"], description=result_dict["description"],
-								submenus_count=result_dict["submenus_count"], dishes_count=result_dict["dishes_count"])
-	return result_data
+	Принимает 2 аргументa:
+	- session - экземпляр, который обеспечивает асинхронное взаимодействие с БД.
+	- menu_id - uuid искомого menu.
+
+	Возвращает готовый JSON-документ дерева menu, сформированный в Postgres.
+	"""
+	stmt = select(cast(_menu_tree_object(), Text)).where(menu_tbl.c.id == menu_id)
+	result = await session.scalar(stmt)
+	if result is None:
+		raise HTTPException(status_code=404, detail="menu not found")
+	return result
 
 
-async def get_all_menus(session: AsyncSession = Depends(get_async_session)) -> List[GetSearchMenu]:
+async def get_all_menus_tree(session: AsyncSession) -> str:
 	"""
-	Функция, которая выполняет поиск всех меню.
+	Функция, которая выполняет поиск всех menu со всеми submenu и dish одним запросом.
 
 	Принимает 1 аргумент:
 	- session - экземпляр, который обеспечивает асинхронное взаимодействие с БД.
 
-	Возвращает список объектов класса menu.
+	Возвращает готовый JSON-документ со списком деревьев menu, сформированный в Postgres.
 	"""
-	query = select(menu_tbl)
-	rez_query = await session.execute(query)
-	rezult_data = [GetSearchMenu(id=data.id, title=data.title, description=data.description,
-								 submenus_count=data.submenus_count, dishes_count=data.dishes_count)
-				   for data in rez_query]
+	empty_list = literal_column("'[]'::json")
+	stmt = select(cast(
+		func.coalesce(func.json_agg(aggregate_order_by(_menu_tree_object(), menu_tbl.c.id)), empty_list), Text
+	)).select_from(menu_tbl)
+	return await session.scalar(stmt)
 
-	return rezult_data
+
+async def get_all_menus(params: PageParams = Depends(),
+						session: AsyncSession = Depends(get_read_session)) -> RenderedPage:
+	"""
+	Функция, которая выполняет поиск страницы меню.
+
+	Принимает 2 аргумента:
+	- params - параметры keyset-пагинации (limit и cursor).
+	- session - экземпляр, который обеспечивает асинхронное взаимодействие с БД.
+
+	Возвращает страницу объектов класса menu, сериализованную в JSON.
+	"""
+	async def load(session: AsyncSession) -> RenderedPage:
+		rez_query = await session.execute(_menus_page_query(params, live=MENU_COUNTS_STRATEGY == 'live'))
+		return render_page(rez_query.fetchall(), params)
+
+	return await read_through(menus_key(), RenderedPage, load, session, params.cache_field)
 
 
-async def get_meny_by_id(menu_id: uuid.UUID, session: AsyncSession) -> Union[GetSearchMenu, ErrorResponse]:
+async def get_meny_by_id(menu_id: uuid.UUID, session: AsyncSession) -> bytes:
 	"""
 	Функция, которая выполняет поиск меню по id.
 
@@ -73,16 +210,50 @@ async def get_meny_by_id(menu_id: uuid.UUID, session: AsyncSession) -> Union[Get
 	- session - экземпляр, который обеспечивает асинхронное взаимодействие с БД.
 	- menu_id - uuid искомого menu.
 
-	Возвращает объект класса menu.
+	Возвращает объект класса menu, сериализованный в JSON.
 	"""
-	stmt = select(menu_tbl).where(menu_tbl.c.id == menu_id)
-	rez_query = await session.execute(stmt)
-	result = rez_query.fetchone()
-	if result is None:
-		raise HTTPException(status_code=404, detail="menu not found")
-	rezult_data = GetSearchMenu(id=result.id, title=result.title, description=result.description,
-								submenus_count=result.submenus_count, dishes_count=result.dishes_count)
-	return rezult_data
+	async def load(session: AsyncSession) -> bytes:
+		rez_query = await session.execute(_menu_query(menu_id, live=MENU_COUNTS_STRATEGY == 'live'))
+		result = rez_query.fetchone()
+		if result is None:
+			raise HTTPException(status_code=404, detail="menu not found")
+		return render_row(result)
+
+	return await read_through(menu_key(menu_id), bytes, load, session)
+
+
+async def get_menu_etag(menu_id: uuid.UUID, session: AsyncSession) -> Optional[str]:
+	"""
+	Функция, которая возвращает ETag menu по версии строки без загрузки самого объекта.
+
+	Принимает 2 аргументa:
+	- session - экземпляр, который обеспечивает асинхронное взаимодействие с БД.
+	- menu_id - uuid искомого menu.
+
+	Возвращает ETag или None, если объект не найден.
+	"""
+	async def load(session: AsyncSession) -> Optional[str]:
+		version = await session.scalar(select(menu_tbl.c.version).where(menu_tbl.c.id == menu_id))
+		return None if version is None else make_etag(version)
+
+	return await read_through(menu_key(menu_id), Optional[str], load, session, ETAG_FIELD)
+
+
+async def get_menus_etag(session: AsyncSession) -> str:
+	"""
+	Функция, которая возвращает ETag списка menu по кол-ву строк и максимальной версии.
+
+	Принимает 1 аргумент:
+	- session - экземпляр, который обеспечивает асинхронное взаимодействие с БД.
+
+	Возвращает ETag.
+	"""
+	async def load(session: AsyncSession) -> str:
+		query = select(func.count(), func.max(menu_tbl.c.version))
+		count, max_version = (await session.execute(query)).one()
+		return make_etag(count, max_version or 0)
+
+	return await read_through(menus_key(), str, load, session, ETAG_FIELD)
 
 
 async def create_new_menu(new_values: CreateMenu, session: AsyncSession) -> GetSearchMenu:
@@ -96,9 +267,11 @@ async def create_new_menu(new_values: CreateMenu, session: AsyncSession) -> GetS
 	Возвращает объект класса menu.
 	"""
 	id_uuid = uuid.uuid4()
-	stmt = insert(menu_tbl).values(id=id_uuid, title=new_values.title, description=new_values.description)
+	stmt = insert(menu_tbl).values(id=id_uuid, title=new_values.title, description=new_values.description) \
+		.returning(notify_change('create', 'menu', id=menu_tbl.c.id, menu_id=menu_tbl.c.id))
 	await session.execute(stmt)
 	await session.commit()
+	await invalidate(menus_key())
 	info = GetSearchMenu(id=id_uuid, title=new_values.title,
 						 description=new_values.description,
 						 submenus_count=0, dishes_count=0)
@@ -118,8 +291,9 @@ async def update_menu_by_id(menu_id: uuid.UUID,
 
 	Возвращает объект класса menu.
 	"""
-	stmt = update(menu_tbl).where(menu_tbl.c.id == menu_id).values(update_values.model_dump(exclude_none=True)) \
-		.returning(menu_tbl)
+	stmt = update(menu_tbl).where(menu_tbl.c.id == menu_id) \
+		.values(**update_values.model_dump(exclude_none=True), version=catalog_version_seq.next_value()) \
+		.returning(*menu_fields, notify_change('update', 'menu', id=menu_tbl.c.id, menu_id=menu_tbl.c.id))
 	result_stmt = await session.execute(stmt)
 	result = result_stmt.fetchone()
 	if result is None:
@@ -127,6 +301,7 @@ async def update_menu_by_id(menu_id: uuid.UUID,
 	rezult_data = UpdateMenu(id=result.id, title=result.title, description=result.description,
 							 submenus_count=result.submenus_count, dishes_count=result.dishes_count)
 	await session.commit()
+	await invalidate(menus_key(), menu_key(menu_id))
 	return rezult_data
 
 
@@ -140,9 +315,22 @@ async def delete_menu_by_id(menu_id: uuid.UUID, session: AsyncSession) -> Delete
 
 	Возвращает статус выполнения.
 	"""
-	stmt = delete(menu_tbl).where(menu_tbl.c.id == menu_id)
-	result = await session.execute(stmt)
-	if result.rowcount:
+	# Основной SELECT видит снимок до каскадного удаления, поэтому возвращает id удаляемых submenu и dish.
+	deleted = delete(menu_tbl).where(menu_tbl.c.id == menu_id) \
+		.returning(menu_tbl.c.id, notify_change('delete', 'menu', id=menu_tbl.c.id, menu_id=menu_tbl.c.id)).cte('deleted')
+	stmt = select(deleted.c.id, submenu_tbl.c.id.label('submenu_id'), dish_tbl.c.id.label('dish_id')).select_from(
+		deleted.join(submenu_tbl, submenu_tbl.c.menu_id == deleted.c.id, isouter=True)
+		.join(dish_tbl, dish_tbl.c.submenu_id == submenu_tbl.c.id, isouter=True)
+	)
+	rows = (await session.execute(stmt)).fetchall()
+	if rows:
 		await session.commit()
+		stale_keys = {menus_key(), menu_key(menu_id), submenus_key(menu_id)}
+		for row in rows:
+			if row.submenu_id is not None:
+				stale_keys.update((submenu_key(row.submenu_id), dishes_key(row.submenu_id)))
+			if row.dish_id is not None:
+				stale_keys.add(dish_key(row.dish_id))
+		await invalidate(*stale_keys)
 		return DeleteMenu(status=True, message="The menu has been deleted")
 	return DeleteMenu(status=False, message="The menu has not been deleted")
@@ -0,0 +1,118 @@
+import time
+from typing import Any
+
+from prometheus_client import Counter, Gauge, Histogram
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.metrics.sql import DbStats, track_db
+
+# Метки route и method принимают ограниченный набор значений: шаблон пути роута (без uuid) и известные методы.
+UNMATCHED_ROUTE = 'unmatched'
+HTTP_METHODS = frozenset(('GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'))
+
+REQUESTS = Counter('http_requests_total', 'Кол-во HTTP-запросов.', ('method', 'route', 'status'))
+LATENCY = Histogram('http_request_duration_seconds', 'Время обработки HTTP-запроса.', ('method', 'route'))
+IN_PROGRESS = Gauge('http_requests_in_progress', 'Кол-во обрабатываемых HTTP-запросов.', ('method', 'route'))
+RESPONSE_SIZE = Histogram('http_response_size_bytes', 'Размер тела HTTP-ответа.', ('method', 'route'),
+						  buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304))
+
+
+def route_template(scope: Scope) -> str:
+	"""
+	Функция, которая возвращает шаблон пути роута, которому соответствует запрос (например /api/v1/menus/{menu_id}).
+
+	Роут ищется так же, как в Starlette (первое полное совпадение пути и метода), но без route.matches(),
+	который на каждый роут строит child scope и конвертирует параметры пути.
+	"""
+	path = scope['path']
+	partial = None
+	for route in scope['app'].router.routes:
+		path_regex = getattr(route, 'path_regex', None)
+		if path_regex is None or not path_regex.match(path):
+			continue
+		methods = getattr(route, 'methods', None)
+		if methods is None or scope['method'] in methods:
+			return route.path
+		if partial is None:
+			partial = route.path
+	return partial or UNMATCHED_ROUTE
+
+
+class PrometheusMiddleware:
+	"""ASGI middleware, которое собирает метрики HTTP-запросов по роутам."""
+
+	def __init__(self, app: ASGIApp) -> None:
+		self.app = app
+		self._children: dict[tuple, Any] = {}
+
+	async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+		if scope['type'] != 'http':
+			await self.app(scope, receive, send)
+			return
+
+		method = scope['method'] if scope['method'] in HTTP_METHODS else 'OTHER'
+		route = route_template(scope)
+		status_code = 500
+		size = 0
+
+		async def send_wrapper(message: Message) -> None:
+			nonlocal status_code, size
+			if message['type'] == 'http.response.start':
+				status_code = message['status']
+			elif message['type'] == 'http.response.body':
+				size += len(message.get('body', b''))
+			await send(message)
+
+		in_progress, latency, response_size = self._route_metrics(method, route)
+		in_progress.inc()
+		start = time.perf_counter()
+		try:
+			await self.app(scope, receive, send_wrapper)
+		finally:
+			latency.observe(time.perf_counter() - start)
+			response_size.observe(size)
+			self._requests(method, route, status_code).inc()
+			in_progress.dec()
+
+	def _route_metrics(self, method: str, route: str) -> tuple:
+		# labels() на каждый вызов берёт блокировку и ищет дочернюю метрику, поэтому они кэшируются по роуту.
+		key = (method, route)
+		metrics = self._children.get(key)
+		if metrics is None:
+			metrics = self._children[key] = (IN_PROGRESS.labels(method, route), LATENCY.labels(method, route),
+											  RESPONSE_SIZE.labels(method, route))
+		return metrics
+
+	def _requests(self, method: str, route: str, status_code: int) -> Counter:
+		key = (method, route, status_code)
+		counter = self._children.get(key)
+		if counter is None:
+			counter = self._children[key] = REQUESTS.labels(method, route, str(status_code))
+		return counter
+
+
+class ServerTimingMiddleware:
+	"""ASGI middleware, которое добавляет в ответ заголовок Server-Timing с кол-вом и временем обращений к БД."""
+
+	def __init__(self, app: ASGIApp) -> None:
+		self.app = app
+
+	async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+		if scope['type'] != 'http':
+			await self.app(scope, receive, send)
+			return
+
+		with track_db() as stats:
+			async def send_wrapper(message: Message) -> None:
+				if message['type'] == 'http.response.start':
+					headers = MutableHeaders(scope=message)
+					headers.append('Server-Timing', server_timing(stats))
+				await send(message)
+
+			await self.app(scope, receive, send_wrapper)
+
+
+def server_timing(stats: DbStats) -> str:
+	"""Функция, которая возвращает значение Server-Timing: время обращений к БД в мс и их кол-во."""
+	return f'db;dur={stats.total_time * 1000:.2f};desc="{stats.round_trips} round-trips"'
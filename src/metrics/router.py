@@ -0,0 +1,13 @@
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+# Роутер для экспорта метрик
+router = APIRouter(
+	tags=['Metrics']
+)
+
+
+# Роутер метрик в текстовом формате Prometheus.
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+	return Response(content=generate_latest(), headers={"Content-Type": CONTENT_TYPE_LATEST})
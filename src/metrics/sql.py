@@ -0,0 +1,92 @@
+import logging
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterator, Optional, Union
+
+from sqlalchemy import Engine, event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.config import SLOW_QUERY_MS
+
+logger = logging.getLogger(__name__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'(?<![\w$])-?\d+(?:\.\d+)?\b')
+_PARAMETER = re.compile(r'\$\d+|%\(\w+\)s|%s')
+_VALUES_LIST = re.compile(r'\((?:\?, )*\?\)(?:, \((?:\?, )*\?\))+')
+_IN_LIST = re.compile(r'\((?:\?, )+\?\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+@dataclass
+class DbStats:
+	"""Статистика обращений к БД в рамках одного запроса к API."""
+	round_trips: int = 0
+	total_time: float = 0.0
+
+
+# Статистика текущего запроса к API, None - вне запроса (миграции, фоновые задачи).
+db_stats: ContextVar[Optional[DbStats]] = ContextVar('db_stats', default=None)
+
+
+@contextmanager
+def track_db() -> Iterator[DbStats]:
+	"""Контекстный менеджер, который собирает статистику обращений к БД внутри блока."""
+	stats = DbStats()
+	token = db_stats.set(stats)
+	try:
+		yield stats
+	finally:
+		db_stats.reset(token)
+
+
+def normalize_sql(statement: str) -> str:
+	"""
+	Функция, которая приводит SQL к виду, по которому одинаковые запросы группируются в логе.
+
+	Литералы и параметры заменяются на ?, списки значений (multi-row VALUES, IN) сворачиваются.
+	"""
+	statement = _WHITESPACE.sub(' ', statement).strip()
+	statement = _STRING_LITERAL.sub('?', statement)
+	statement = _PARAMETER.sub('?', statement)
+	statement = _NUMBER_LITERAL.sub('?', statement)
+	statement = _VALUES_LIST.sub('(...), ...', statement)
+	return _IN_LIST.sub('(...)', statement)
+
+
+def record_statement(statement: str, elapsed: float) -> None:
+	"""Функция, которая учитывает выполненное выражение в статистике запроса и в логе медленных запросов."""
+	stats = db_stats.get()
+	if stats is not None:
+		stats.round_trips += 1
+		stats.total_time += elapsed
+	if elapsed * 1000 >= SLOW_QUERY_MS:
+		logger.warning('slow query %.1f ms: %s', elapsed * 1000, normalize_sql(statement))
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+	conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+	record_statement(statement, time.perf_counter() - conn.info['query_start'].pop())
+
+
+def _handle_error(exception_context) -> None:
+	# after_cursor_execute не вызывается при ошибке, выражение всё равно учитывается.
+	connection = exception_context.connection
+	if connection is not None and connection.info.get('query_start') and exception_context.statement is not None:
+		record_statement(exception_context.statement, time.perf_counter() - connection.info['query_start'].pop())
+
+
+def instrument_engine(engine: Union[AsyncEngine, Engine]) -> None:
+	"""Функция, которая подключает к engine учёт времени и кол-ва выполненных выражений."""
+	sync_engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+	for name, listener in (('before_cursor_execute', _before_cursor_execute),
+						   ('after_cursor_execute', _after_cursor_execute),
+						   ('handle_error', _handle_error)):
+		if not event.contains(sync_engine, name, listener):
+			event.listen(sync_engine, name, listener)
@@ -0,0 +1,133 @@
+import base64
+import binascii
+import uuid
+from typing import Any, Generic, List, Optional, Tuple, TypeVar, Union
+
+from fastapi import HTTPException, Query, Response
+from pydantic import BaseModel
+from sqlalchemy import Column, Row, Select, tuple_
+
+from src.config import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT
+from src.rendering import render_rows
+
+T = TypeVar('T')
+
+
+class Page(BaseModel, Generic[T]):
+	items: List[T]
+	next_cursor: Optional[str] = None
+
+
+class RenderedPage:
+	"""
+	Страница списка, уже сериализованная в JSON-массив.
+
+	- body - JSON-массив объектов страницы.
+	- next_cursor - курсор следующей страницы или None.
+	"""
+
+	__slots__ = ('body', 'next_cursor')
+
+	def __init__(self, body: bytes, next_cursor: Optional[str] = None):
+		self.body = body
+		self.next_cursor = next_cursor
+
+	def to_bytes(self) -> bytes:
+		# orjson не выводит переводы строк, поэтому первый b'\n' отделяет курсор от тела.
+		return (self.next_cursor or '').encode() + b'\n' + self.body
+
+	@classmethod
+	def from_bytes(cls, data: bytes) -> 'RenderedPage':
+		next_cursor, body = data.split(b'\n', 1)
+		return cls(body, next_cursor.decode() or None)
+
+
+class PageParams:
+	"""
+	Параметры keyset-пагинации списков.
+
+	- limit - максимальное кол-во объектов на странице.
+	- cursor - непрозрачный курсор, полученный в заголовке X-Next-Cursor предыдущей страницы.
+	"""
+
+	def __init__(self, limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+				 cursor: Optional[str] = None):
+		self.limit = limit
+		self.cursor = cursor
+
+	@property
+	def cache_field(self) -> str:
+		return f'{self.cursor or ""}:{self.limit}'
+
+
+def encode_cursor(last_id: uuid.UUID, sort_value: Any = None) -> str:
+	"""
+	Функция, которая кодирует id последнего объекта страницы в непрозрачный курсор.
+
+	При сортировке по другой колонке в курсор после id добавляется её значение у последнего объекта.
+	"""
+	raw = last_id.bytes if sort_value is None else last_id.bytes + str(sort_value).encode()
+	return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def _decode_raw_cursor(cursor: str) -> bytes:
+	try:
+		return base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+	except (binascii.Error, ValueError):
+		raise HTTPException(status_code=400, detail="invalid cursor")
+
+
+def decode_cursor(cursor: str) -> uuid.UUID:
+	"""Функция, которая декодирует курсор в id последнего объекта предыдущей страницы."""
+	try:
+		return uuid.UUID(bytes=_decode_raw_cursor(cursor))
+	except ValueError:
+		raise HTTPException(status_code=400, detail="invalid cursor")
+
+
+def decode_sort_cursor(cursor: str, sort_column: Column) -> Tuple[Any, uuid.UUID]:
+	"""Функция, которая декодирует курсор в значение колонки сортировки и id последнего объекта предыдущей страницы."""
+	raw = _decode_raw_cursor(cursor)
+	try:
+		return sort_column.type.python_type(raw[16:].decode()), uuid.UUID(bytes=raw[:16])
+	except (ArithmeticError, ValueError):
+		raise HTTPException(status_code=400, detail="invalid cursor")
+
+
+def paginate(query: Select, id_column: Column, params: PageParams, sort_column: Optional[Column] = None) -> Select:
+	"""
+	Функция, которая добавляет к запросу keyset-пагинацию по id или по (sort_column, id).
+
+	Запрашивается на 1 строку больше limit, чтобы узнать, есть ли следующая страница.
+	"""
+	if sort_column is None:
+		if params.cursor is not None:
+			query = query.where(id_column > decode_cursor(params.cursor))
+		return query.order_by(id_column).limit(params.limit + 1)
+	if params.cursor is not None:
+		sort_value, last_id = decode_sort_cursor(params.cursor, sort_column)
+		query = query.where(tuple_(sort_column, id_column) > tuple_(sort_value, last_id))
+	return query.order_by(sort_column, id_column).limit(params.limit + 1)
+
+
+def build_page(items: List[T], params: PageParams) -> Page[T]:
+	"""Функция, которая формирует страницу из результата запроса, построенного paginate."""
+	if len(items) > params.limit:
+		items = items[:params.limit]
+		return Page(items=items, next_cursor=encode_cursor(items[-1].id))
+	return Page(items=items)
+
+
+def render_page(rows: List[Row], params: PageParams, sort_column: Optional[Column] = None) -> RenderedPage:
+	"""Функция, которая сериализует страницу из результата запроса, построенного paginate."""
+	if len(rows) > params.limit:
+		rows = rows[:params.limit]
+		sort_value = None if sort_column is None else rows[-1]._mapping[sort_column]
+		return RenderedPage(render_rows(rows), encode_cursor(rows[-1].id, sort_value))
+	return RenderedPage(render_rows(rows))
+
+
+def set_next_cursor(response: Response, page: Union[Page, RenderedPage]) -> None:
+	"""Функция, которая передаёт курсор следующей страницы в заголовке ответа."""
+	if page.next_cursor is not None:
+		response.headers['X-Next-Cursor'] = page.next_cursor
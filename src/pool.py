@@ -0,0 +1,52 @@
+import time
+from typing import Any
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+
+class MeteredQueuePool(AsyncAdaptedQueuePool):
+	"""Пул соединений, который дополнительно считает время ожидания свободного соединения."""
+
+	def __init__(self, *args: Any, **kwargs: Any) -> None:
+		super().__init__(*args, **kwargs)
+		self.checkouts = 0
+		self.timeouts = 0
+		self.wait_total = 0.0
+		self.wait_max = 0.0
+
+	def _do_get(self):
+		start = time.perf_counter()
+		try:
+			return super()._do_get()
+		except exc.TimeoutError:
+			self.timeouts += 1
+			raise
+		finally:
+			elapsed = time.perf_counter() - start
+			self.checkouts += 1
+			self.wait_total += elapsed
+			self.wait_max = max(self.wait_max, elapsed)
+
+	def recreate(self) -> 'MeteredQueuePool':
+		pool = super().recreate()
+		pool.__dict__.update(checkouts=self.checkouts, timeouts=self.timeouts, wait_total=self.wait_total,
+							 wait_max=self.wait_max)
+		return pool
+
+
+def pool_stats(pool: Pool) -> dict[str, Any]:
+	"""
+	Функция, которая возвращает состояние пула соединений.
+
+	Для пулов без очереди (например NullPool в тестах) возвращается только класс пула.
+	"""
+	stats: dict[str, Any] = {'class': type(pool).__name__}
+	if isinstance(pool, QueuePool):
+		stats.update(size=pool.size(), checked_in=pool.checkedin(), checked_out=pool.checkedout(),
+					 overflow=max(0, pool.overflow()), max_overflow=pool._max_overflow, timeout=pool.timeout())
+	if isinstance(pool, MeteredQueuePool):
+		stats.update(checkouts=pool.checkouts, timeouts=pool.timeouts,
+					 wait_avg_ms=pool.wait_total / pool.checkouts * 1000 if pool.checkouts else 0.0,
+					 wait_max_ms=pool.wait_max * 1000)
+	return stats
@@ -0,0 +1,131 @@
+import gzip
+import uuid
+from decimal import Decimal
+from typing import Any, Mapping, Optional, Sequence
+
+import orjson
+from fastapi import Request, Response
+from sqlalchemy import Row
+
+from src.cache.backends import MemoryCache
+from src.config import CACHE_TTL, GZIP_CACHE_MAX_BYTES, GZIP_CACHE_SIZE, GZIP_LEVEL, GZIP_MIN_SIZE
+from src.etag import gzip_etag, set_etag
+
+# Сжатые тела ответов по URL, версии (ETag) и хэшу тела: запись меняет версию, и сжимается уже новое тело,
+# а старые версии вытесняются по давности использования.
+gzip_cache = MemoryCache(GZIP_CACHE_SIZE, GZIP_CACHE_MAX_BYTES)
+
+
+def _keys(row: Row) -> list[str]:
+	# Имена колонок SQLAlchemy - подкласс str (quoted_name), orjson принимает только str.
+	return [str(key) for key in row._fields]
+
+
+def _default(value: Any) -> Any:
+	# numeric (цена) отдаётся в API строкой с масштабом колонки, например '12.50'.
+	if isinstance(value, Decimal):
+		return str(value)
+	raise TypeError
+
+
+def row_object(row: Row) -> dict[str, Any]:
+	"""Функция, которая превращает строку результата запроса в объект для render_json."""
+	return dict(zip(_keys(row), row))
+
+
+def render_row(row: Row) -> bytes:
+	"""Функция, которая сериализует строку результата запроса в JSON без создания schema pydantic."""
+	return orjson.dumps(row_object(row), default=_default)
+
+
+def render_json(value: Any) -> bytes:
+	"""Функция, которая сериализует готовые объекты (dict, list) в JSON по тем же правилам, что и строки запроса."""
+	return orjson.dumps(value, default=_default)
+
+
+def render_batch(ids: Sequence[uuid.UUID], objects: Mapping[uuid.UUID, dict[str, Any]], field: str) -> bytes:
+	"""
+	Функция, которая сериализует ответ batchGet: по элементу на каждый запрошенный id в порядке запроса.
+
+	Принимает 3 аргумента:
+	- ids - запрошенные id (повторы отдаются повторно).
+	- objects - найденные объекты по id.
+	- field - имя поля с объектом, например dish.
+
+	Элемент - {"id": ..., "found": true, field: объект} или {"id": ..., "found": false, field: null}.
+	"""
+	return orjson.dumps([{'id': id_, 'found': id_ in objects, field: objects.get(id_)} for id_ in ids],
+						default=_default)
+
+
+def render_rows(rows: Sequence[Row]) -> bytes:
+	"""Функция, которая сериализует строки результата запроса в JSON-массив без создания schema pydantic."""
+	if not rows:
+		return b'[]'
+	keys = _keys(rows[0])
+	return orjson.dumps([dict(zip(keys, row)) for row in rows], default=_default)
+
+
+def render_ndjson(rows: Sequence[Row], **fields: Any) -> bytes:
+	"""
+	Функция, которая сериализует строки результата запроса в NDJSON (по объекту JSON на строку).
+
+	fields добавляются в начало каждого объекта, например тип выгружаемой записи.
+	"""
+	if not rows:
+		return b''
+	keys = _keys(rows[0])
+	return b''.join(orjson.dumps({**fields, **dict(zip(keys, row))}, default=_default, option=orjson.OPT_APPEND_NEWLINE)
+					for row in rows)
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+	"""
+	Функция, которая проверяет, принимает ли клиент gzip, по заголовку Accept-Encoding.
+
+	Учитываются веса: "gzip;q=0" означает отказ от gzip, "*" - любое кодирование, не указанное явно.
+	"""
+	qualities = {}
+	for item in accept_encoding.lower().split(','):
+		coding, *params = item.split(';')
+		quality = 1.0
+		for param in params:
+			name, _, value = param.partition('=')
+			if name.strip() == 'q':
+				try:
+					quality = float(value)
+				except ValueError:
+					quality = 0.0
+		qualities[coding.strip()] = quality
+	return qualities.get('gzip', qualities.get('*', 0.0)) > 0
+
+
+def json_response(content: bytes) -> Response:
+	"""
+	Функция, которая оборачивает готовый JSON в ответ.
+
+	Ответ возвращается из роутера как есть, поэтому FastAPI не выполняет повторную валидацию по response_model.
+	"""
+	return Response(content=content, media_type='application/json')
+
+
+async def versioned_json_response(request: Request, body: bytes, etag: Optional[str]) -> Response:
+	"""
+	Функция, которая оборачивает готовый JSON в ответ с ETag и сжимает его в gzip, если клиент это принимает.
+
+	Тело сжимается один раз для каждой версии, дальше сжатые байты берутся из gzip_cache. Тела меньше
+	GZIP_MIN_SIZE байт отдаются без сжатия. У сжатого ответа свой ETag (gzip_etag), is_not_modified принимает оба.
+	"""
+	if len(body) < GZIP_MIN_SIZE or not accepts_gzip(request.headers.get('accept-encoding', '')):
+		response = json_response(body)
+	else:
+		key = f'{request.url.path}?{request.url.query}:{etag}:{hash(body)}'
+		compressed = await gzip_cache.get(key)
+		if compressed is None:
+			compressed = gzip.compress(body, GZIP_LEVEL, mtime=0)
+			await gzip_cache.set(key, compressed, CACHE_TTL)
+		response = Response(content=compressed, media_type='application/json', headers={'Content-Encoding': 'gzip'})
+		etag = etag and gzip_etag(etag)
+	response.headers['Vary'] = 'Accept-Encoding'
+	set_etag(response, etag)
+	return response
@@ -0,0 +1,45 @@
+import time
+from http.cookies import SimpleCookie
+
+from fastapi import Request
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.config import READ_YOUR_WRITES_SECONDS
+
+# Cookie с временем последней записи клиента: пока оно не старше окна, чтения идут в основную БД.
+LAST_WRITE_COOKIE = 'last_write'
+WRITE_METHODS = frozenset(('POST', 'PUT', 'PATCH', 'DELETE'))
+
+
+def is_sticky(request: Request) -> bool:
+	"""Функция, которая проверяет, была ли у клиента запись в пределах окна read-your-writes."""
+	try:
+		last_write = float(request.cookies[LAST_WRITE_COOKIE])
+	except (KeyError, ValueError):
+		return False
+	return time.time() - last_write < READ_YOUR_WRITES_SECONDS
+
+
+class ReadYourWritesMiddleware:
+	"""ASGI middleware, которое отмечает клиента cookie после успешной записи."""
+
+	def __init__(self, app: ASGIApp) -> None:
+		self.app = app
+
+	async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+		if scope['type'] != 'http' or scope['method'] not in WRITE_METHODS or READ_YOUR_WRITES_SECONDS <= 0:
+			await self.app(scope, receive, send)
+			return
+
+		async def send_wrapper(message: Message) -> None:
+			if message['type'] == 'http.response.start' and message['status'] < 400:
+				cookie = SimpleCookie()
+				cookie[LAST_WRITE_COOKIE] = f'{time.time():.3f}'
+				cookie[LAST_WRITE_COOKIE]['max-age'] = int(READ_YOUR_WRITES_SECONDS) + 1
+				cookie[LAST_WRITE_COOKIE]['path'] = '/'
+				cookie[LAST_WRITE_COOKIE]['httponly'] = True
+				MutableHeaders(scope=message).append('Set-Cookie', cookie.output(header='').strip())
+			await send(message)
+
+		await self.app(scope, receive, send_wrapper)
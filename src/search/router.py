@@ -0,0 +1,26 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database import get_read_session
+from src.pagination import PageParams, set_next_cursor
+from src.rendering import json_response
+from src.search.schemas import SearchHit
+from src.search.services import search
+
+# Роутер для поиска по каталогу
+router = APIRouter(
+	prefix='/api/v1',
+	tags=['Search']
+)
+
+
+# Роутер полнотекстового поиска menu, submenu и dish, курсор следующей страницы - в заголовке X-Next-Cursor.
+@router.get("/search", response_model=List[SearchHit])
+async def get_search(q: str = Query(min_length=1, max_length=200), params: PageParams = Depends(),
+					 session: AsyncSession = Depends(get_read_session)):
+	page = await search(q, params, session)
+	response = json_response(page.body)
+	set_next_cursor(response, page)
+	return response
@@ -0,0 +1,14 @@
+from typing import Literal
+
+from pydantic import BaseModel, UUID4
+
+
+class SearchHit(BaseModel):
+	type: Literal['menu', 'submenu', 'dish']
+	id: UUID4
+	title: str
+	menu_id: UUID4 | None = None
+	menu_title: str | None = None
+	submenu_id: UUID4 | None = None
+	submenu_title: str | None = None
+	rank: float
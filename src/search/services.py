@@ -0,0 +1,64 @@
+from sqlalchemy import Float, Select, String, Uuid, and_, cast, func, literal, literal_column, null, or_, select, \
+	union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.dish.models import dish as dish_tbl
+from src.menu.models import menu as menu_tbl
+from src.pagination import PageParams, RenderedPage, decode_sort_cursor, render_page
+from src.submenu.models import submenu as submenu_tbl
+
+# Конфигурация должна совпадать с той, что используется в generated-колонках search_vector.
+SEARCH_CONFIG = literal_column("'simple'::regconfig")
+
+
+def _rank(search_vector, ts_query):
+	return func.ts_rank(search_vector, ts_query, type_=Float).label('rank')
+
+
+def _hits_query(q: str) -> Select:
+	"""
+	Функция, которая строит запрос найденных menu, submenu и dish с рангом и путём до каждого объекта.
+
+	Каждая ветка UNION ALL ищет по GIN-индексу своей таблицы (search_vector @@ tsquery).
+	"""
+	ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+	no_id, no_title = cast(null(), Uuid), cast(null(), String)
+	menus = select(
+		literal('menu').label('type'), menu_tbl.c.id, menu_tbl.c.title,
+		no_id.label('menu_id'), no_title.label('menu_title'), no_id.label('submenu_id'), no_title.label('submenu_title'),
+		_rank(menu_tbl.c.search_vector, ts_query),
+	).where(menu_tbl.c.search_vector.bool_op('@@')(ts_query))
+	submenus = select(
+		literal('submenu').label('type'), submenu_tbl.c.id, submenu_tbl.c.title,
+		menu_tbl.c.id.label('menu_id'), menu_tbl.c.title.label('menu_title'),
+		no_id.label('submenu_id'), no_title.label('submenu_title'),
+		_rank(submenu_tbl.c.search_vector, ts_query),
+	).join_from(submenu_tbl, menu_tbl).where(submenu_tbl.c.search_vector.bool_op('@@')(ts_query))
+	dishes = select(
+		literal('dish').label('type'), dish_tbl.c.id, dish_tbl.c.title,
+		menu_tbl.c.id.label('menu_id'), menu_tbl.c.title.label('menu_title'),
+		submenu_tbl.c.id.label('submenu_id'), submenu_tbl.c.title.label('submenu_title'),
+		_rank(dish_tbl.c.search_vector, ts_query),
+	).join_from(dish_tbl, submenu_tbl).join(menu_tbl).where(dish_tbl.c.search_vector.bool_op('@@')(ts_query))
+	return union_all(menus, submenus, dishes).subquery('hits')
+
+
+async def search(q: str, params: PageParams, session: AsyncSession) -> RenderedPage:
+	"""
+	Функция, которая выполняет полнотекстовый поиск по названиям menu, submenu, dish и описаниям dish.
+
+	Принимает 3 аргумента:
+	- session - экземпляр, который обеспечивает асинхронное взаимодействие с БД.
+	- q - поисковый запрос в синтаксисе websearch_to_tsquery (слова, "фразы", -исключения, or).
+	- params - параметры keyset-пагинации (limit и cursor).
+
+	Возвращает страницу найденных объектов, отсортированных по убыванию ранга, сериализованную в JSON.
+	"""
+	hits = _hits_query(q)
+	query = select(hits)
+	if params.cursor is not None:
+		rank, last_id = decode_sort_cursor(params.cursor, hits.c.rank)
+		query = query.where(or_(hits.c.rank < rank, and_(hits.c.rank == rank, hits.c.id > last_id)))
+	query = query.order_by(hits.c.rank.desc(), hits.c.id).limit(params.limit + 1)
+	rez_query = await session.execute(query)
+	return render_page(rez_query.fetchall(), params, hits.c.rank)
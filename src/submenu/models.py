@@ -1,8 +1,9 @@
-from sqlalchemy import Table, Column, String, ForeignKey, Integer
-from sqlalchemy import Uuid
+from sqlalchemy import Table, Column, String, ForeignKey, Integer, Index, CheckConstraint, Computed
+from sqlalchemy import Uuid, BigInteger
+from sqlalchemy.dialects.postgresql import TSVECTOR
 
 from src.database import metadata
-from src.menu.models import menu
+from src.menu.models import menu, catalog_version_seq
 
 # Таблица подменю.
 submenu = Table(
@@ -11,6 +12,15 @@ submenu = Table(
 	Column('id', Uuid, primary_key=True,),
 	Column('title', String(50), nullable=False),
 	Column('description', String(200), default=None),
-	Column('dishes_count', Integer, default=0),
-	Column('menu_id', Uuid, ForeignKey(menu.c.id, ondelete='CASCADE'), default=None),
+	Column('dishes_count', Integer, nullable=False, default=0, server_default='0'),
+	Column('menu_id', Uuid, ForeignKey(menu.c.id, ondelete='CASCADE'), nullable=False),
+	Column('version', BigInteger, nullable=False, server_default=catalog_version_seq.next_value()),
+	# Вектор полнотекстового поиска по названию, вычисляется Postgres при записи строки.
+	Column('search_vector', TSVECTOR, Computed("setweight(to_tsvector('simple', title), 'A')", persisted=True)),
+	CheckConstraint('dishes_count >= 0', name='ck_submenu_dishes_count'),
+	# Индекс по FK для списка submenu (keyset-пагинация по id) и каскадного удаления menu.
+	Index('ix_submenu_menu_id_id', 'menu_id', 'id'),
+	Index('ix_submenu_search_vector', 'search_vector', postgresql_using='gin'),
+	# Триграммный индекс для автодополнения по префиксу и нечёткому совпадению названия (pg_trgm).
+	Index('ix_submenu_title_trgm', 'title', postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'}),
 )
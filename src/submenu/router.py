@@ -1,14 +1,18 @@
 import uuid
 from typing import List, Union
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database import get_async_session
+from src.config import BATCH_GET_MAX_IDS
+from src.database import get_async_session, get_read_session
+from src.etag import is_not_modified, not_modified
+from src.pagination import PageParams, set_next_cursor
+from src.rendering import versioned_json_response
 from src.submenu.schemas import GetSearchSubmenus, CreateSubmenu, ErrorResponse, UpdateSubmenu, DataUpdateSubmenu, \
-	DeleteSubmenu
+	DeleteSubmenu, BatchGetSubmenu
 from src.submenu.services import create_new_submenu, get_all_submenus, update_submenu_by_id, \
-	delete_submenu_by_id, get_submenus_by_id
+	delete_submenu_by_id, get_submenus_by_id, get_submenu_etag, get_submenus_etag, get_submenus_by_ids
 
 # Роутер для управления submenu
 router = APIRouter(
@@ -19,9 +23,15 @@ router = APIRouter(
 
 # Роутер для получения списка всех submenu.
 @router.get("/menus/{menu_id}/submenus", response_model=List[GetSearchSubmenus])
-async def get_submenus(menu_id: uuid.UUID, session: AsyncSession = Depends(get_async_session)):
-	answer = await get_all_submenus(menu_id, session)
-	return answer
+async def get_submenus(menu_id: uuid.UUID, request: Request, params: PageParams = Depends(),
+					   session: AsyncSession = Depends(get_read_session)):
+	etag = await get_submenus_etag(menu_id, session)
+	if is_not_modified(request, etag):
+		return not_modified(request, etag)
+	page = await get_all_submenus(menu_id, params, session)
+	response = await versioned_json_response(request, page.body, etag)
+	set_next_cursor(response, page)
+	return response
 
 
 # Роутер для создания submenu.
@@ -31,11 +41,22 @@ async def create_submenu(menu_id: uuid.UUID, values: CreateSubmenu, session: Asy
 	return answer
 
 
+# Роутер для получения нескольких submenu по id одним запросом (в порядке id, с признаком found).
+@router.get("/submenus:batchGet", response_model=List[BatchGetSubmenu])
+async def batch_get_submenus(ids: List[uuid.UUID] = Query([], max_length=BATCH_GET_MAX_IDS),
+							 session: AsyncSession = Depends(get_read_session)):
+	answer = await get_submenus_by_ids(ids, session)
+	return Response(content=answer, media_type="application/json")
+
+
 # Роутер для получения submenu по id.
 @router.get("/menus/{menu_id}/submenus/{submenu_id}", response_model=Union[GetSearchSubmenus, ErrorResponse])
-async def get_submenu(submenu_id: uuid.UUID, session: AsyncSession = Depends(get_async_session)):
-	answer = await get_submenus_by_id(submenu_id, session)
-	return answer
+async def get_submenu(submenu_id: uuid.UUID, request: Request, session: AsyncSession = Depends(get_read_session)):
+	etag = await get_submenu_etag(submenu_id, session)
+	if is_not_modified(request, etag):
+		return not_modified(request, etag)
+	response = await versioned_json_response(request, await get_submenus_by_id(submenu_id, session), etag)
+	return response
 
 
 # Роутер для обновления submenu по id.
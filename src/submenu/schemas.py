@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import BaseModel, UUID4
 
 
@@ -32,3 +34,9 @@ class DeleteSubmenu(BaseModel):
 
 class ErrorResponse(BaseModel):
 	detail: str
+
+
+class BatchGetSubmenu(BaseModel):
+	id: UUID4
+	found: bool
+	submenu: Optional[GetSearchSubmenus] = None
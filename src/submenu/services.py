@@ -1,33 +1,46 @@
 import uuid
-from typing import List, Union
+from typing import Optional, Sequence, Union
 
 from fastapi import HTTPException
-from sqlalchemy import insert, update, select, delete
+from sqlalchemy import insert, update, select, delete, func, any_, bindparam, Uuid
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.menu.models import menu as menu_tbl
+from src.cache.keys import menus_key, menu_key, submenus_key, submenu_key, dishes_key, dish_key, ETAG_FIELD
+from src.cache.services import read_through, invalidate
+from src.dish.models import dish as dish_tbl
+from src.etag import make_etag
+from src.events.services import notify_change
+from src.menu.models import menu as menu_tbl, catalog_version_seq
+from src.pagination import PageParams, RenderedPage, paginate, render_page
+from src.rendering import render_batch, render_row, row_object
 from src.submenu.models import submenu as submenu_tbl
 from src.submenu.schemas import GetSearchSubmenus, CreateSubmenu, ErrorResponse, DataUpdateSubmenu, UpdateSubmenu, \
 	DeleteSubmenu
 
 
-async def get_all_submenus(menu_id: uuid.UUID, session: AsyncSession) -> List[GetSearchSubmenus]:
+# Колонки submenu, которые отдаются в ответах API.
+submenu_fields = (submenu_tbl.c.id, submenu_tbl.c.title, submenu_tbl.c.description, submenu_tbl.c.dishes_count)
+
+
+async def get_all_submenus(menu_id: uuid.UUID, params: PageParams,
+						   session: AsyncSession) -> RenderedPage:
 	"""
-	Функция, которая выполняет поиск всех submenu.
+	Функция, которая выполняет поиск страницы submenu.
 
-	Принимает 2 аргумент:
+	Принимает 3 аргумента:
 	- session - экземпляр, который обеспечивает асинхронное взаимодействие с БД.
 	- menu_id - uuid menu, к которому относятся искомые submenu.
+	- params - параметры keyset-пагинации (limit и cursor).
 
-	Возвращает список объектов класса submenu.
+	Возвращает страницу объектов класса submenu, сериализованную в JSON.
 	"""
-	query = select(submenu_tbl).where(submenu_tbl.c.menu_id == menu_id)
-	rez_query = await session.execute(query)
-	rezult_data = [GetSearchSubmenus(id=data.id, title=data.title,
-									 description=data.description,
-									 dishes_count=data.dishes_count)
-				   for data in rez_query]
-	return rezult_data
+	async def load(session: AsyncSession) -> RenderedPage:
+		query = paginate(select(*submenu_fields).where(submenu_tbl.c.menu_id == menu_id), submenu_tbl.c.id, params)
+		rez_query = await session.execute(query)
+		return render_page(rez_query.fetchall(), params)
+
+	return await read_through(submenus_key(menu_id), RenderedPage, load, session, params.cache_field)
 
 
 
@@ -44,21 +57,23 @@ async def create_new_submenu(menu_id: uuid.UUID, new_values: CreateSubmenu, sess
 	"""
 	id_uuid = uuid.uuid4()
 
-	stmt_create = insert(submenu_tbl).values(id=id_uuid, title=new_values.title,
-									  description=new_values.description,
-									  dishes_count=0, menu_id=menu_id)
-	stmt_update = update(menu_tbl).where(menu_tbl.c.id == menu_id).values(submenus_count=menu_tbl.c.submenus_count + 1)
+	created = insert(submenu_tbl).values(id=id_uuid, title=new_values.title,
+										 description=new_values.description,
+										 dishes_count=0, menu_id=menu_id) \
+		.returning(notify_change('create', 'submenu', id=submenu_tbl.c.id, menu_id=submenu_tbl.c.menu_id)).cte('created')
+	stmt = update(menu_tbl).where(menu_tbl.c.id == menu_id) \
+		.values(submenus_count=menu_tbl.c.submenus_count + 1, version=catalog_version_seq.next_value()).add_cte(created)
 
-	await session.execute(stmt_create)
-	await session.execute(stmt_update)
+	await session.execute(stmt)
 	await session.commit()
+	await invalidate(menus_key(), menu_key(menu_id), submenus_key(menu_id))
 	rezult = GetSearchSubmenus(id=id_uuid, title=new_values.title,
 							 description=new_values.description,
 							 submenus_count=0, dishes_count=0)
 	return rezult
 
 
-async def get_submenus_by_id(submenu_id: uuid.UUID, session: AsyncSession) -> GetSearchSubmenus:
+async def get_submenus_by_id(submenu_id: uuid.UUID, session: AsyncSession) -> bytes:
 	"""
 	Функция, которая выполняет поиск submenu по id.
 
@@ -66,17 +81,71 @@ async def get_submenus_by_id(submenu_id: uuid.UUID, session: AsyncSession) -> Ge
 	- session - экземпляр, который обеспечивает асинхронное взаимодействие с БД.
 	- submenu_id - uuid искомого submenu.
 
-	Возвращает объект класса submenu.
+	Возвращает объект класса submenu, сериализованный в JSON.
+	"""
+	async def load(session: AsyncSession) -> bytes:
+		query = select(*submenu_fields).where(submenu_tbl.c.id == submenu_id)
+		rez_query = await session.execute(query)
+		result = rez_query.fetchone()
+		if result is None:
+			raise HTTPException(status_code=404, detail="submenu not found")
+		return render_row(result)
+
+	return await read_through(submenu_key(submenu_id), bytes, load, session)
+
+
+async def get_submenus_by_ids(submenu_ids: Sequence[uuid.UUID], session: AsyncSession) -> bytes:
 	"""
-	query = select(submenu_tbl).where(submenu_tbl.c.id == submenu_id)
+	Функция, которая выполняет поиск нескольких submenu по id одним запросом (id = ANY(:ids)).
+
+	Принимает 2 аргументa:
+	- session - экземпляр, который обеспечивает асинхронное взаимодействие с БД.
+	- submenu_ids - uuid искомых submenu.
+
+	Возвращает submenu в порядке запрошенных id с признаком found (ненайденные - с submenu null), сериализованные
+	в JSON.
+	"""
+	if not submenu_ids:
+		return b'[]'
+	query = select(*submenu_fields).where(
+		submenu_tbl.c.id == any_(bindparam('ids', list(submenu_ids), type_=ARRAY(Uuid))))
 	rez_query = await session.execute(query)
-	result = rez_query.fetchone()
-	if result is None:
-		raise HTTPException(status_code=404, detail="submenu not found")
-	rezult_data = GetSearchSubmenus(id=result.id, title=result.title,
-									 description=result.description,
-									 dishes_count=result.dishes_count)
-	return rezult_data
+	return render_batch(submenu_ids, {row.id: row_object(row) for row in rez_query}, 'submenu')
+
+
+async def get_submenu_etag(submenu_id: uuid.UUID, session: AsyncSession) -> Optional[str]:
+	"""
+	Функция, которая возвращает ETag submenu по версии строки без загрузки самого объекта.
+
+	Принимает 2 аргументa:
+	- session - экземпляр, который обеспечивает асинхронное взаимодействие с БД.
+	- submenu_id - uuid искомого submenu.
+
+	Возвращает ETag или None, если объект не найден.
+	"""
+	async def load(session: AsyncSession) -> Optional[str]:
+		version = await session.scalar(select(submenu_tbl.c.version).where(submenu_tbl.c.id == submenu_id))
+		return None if version is None else make_etag(version)
+
+	return await read_through(submenu_key(submenu_id), Optional[str], load, session, ETAG_FIELD)
+
+
+async def get_submenus_etag(menu_id: uuid.UUID, session: AsyncSession) -> str:
+	"""
+	Функция, которая возвращает ETag списка submenu по кол-ву строк и максимальной версии.
+
+	Принимает 2 аргументa:
+	- session - экземпляр, который обеспечивает асинхронное взаимодействие с БД.
+	- menu_id - uuid menu, к которому относятся submenu.
+
+	Возвращает ETag.
+	"""
+	async def load(session: AsyncSession) -> str:
+		query = select(func.count(), func.max(submenu_tbl.c.version)).where(submenu_tbl.c.menu_id == menu_id)
+		count, max_version = (await session.execute(query)).one()
+		return make_etag(count, max_version or 0)
+
+	return await read_through(submenus_key(menu_id), str, load, session, ETAG_FIELD)
 
 
 async def update_submenu_by_id(submenu_id: uuid.UUID,
@@ -92,8 +161,10 @@ async def update_submenu_by_id(submenu_id: uuid.UUID,
 
 	Возвращает объект класса submenu.
 	"""
-	stmt = update(submenu_tbl).where(submenu_tbl.c.id == submenu_id).values(update_values.model_dump(exclude_none=True)) \
-		.returning(submenu_tbl)
+	stmt = update(submenu_tbl).where(submenu_tbl.c.id == submenu_id) \
+		.values(**update_values.model_dump(exclude_none=True), version=catalog_version_seq.next_value()) \
+		.returning(*submenu_fields, submenu_tbl.c.menu_id,
+				   notify_change('update', 'submenu', id=submenu_tbl.c.id, menu_id=submenu_tbl.c.menu_id))
 	result_stmt = await session.execute(stmt)
 	result = result_stmt.fetchone()
 	if result is None:
@@ -102,6 +173,7 @@ async def update_submenu_by_id(submenu_id: uuid.UUID,
 								description=result.description,
 								dishes_count=result.dishes_count)
 	await session.commit()
+	await invalidate(submenu_key(submenu_id), submenus_key(result.menu_id))
 	return rezult_data
 
 
@@ -117,23 +189,25 @@ async def delete_submenu_by_id(menu_id: uuid.UUID, submenu_id: uuid.UUID, sessio
 
 	Возвращает статус выполнения.
 	"""
-	query_count_dish = select(submenu_tbl.c.dishes_count).where(submenu_tbl.c.id == submenu_id)
-	result = await session.execute(query_count_dish)
-	dishes_count = result.fetchone()[0]
-
-	stmt_del_submenu = delete(submenu_tbl).where(submenu_tbl.c.id == submenu_id)
-	result = await session.execute(stmt_del_submenu)
-
-	if result.rowcount:
-		stmt_update_menu_sub = update(menu_tbl).where(menu_tbl.c.id == menu_id).values(
-			submenus_count=menu_tbl.c.submenus_count - 1)
-
-		stmt_update_menu_dish = update(menu_tbl).where(menu_tbl.c.id == menu_id).values(
-			dishes_count=menu_tbl.c.dishes_count - dishes_count)
-
-		await session.execute(stmt_update_menu_sub)
-		await session.execute(stmt_update_menu_dish)
+	# Удаление submenu и обновление счётчиков menu выполняются одним запросом.
+	# Основной SELECT видит снимок до каскадного удаления, поэтому возвращает id удаляемых dish.
+	deleted = delete(submenu_tbl).where(submenu_tbl.c.id == submenu_id) \
+		.returning(submenu_tbl.c.id, submenu_tbl.c.dishes_count,
+				   notify_change('delete', 'submenu', id=submenu_tbl.c.id, menu_id=submenu_tbl.c.menu_id)).cte('deleted')
+	updated_menu = update(menu_tbl).where(menu_tbl.c.id == menu_id).values(
+		submenus_count=menu_tbl.c.submenus_count - 1,
+		dishes_count=menu_tbl.c.dishes_count - deleted.c.dishes_count,
+		version=catalog_version_seq.next_value()).cte('updated_menu')
+	stmt = select(deleted.c.id, dish_tbl.c.id.label('dish_id')).select_from(
+		deleted.join(dish_tbl, dish_tbl.c.submenu_id == deleted.c.id, isouter=True)
+	).add_cte(updated_menu)
+	rows = (await session.execute(stmt)).fetchall()
+
+	if rows:
 		await session.commit()
+		await invalidate(menus_key(), menu_key(menu_id), submenus_key(menu_id),
+						 submenu_key(submenu_id), dishes_key(submenu_id),
+						 *(dish_key(row.dish_id) for row in rows if row.dish_id is not None))
 
 		return DeleteSubmenu(status=True, message="The submenu has been deleted")
 
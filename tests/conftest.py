@@ -4,31 +4,44 @@ import pytest_asyncio
 
 sys.path.append("..")
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from src.config import DB_USER_TEST, DB_PASS_TEST, DB_HOST_TEST, DB_PORT_TEST, DB_NAME_TEST
+from src.config import DB_USER_TEST, DB_PASS_TEST, DB_HOST_TEST, DB_PORT_TEST, DB_NAME_TEST, DB_USER_REPLICA_TEST, \
+	DB_PASS_REPLICA_TEST, DB_HOST_REPLICA_TEST, DB_PORT_REPLICA_TEST, DB_NAME_REPLICA_TEST
 from typing import AsyncGenerator, Any
 from httpx import AsyncClient
 from sqlalchemy import NullPool, select
-from src.database import get_async_session
+from src.database import get_async_session, get_read_session, get_read_session_maker
 from src.database import metadata as base_metadata
 from src.menu.models import menu as menu_tbl
 from src.submenu.models import submenu as submenu_tbl
 from src.dish.models import dish as dish_tbl
 from src.main import create_app
+from src.metrics.sql import instrument_engine
 
 TEST_DATABASE_URL = f'postgresql+asyncpg://{DB_USER_TEST}:{DB_PASS_TEST}@{DB_HOST_TEST}:{DB_PORT_TEST}/{DB_NAME_TEST}'
+# Вторая БД изображает реплику: репликации нет, поэтому в ней видны только данные, записанные напрямую.
+TEST_REPLICA_DATABASE_URL = f'postgresql+asyncpg://{DB_USER_REPLICA_TEST}:{DB_PASS_REPLICA_TEST}@' \
+							f'{DB_HOST_REPLICA_TEST}:{DB_PORT_REPLICA_TEST}/{DB_NAME_REPLICA_TEST}'
 
 engine_test = create_async_engine(TEST_DATABASE_URL, poolclass=NullPool)
+instrument_engine(engine_test)
 async_session_maker_test = async_sessionmaker(bind=engine_test, class_=AsyncSession, expire_on_commit=False)
 base_metadata.bind = engine_test
 
+engine_replica_test = create_async_engine(TEST_REPLICA_DATABASE_URL, poolclass=NullPool)
+instrument_engine(engine_replica_test)
+async_session_maker_replica_test = async_sessionmaker(bind=engine_replica_test, class_=AsyncSession,
+													  expire_on_commit=False)
+
 
 @pytest_asyncio.fixture(scope="session", autouse=True)
 async def create_migration():
-	async with engine_test.begin() as connection:
-		await connection.run_sync(base_metadata.create_all)
+	for engine in (engine_test, engine_replica_test):
+		async with engine.begin() as connection:
+			await connection.run_sync(base_metadata.create_all)
 	yield
-	async with engine_test.begin() as connection:
-		await connection.run_sync(base_metadata.drop_all)
+	for engine in (engine_test, engine_replica_test):
+		async with engine.begin() as connection:
+			await connection.run_sync(base_metadata.drop_all)
 
 
 async def override_get_async_session() -> AsyncGenerator[AsyncSession, None]:
@@ -40,6 +53,8 @@ async def override_get_async_session() -> AsyncGenerator[AsyncSession, None]:
 async def ac() -> AsyncGenerator[AsyncClient, None]:
 	app = create_app()
 	app.dependency_overrides[get_async_session] = override_get_async_session
+	app.dependency_overrides[get_read_session] = override_get_async_session
+	app.dependency_overrides[get_read_session_maker] = lambda: async_session_maker_test
 	async with AsyncClient(app=app, base_url='http://localhost:8000') as ac:
 		yield ac
 
@@ -0,0 +1,52 @@
+import uuid
+from http import HTTPStatus
+
+from httpx import AsyncClient
+
+from src.cache import backends
+from src.cache.backends import MemoryCache
+from src.cache.keys import menu_key
+from src.cache import services as cache_services
+from tests.data_for_tests.data_menu import data_for_create_menu
+from tests.data_for_tests.data_submenu import data_for_create_submenu
+
+
+async def test_memory_cache_evicts_least_recently_used():
+	"""Проверка на вытеснение самого давно использованного ключа."""
+	cache = MemoryCache(max_size=2)
+	await cache.set('a', b'1', 60)
+	await cache.set('b', b'2', 60)
+	assert await cache.get('a') == b'1', "Ключ 'a' не найден в кэше."
+	await cache.set('c', b'3', 60)
+	assert await cache.get('b') is None, "Ключ 'b' не был вытеснен."
+	assert await cache.get('a') == b'1', "Ключ 'a' был вытеснен."
+	assert await cache.get('c') == b'3', "Ключ 'c' не найден в кэше."
+
+
+async def test_memory_cache_expires_by_ttl(monkeypatch):
+	"""Проверка на истечение TTL ключа."""
+	now = [1000.0]
+	monkeypatch.setattr(backends.time, 'monotonic', lambda: now[0])
+	cache = MemoryCache()
+	await cache.set('a', b'1', 10)
+	now[0] += 9
+	assert await cache.get('a') == b'1', "Ключ истёк раньше TTL."
+	now[0] += 1
+	assert await cache.get('a') is None, "Ключ не истёк после TTL."
+
+
+async def test_write_invalidates_parent_menu(ac: AsyncClient):
+	"""Проверка на сброс кэша menu после создания submenu."""
+	response = await ac.post('/api/v1/menus', json=data_for_create_menu)
+	menu_id = uuid.UUID(response.json()["id"])
+	response = await ac.get(f"/api/v1/menus/{menu_id}")
+	assert response.json()["submenus_count"] == 0, "Поле 'submenus_count' не соответствует ожидаемому"
+	assert await cache_services.cache_backend.get(menu_key(menu_id)) is not None, "Menu не попало в кэш."
+
+	await ac.post(f"/api/v1/menus/{menu_id}/submenus", json=data_for_create_submenu)
+	assert await cache_services.cache_backend.get(menu_key(menu_id)) is None, "Кэш menu не был сброшен."
+	response = await ac.get(f"/api/v1/menus/{menu_id}")
+	assert response.json()["submenus_count"] == 1, "Поле 'submenus_count' не соответствует ожидаемому"
+
+	response = await ac.delete(f"/api/v1/menus/{menu_id}")
+	assert response.status_code == HTTPStatus.OK, "Статус ответа не 200."
@@ -0,0 +1,50 @@
+import uuid
+from http import HTTPStatus
+
+from httpx import AsyncClient
+
+from tests.data_for_tests.data_dish import data_for_create_some_dish
+from tests.data_for_tests.data_menu import data_for_create_menu
+from tests.data_for_tests.data_submenu import data_for_create_submenu
+
+
+async def test_get_menu_tree(ac: AsyncClient):
+	"""Проверка на получение дерева menu -> submenu -> dish."""
+	response = await ac.post('/api/v1/menus', json=data_for_create_menu)
+	menu_id = response.json()["id"]
+	response = await ac.post(f"/api/v1/menus/{menu_id}/submenus", json=data_for_create_submenu)
+	submenu_id = response.json()["id"]
+	for dish in data_for_create_some_dish:
+		await ac.post(f"/api/v1/menus/{menu_id}/submenus/{submenu_id}/dishes", json=dish)
+
+	response = await ac.get(f"/api/v1/menus/{menu_id}/tree")
+	answer_response = response.json()
+	assert response.status_code == HTTPStatus.OK, "Статус ответа не 200."
+	assert response.headers["content-type"] == "application/json", "Ответ не в формате JSON."
+	assert answer_response["id"] == menu_id, "Id меню не соответствует ожидаемому"
+	assert answer_response["submenus_count"] == 1, "Поле 'submenus_count' не соответствует ожидаемому"
+	assert answer_response["dishes_count"] == 2, "Поле 'dishes_count' не соответствует ожидаемому"
+	assert len(answer_response["submenus"]) == 1, "Кол-во подменю не соответствует ожидаемому"
+	dishes = answer_response["submenus"][0]["dishes"]
+	assert sorted(dish["title"] for dish in dishes) == sorted(dish["title"] for dish in data_for_create_some_dish), \
+		"Блюда подменю не соответствуют заданным."
+
+	response = await ac.get('/api/v1/menus/tree')
+	assert response.status_code == HTTPStatus.OK, "Статус ответа не 200."
+	assert [menu["id"] for menu in response.json()] == [menu_id], "Список деревьев меню не соответствует ожидаемому"
+
+	await ac.delete(f"/api/v1/menus/{menu_id}")
+
+
+async def test_get_menu_tree_not_found(ac: AsyncClient):
+	"""Проверка на получение дерева несуществующего меню."""
+	response = await ac.get(f"/api/v1/menus/{uuid.uuid4()}/tree")
+	assert response.status_code == HTTPStatus.NOT_FOUND, "Статус ответа не 404."
+	assert response.json()["detail"] == "menu not found", "Сообщение об ошибке не соответствует ожидаемому"
+
+
+async def test_get_empty_menus_tree(ac: AsyncClient):
+	"""Проверка на получение пустого списка деревьев меню."""
+	response = await ac.get('/api/v1/menus/tree')
+	assert response.status_code == HTTPStatus.OK, "Статус ответа не 200."
+	assert response.json() == [], "Список деревьев меню не пуст."
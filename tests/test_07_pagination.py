@@ -0,0 +1,46 @@
+from http import HTTPStatus
+
+from httpx import AsyncClient
+
+from tests.data_for_tests.data_menu import data_for_create_menu
+from tests.data_for_tests.data_submenu import data_for_create_some_submenu
+
+
+async def test_submenus_keyset_pagination(ac: AsyncClient):
+	"""Проверка на постраничное получение submenu по курсору."""
+	response = await ac.post('/api/v1/menus', json=data_for_create_menu)
+	menu_id = response.json()["id"]
+	created = set()
+	for submenu in data_for_create_some_submenu * 2:
+		response = await ac.post(f"/api/v1/menus/{menu_id}/submenus", json=submenu)
+		created.add(response.json()["id"])
+
+	received = []
+	params = {"limit": 3}
+	while True:
+		response = await ac.get(f"/api/v1/menus/{menu_id}/submenus", params=params)
+		assert response.status_code == HTTPStatus.OK, "Статус ответа не 200."
+		page = response.json()
+		assert len(page) <= 3, "Размер страницы больше limit."
+		received.extend(submenu["id"] for submenu in page)
+		if "x-next-cursor" not in response.headers:
+			break
+		params["cursor"] = response.headers["x-next-cursor"]
+
+	assert len(received) == len(created), "Подменю повторяются или пропущены."
+	assert set(received) == created, "Список подменю не соответствует созданным."
+
+	await ac.delete(f"/api/v1/menus/{menu_id}")
+
+
+async def test_pagination_invalid_cursor(ac: AsyncClient):
+	"""Проверка на ответ при некорректном курсоре."""
+	response = await ac.get('/api/v1/menus', params={"cursor": "not-a-cursor"})
+	assert response.status_code == HTTPStatus.BAD_REQUEST, "Статус ответа не 400."
+	assert response.json()["detail"] == "invalid cursor", "Сообщение об ошибке не соответствует ожидаемому"
+
+
+async def test_pagination_limit_bounds(ac: AsyncClient):
+	"""Проверка на ограничение параметра limit."""
+	response = await ac.get('/api/v1/menus', params={"limit": 0})
+	assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY, "Статус ответа не 422."
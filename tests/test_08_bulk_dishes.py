@@ -0,0 +1,65 @@
+import uuid
+from http import HTTPStatus
+
+import pytest
+from httpx import AsyncClient
+
+from src.config import BULK_MAX_DISHES
+from src.dish import services as dish_services
+from tests.data_for_tests.data_dish import data_for_create_some_dish
+from tests.data_for_tests.data_menu import data_for_create_menu
+from tests.data_for_tests.data_submenu import data_for_create_submenu
+
+
+@pytest.mark.parametrize("copy_threshold", [1000, 1])
+async def test_bulk_create_dishes(ac: AsyncClient, monkeypatch, copy_threshold: int):
+	"""Проверка на создание пачки блюд через INSERT и через COPY."""
+	monkeypatch.setattr(dish_services, "BULK_COPY_THRESHOLD", copy_threshold)
+	response = await ac.post('/api/v1/menus', json=data_for_create_menu)
+	menu_id = response.json()["id"]
+	response = await ac.post(f"/api/v1/menus/{menu_id}/submenus", json=data_for_create_submenu)
+	submenu_id = response.json()["id"]
+
+	response = await ac.post(f"/api/v1/menus/{menu_id}/submenus/{submenu_id}/dishes/bulk",
+							 json=data_for_create_some_dish)
+	answer_response = response.json()
+	assert response.status_code == HTTPStatus.CREATED, "Статус ответа не 201."
+	assert [dish["title"] for dish in answer_response] == [dish["title"] for dish in data_for_create_some_dish], \
+		"Порядок блюд не соответствует запросу."
+
+	for dish in answer_response:
+		response = await ac.get(f"/api/v1/menus/{menu_id}/submenus/{submenu_id}/dishes/{dish['id']}")
+		assert response.json() == dish, "Созданное блюдо не соответствует ответу."
+
+	response = await ac.get(f"/api/v1/menus/{menu_id}/submenus/{submenu_id}")
+	assert response.json()["dishes_count"] == len(data_for_create_some_dish), \
+		"Поле 'dishes_count' подменю не соответствует ожидаемому"
+	response = await ac.get(f"/api/v1/menus/{menu_id}")
+	assert response.json()["dishes_count"] == len(data_for_create_some_dish), \
+		"Поле 'dishes_count' меню не соответствует ожидаемому"
+
+	await ac.delete(f"/api/v1/menus/{menu_id}")
+
+
+async def test_bulk_create_dishes_unknown_submenu(ac: AsyncClient):
+	"""Проверка на создание пачки блюд в несуществующем подменю."""
+	response = await ac.post(f"/api/v1/menus/{uuid.uuid4()}/submenus/{uuid.uuid4()}/dishes/bulk",
+							 json=data_for_create_some_dish)
+	assert response.status_code == HTTPStatus.NOT_FOUND, "Статус ответа не 404."
+	assert response.json()["detail"] == "submenu not found", "Сообщение об ошибке не соответствует ожидаемому"
+
+
+async def test_bulk_insert_above_parameter_limit(ac: AsyncClient, monkeypatch):
+	"""Проверка на создание через INSERT пачки, для которой одному запросу не хватило бы параметров asyncpg."""
+	monkeypatch.setattr(dish_services, "BULK_COPY_THRESHOLD", BULK_MAX_DISHES + 1)
+	dishes = [{"title": f"dish {number}", "description": "", "price": "1.00"}
+			  for number in range(dish_services.MAX_QUERY_PARAMS // 5 + 10)]
+	menu_id = (await ac.post('/api/v1/menus', json=data_for_create_menu)).json()["id"]
+	submenu_id = (await ac.post(f"/api/v1/menus/{menu_id}/submenus", json=data_for_create_submenu)).json()["id"]
+
+	response = await ac.post(f"/api/v1/menus/{menu_id}/submenus/{submenu_id}/dishes/bulk", json=dishes)
+	assert response.status_code == HTTPStatus.CREATED, "Статус ответа не 201."
+	response = await ac.get(f"/api/v1/menus/{menu_id}/submenus/{submenu_id}")
+	assert response.json()["dishes_count"] == len(dishes), "Поле 'dishes_count' подменю не соответствует ожидаемому"
+
+	await ac.delete(f"/api/v1/menus/{menu_id}")
@@ -0,0 +1,146 @@
+import json
+
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import event, text
+
+from src.cache import services as cache_services
+from conftest import engine_test, async_session_maker_test
+
+SEED_MENUS = 20
+SEED_SUBMENUS_PER_MENU = 50
+SEED_DISHES_PER_SUBMENU = 50
+
+
+class StatementRecorder:
+	"""Контекстный менеджер, который запоминает SQL-запросы, отправленные в тестовую БД."""
+
+	def __init__(self):
+		self.statements = []
+
+	def _record(self, conn, cursor, statement, parameters, context, executemany):
+		self.statements.append((statement, parameters))
+
+	def __enter__(self):
+		event.listen(engine_test.sync_engine, 'before_cursor_execute', self._record)
+		return self
+
+	def __exit__(self, *args):
+		event.remove(engine_test.sync_engine, 'before_cursor_execute', self._record)
+
+
+async def explain(statement: str, parameters) -> list[dict]:
+	"""Функция, которая возвращает список узлов плана запроса (EXPLAIN без выполнения)."""
+	async with engine_test.connect() as connection:
+		raw_connection = await connection.get_raw_connection()
+		plan = await raw_connection.driver_connection.fetchval(f'EXPLAIN (FORMAT JSON) {statement}', *parameters)
+	nodes, stack = [], [json.loads(plan)[0]['Plan']]
+	while stack:
+		node = stack.pop()
+		nodes.append(node)
+		stack.extend(node.get('Plans', []))
+	return nodes
+
+
+async def plan_of_request(request) -> list[dict]:
+	"""Функция, которая выполняет запрос к API и возвращает план последнего выполненного им SQL-запроса."""
+	await cache_services.cache_backend.clear()
+	with StatementRecorder() as recorder:
+		await request
+	assert recorder.statements, "Запрос не выполнил ни одного SQL-запроса."
+	return await explain(*recorder.statements[-1])
+
+
+def assert_index_scan(nodes: list[dict], table: str, index: str):
+	scans = [node for node in nodes if node.get('Relation Name') == table]
+	assert scans, f"В плане нет обращения к таблице {table}."
+	for node in scans:
+		assert node['Node Type'] != 'Seq Scan', f"Последовательное сканирование таблицы {table}."
+	assert any(node.get('Index Name') == index for node in scans), f"Индекс {index} не используется."
+
+
+async def first_id(table: str):
+	async with async_session_maker_test() as session:
+		return await session.scalar(text(f'SELECT id FROM {table} LIMIT 1'))
+
+
+async def first_submenu():
+	"""Функция, которая возвращает id первого submenu и id его menu."""
+	async with async_session_maker_test() as session:
+		return (await session.execute(text('SELECT id, menu_id FROM submenu LIMIT 1'))).fetchone()
+
+
+@pytest_asyncio.fixture(scope='module', autouse=True)
+async def large_catalog():
+	"""Фикстура, которая заполняет БД большим каталогом для проверки планов запросов и удаляет его после них."""
+	async with async_session_maker_test() as session:
+		await session.execute(text(
+			"INSERT INTO menu (id, title, description, submenus_count, dishes_count) "
+			f"SELECT gen_random_uuid(), 'menu ' || m, 'seed', {SEED_SUBMENUS_PER_MENU}, "
+			f"{SEED_SUBMENUS_PER_MENU * SEED_DISHES_PER_SUBMENU} FROM generate_series(1, {SEED_MENUS}) m"
+		))
+		await session.execute(text(
+			"INSERT INTO submenu (id, title, description, dishes_count, menu_id) "
+			f"SELECT gen_random_uuid(), 'submenu ' || s, 'seed', {SEED_DISHES_PER_SUBMENU}, menu.id "
+			f"FROM menu, generate_series(1, {SEED_SUBMENUS_PER_MENU}) s"
+		))
+		await session.execute(text(
+			"INSERT INTO dish (id, title, description, price, submenu_id) "
+			f"SELECT gen_random_uuid(), 'dish ' || d, 'seed', d + 0.5, submenu.id "
+			f"FROM submenu, generate_series(1, {SEED_DISHES_PER_SUBMENU}) d"
+		))
+		await session.commit()
+	async with engine_test.begin() as connection:
+		await connection.execute(text('ANALYZE'))
+	yield
+	async with async_session_maker_test() as session:
+		await session.execute(text('DELETE FROM menu'))
+		await session.commit()
+	await cache_services.cache_backend.clear()
+
+
+async def test_list_submenus_uses_index(ac: AsyncClient):
+	"""Проверка на использование индекса при получении списка submenu."""
+	menu_id = await first_id('menu')
+	nodes = await plan_of_request(ac.get(f"/api/v1/menus/{menu_id}/submenus"))
+	assert_index_scan(nodes, 'submenu', 'ix_submenu_menu_id_id')
+
+
+async def test_list_dishes_uses_index(ac: AsyncClient):
+	"""Проверка на использование индекса при получении списка dish."""
+	submenu = await first_submenu()
+	nodes = await plan_of_request(ac.get(f"/api/v1/menus/{submenu.menu_id}/submenus/{submenu.id}/dishes"))
+	assert_index_scan(nodes, 'dish', 'ix_dish_submenu_id_id')
+
+
+async def test_list_dishes_by_price_uses_index(ac: AsyncClient):
+	"""Проверка на использование индекса по цене при фильтре и сортировке списка dish по цене."""
+	submenu = await first_submenu()
+	nodes = await plan_of_request(ac.get(f"/api/v1/menus/{submenu.menu_id}/submenus/{submenu.id}/dishes",
+										 params={"min_price": "10", "max_price": "20", "sort": "price", "limit": 5}))
+	assert_index_scan(nodes, 'dish', 'ix_dish_submenu_id_price_id')
+	assert not any(node['Node Type'] == 'Sort' for node in nodes), "Сортировка по цене выполняется не по индексу."
+
+
+async def test_batch_get_dishes_uses_index(ac: AsyncClient):
+	"""Проверка на использование первичного ключа при получении нескольких dish по id (id = ANY)."""
+	async with async_session_maker_test() as session:
+		dish_ids = (await session.scalars(text('SELECT id FROM dish LIMIT 30'))).all()
+	nodes = await plan_of_request(ac.get('/api/v1/dishes:batchGet', params={"ids": [str(id_) for id_ in dish_ids]}))
+	assert_index_scan(nodes, 'dish', 'dish_pkey')
+
+
+async def test_delete_submenu_uses_index(ac: AsyncClient):
+	"""Проверка на использование индекса при удалении submenu."""
+	submenu = await first_submenu()
+	nodes = await plan_of_request(ac.delete(f"/api/v1/menus/{submenu.menu_id}/submenus/{submenu.id}"))
+	assert_index_scan(nodes, 'dish', 'ix_dish_submenu_id_id')
+
+
+async def test_delete_menu_uses_index(ac: AsyncClient):
+	"""Проверка на использование индексов при удалении menu."""
+	menu_id = await first_id('menu')
+	nodes = await plan_of_request(ac.delete(f"/api/v1/menus/{menu_id}"))
+	assert_index_scan(nodes, 'submenu', 'ix_submenu_menu_id_id')
+	assert_index_scan(nodes, 'dish', 'ix_dish_submenu_id_id')
+
@@ -0,0 +1,50 @@
+from http import HTTPStatus
+
+from httpx import AsyncClient
+
+from tests.data_for_tests.data_dish import data_for_create_some_dish
+from tests.data_for_tests.data_menu import data_for_create_some_menu
+from tests.data_for_tests.data_submenu import data_for_create_some_submenu
+
+
+async def test_live_menu_counts(ac: AsyncClient):
+	"""Проверка на подсчёт кол-ва подменю и блюд по таблицам submenu и dish."""
+	menu_ids = []
+	for menu in data_for_create_some_menu:
+		response = await ac.post('/api/v1/menus', json=menu)
+		menu_ids.append(response.json()["id"])
+	full_menu_id, empty_menu_id = menu_ids
+	for submenu in data_for_create_some_submenu:
+		response = await ac.post(f"/api/v1/menus/{full_menu_id}/submenus", json=submenu)
+		submenu_id = response.json()["id"]
+	for dish in data_for_create_some_dish:
+		await ac.post(f"/api/v1/menus/{full_menu_id}/submenus/{submenu_id}/dishes", json=dish)
+
+	expected = {
+		full_menu_id: (len(data_for_create_some_submenu), len(data_for_create_some_dish)),
+		empty_menu_id: (0, 0),
+	}
+	for menu_id, (submenus_count, dishes_count) in expected.items():
+		response = await ac.get(f"/api/v1/menus_orm/{menu_id}")
+		answer_response = response.json()
+		assert response.status_code == HTTPStatus.OK, "Статус ответа не 200."
+		assert answer_response["id"] == menu_id, "Id меню не соответствует запрошенному"
+		assert answer_response["submenus_count"] == submenus_count, "Поле 'submenus_count' не соответствует ожидаемому"
+		assert answer_response["dishes_count"] == dishes_count, "Поле 'dishes_count' не соответствует ожидаемому"
+		response = await ac.get(f"/api/v1/menus/{menu_id}")
+		assert response.json() == answer_response, "Счётчики в колонках menu не совпадают с подсчитанными."
+
+	response = await ac.get('/api/v1/menus_orm')
+	assert response.status_code == HTTPStatus.OK, "Статус ответа не 200."
+	live = {menu["id"]: (menu["submenus_count"], menu["dishes_count"]) for menu in response.json()}
+	assert live == expected, "Список меню со счётчиками не соответствует ожидаемому"
+
+	for menu_id in menu_ids:
+		await ac.delete(f"/api/v1/menus/{menu_id}")
+
+
+async def test_live_menu_counts_not_found(ac: AsyncClient):
+	"""Проверка на получение несуществующего меню со счётчиками."""
+	response = await ac.get("/api/v1/menus_orm/8a4f2c1e-9f2b-4c1d-8e3a-0b5c6d7e8f90")
+	assert response.status_code == HTTPStatus.NOT_FOUND, "Статус ответа не 404."
+	assert response.json()["detail"] == "menu not found", "Сообщение об ошибке не соответствует ожидаемому"
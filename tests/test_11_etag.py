@@ -0,0 +1,56 @@
+from http import HTTPStatus
+
+from httpx import AsyncClient
+
+from tests.data_for_tests.data_dish import data_for_create_dish, data_for_update_dish
+from tests.data_for_tests.data_menu import data_for_create_menu, data_for_update_menu
+from tests.data_for_tests.data_submenu import data_for_create_submenu
+
+
+async def test_menu_conditional_get(ac: AsyncClient):
+	"""Проверка на ответ 304 для неизменённого меню и новый ETag после обновления."""
+	response = await ac.post('/api/v1/menus', json=data_for_create_menu)
+	menu_id = response.json()["id"]
+
+	response = await ac.get(f"/api/v1/menus/{menu_id}")
+	etag = response.headers["etag"]
+	assert response.status_code == HTTPStatus.OK, "Статус ответа не 200."
+
+	response = await ac.get(f"/api/v1/menus/{menu_id}", headers={"If-None-Match": etag})
+	assert response.status_code == HTTPStatus.NOT_MODIFIED, "Статус ответа не 304."
+	assert response.headers["etag"] == etag, "ETag ответа 304 не соответствует ожидаемому"
+	assert response.content == b"", "Ответ 304 содержит тело."
+
+	await ac.patch(f"/api/v1/menus/{menu_id}", json=data_for_update_menu)
+	response = await ac.get(f"/api/v1/menus/{menu_id}", headers={"If-None-Match": etag})
+	assert response.status_code == HTTPStatus.OK, "Статус ответа не 200."
+	assert response.headers["etag"] != etag, "ETag не изменился после обновления меню."
+	assert response.json()["title"] == data_for_update_menu["title"], "Название меню не соответствует ожидаемому"
+
+	await ac.delete(f"/api/v1/menus/{menu_id}")
+
+
+async def test_dishes_list_conditional_get(ac: AsyncClient):
+	"""Проверка на смену ETag списка блюд при создании, обновлении и удалении блюда."""
+	response = await ac.post('/api/v1/menus', json=data_for_create_menu)
+	menu_id = response.json()["id"]
+	response = await ac.post(f"/api/v1/menus/{menu_id}/submenus", json=data_for_create_submenu)
+	dishes_url = f"/api/v1/menus/{menu_id}/submenus/{response.json()['id']}/dishes"
+
+	etags = [(await ac.get(dishes_url)).headers["etag"]]
+	response = await ac.post(dishes_url, json=data_for_create_dish)
+	dish_id = response.json()["id"]
+	etags.append((await ac.get(dishes_url)).headers["etag"])
+	await ac.patch(f"{dishes_url}/{dish_id}", json=data_for_update_dish)
+	etags.append((await ac.get(dishes_url)).headers["etag"])
+	await ac.delete(f"{dishes_url}/{dish_id}")
+	etags.append((await ac.get(dishes_url)).headers["etag"])
+	assert len(set(etags)) == len(etags), "ETag списка блюд не изменился после записи."
+
+	response = await ac.get(dishes_url, headers={"If-None-Match": etags[-1]})
+	assert response.status_code == HTTPStatus.NOT_MODIFIED, "Статус ответа не 304."
+
+	response = await ac.get(f"/api/v1/menus/{menu_id}", headers={"If-None-Match": "*"})
+	assert response.status_code == HTTPStatus.NOT_MODIFIED, "Статус ответа не 304."
+
+	await ac.delete(f"/api/v1/menus/{menu_id}")
@@ -0,0 +1,32 @@
+from http import HTTPStatus
+
+from httpx import AsyncClient
+from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
+
+from src.pool import MeteredQueuePool, pool_stats
+
+
+async def test_db_health(ac: AsyncClient):
+	"""Проверка состояния БД: latency запроса и статистика пула."""
+	response = await ac.get('/health/db')
+	answer_response = response.json()
+	assert response.status_code == HTTPStatus.OK, "Статус ответа не 200."
+	assert answer_response["status"] == "ok", "БД недоступна."
+	assert answer_response["latency_ms"] >= 0, "Нет времени запроса к БД."
+	assert answer_response["pool"]["class"] == NullPool.__name__, "Статистика пула не соответствует тестовому engine."
+
+
+def test_metered_pool_stats():
+	"""Проверка статистики пула: выданные соединения, overflow и время ожидания."""
+	engine = create_engine('sqlite://', poolclass=MeteredQueuePool, pool_size=1, max_overflow=1)
+	first, second = engine.connect(), engine.connect()
+	stats = pool_stats(engine.pool)
+	assert stats["checked_out"] == 2, "Кол-во выданных соединений не соответствует ожидаемому."
+	assert stats["overflow"] == 1, "Overflow не соответствует ожидаемому."
+	assert stats["checkouts"] == 2, "Кол-во выдач соединений не соответствует ожидаемому."
+	assert stats["wait_max_ms"] >= stats["wait_avg_ms"] >= 0, "Время ожидания соединения не соответствует ожидаемому."
+	first.close()
+	second.close()
+	assert pool_stats(engine.pool)["checked_out"] == 0, "Соединения не вернулись в пул."
+	engine.dispose()
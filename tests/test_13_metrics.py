@@ -0,0 +1,21 @@
+import uuid
+from http import HTTPStatus
+
+from httpx import AsyncClient
+
+
+async def test_metrics_route_labels(ac: AsyncClient):
+	"""Проверка метрик: метка route содержит шаблон пути, а не uuid из запроса."""
+	menu_id = uuid.uuid4()
+	await ac.get(f'/api/v1/menus/{menu_id}')
+	await ac.get(f'/unknown/{menu_id}')
+	response = await ac.get('/metrics')
+	assert response.status_code == HTTPStatus.OK, "Статус ответа не 200."
+	assert response.headers["content-type"].startswith("text/plain"), "Метрики не в текстовом формате Prometheus."
+	assert 'http_requests_total{method="GET",route="/api/v1/menus/{menu_id}",status="404"}' in response.text, \
+		"Нет счётчика запросов по шаблону роута."
+	assert 'http_requests_total{method="GET",route="unmatched",status="404"}' in response.text, \
+		"Запрос без роута не попал в метку unmatched."
+	assert str(menu_id) not in response.text, "Uuid из запроса попал в метки."
+	for metric in ("http_request_duration_seconds_bucket", "http_requests_in_progress", "http_response_size_bytes_sum"):
+		assert metric in response.text, f"Нет метрики {metric}."
@@ -0,0 +1,116 @@
+import re
+import uuid
+from http import HTTPStatus
+from typing import Awaitable
+
+import pytest
+from httpx import AsyncClient
+
+from conftest import async_session_maker_test
+from data_for_tests.data_dish import data_for_create_dish, data_for_create_some_dish, data_for_update_dish
+from data_for_tests.data_menu import data_for_create_menu, data_for_update_menu
+from data_for_tests.data_submenu import data_for_create_submenu, data_for_update_submenu
+from src.cache import services as cache_services
+from src.dish import services as dish_services
+from src.dish.schemas import CreateDish, DataUpdateDish, DishFilters
+from src.menu import services as menu_services
+from src.menu.schemas import CreateMenu, DataUpdateMenu
+from src.metrics.sql import track_db
+from src.pagination import PageParams
+from src.submenu import services as submenu_services
+from src.submenu.schemas import CreateSubmenu, DataUpdateSubmenu
+
+# Кол-во SQL-выражений (round-trip к БД, без BEGIN/COMMIT), которое выполняет функция сервиса.
+BUDGETS = {
+	'create_new_menu': 1,
+	'update_menu_by_id': 1,
+	'delete_menu_by_id': 1,
+	'get_all_menus': 1,
+	'get_meny_by_id': 1,
+	'get_menu_etag': 1,
+	'get_menus_etag': 1,
+	'get_menu_tree': 1,
+	'create_new_submenu': 1,
+	'update_submenu_by_id': 1,
+	'delete_submenu_by_id': 1,
+	'get_all_submenus': 1,
+	'get_submenus_by_id': 1,
+	'create_new_dish': 1,
+	'create_new_dishes': 2,
+	'update_dish': 1,
+	'delete_dish': 1,
+	'get_all_dishes': 1,
+	'get_dish_id': 1,
+	'get_dishes_by_ids': 1,
+	'get_submenus_by_ids': 1,
+}
+
+
+async def assert_budget(name: str, call: Awaitable, budget: int = None):
+	"""Функция, которая выполняет вызов сервиса и сверяет кол-во выражений с бюджетом."""
+	budget = BUDGETS[name] if budget is None else budget
+	with track_db() as stats:
+		result = await call
+	assert stats.round_trips == budget, f"{name} выполняет {stats.round_trips} выражений вместо {budget}."
+	return result
+
+
+@pytest.mark.parametrize("copy_threshold", [10000, 1])
+async def test_service_round_trip_budgets(monkeypatch, copy_threshold):
+	"""Проверка кол-ва обращений к БД каждой функции сервисов (кэш сброшен, затем чтение из кэша без БД)."""
+	monkeypatch.setattr(dish_services, "BULK_COPY_THRESHOLD", copy_threshold)
+	await cache_services.cache_backend.clear()
+	params = PageParams(limit=100, cursor=None)
+	dish_filters = DishFilters(min_price=None, max_price=None, sort='id')
+	async with async_session_maker_test() as session:
+		menu = await assert_budget('create_new_menu', menu_services.create_new_menu(
+			CreateMenu(**data_for_create_menu), session))
+		submenu = await assert_budget('create_new_submenu', submenu_services.create_new_submenu(
+			menu.id, CreateSubmenu(**data_for_create_submenu), session))
+		dish = await assert_budget('create_new_dish', dish_services.create_new_dish(
+			menu.id, submenu.id, CreateDish(**data_for_create_dish), session))
+		await assert_budget('create_new_dishes', dish_services.create_new_dishes(
+			menu.id, submenu.id, [CreateDish(**data) for data in data_for_create_some_dish], session))
+
+		reads = (
+			('get_all_menus', lambda: menu_services.get_all_menus(params, session)),
+			('get_meny_by_id', lambda: menu_services.get_meny_by_id(menu.id, session)),
+			('get_menu_etag', lambda: menu_services.get_menu_etag(menu.id, session)),
+			('get_menus_etag', lambda: menu_services.get_menus_etag(session)),
+			('get_all_submenus', lambda: submenu_services.get_all_submenus(menu.id, params, session)),
+			('get_submenus_by_id', lambda: submenu_services.get_submenus_by_id(submenu.id, session)),
+			('get_all_dishes', lambda: dish_services.get_all_dishes(submenu.id, params, dish_filters, session)),
+			('get_dish_id', lambda: dish_services.get_dish_id(dish.id, session)),
+		)
+		for name, read in reads:
+			await assert_budget(name, read())
+		for name, read in reads:
+			await assert_budget(name, read(), budget=0)
+		await assert_budget('get_menu_tree', menu_services.get_menu_tree(menu.id, session))
+		await assert_budget('get_dishes_by_ids', dish_services.get_dishes_by_ids([dish.id, uuid.uuid4()], session))
+		await assert_budget('get_submenus_by_ids', submenu_services.get_submenus_by_ids([submenu.id], session))
+
+		await assert_budget('update_menu_by_id', menu_services.update_menu_by_id(
+			menu.id, DataUpdateMenu(**data_for_update_menu), session))
+		await assert_budget('update_submenu_by_id', submenu_services.update_submenu_by_id(
+			submenu.id, DataUpdateSubmenu(**data_for_update_submenu), session))
+		await assert_budget('update_dish', dish_services.update_dish(
+			dish.id, DataUpdateDish(**data_for_update_dish), session))
+
+		await assert_budget('delete_dish', dish_services.delete_dish(menu.id, submenu.id, dish.id, session))
+		await assert_budget('delete_submenu_by_id', submenu_services.delete_submenu_by_id(menu.id, submenu.id, session))
+		await assert_budget('delete_menu_by_id', menu_services.delete_menu_by_id(menu.id, session))
+
+
+async def test_server_timing_header(ac: AsyncClient):
+	"""Проверка заголовка Server-Timing с кол-вом и временем обращений к БД."""
+	await cache_services.cache_backend.clear()
+	response = await ac.get('/api/v1/menus')
+	assert response.status_code == HTTPStatus.OK, "Статус ответа не 200."
+	timing = re.fullmatch(r'db;dur=(\d+\.\d+);desc="(\d+) round-trips"', response.headers["server-timing"])
+	assert timing is not None, "Заголовок Server-Timing не соответствует ожидаемому формату."
+	# ETag списка и сама страница меню.
+	assert int(timing.group(2)) == 2, "Кол-во обращений к БД не соответствует ожидаемому."
+
+	response = await ac.get('/api/v1/menus')
+	assert response.headers["server-timing"].endswith('desc="0 round-trips"'), "Ответ из кэша обращается к БД."
@@ -0,0 +1,109 @@
+import asyncio
+import time
+from http import HTTPStatus
+from typing import AsyncGenerator
+
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import insert
+
+from conftest import async_session_maker_replica_test, async_session_maker_test, override_get_async_session
+from data_for_tests.data_menu import data_for_create_menu
+from src.cache import services as cache_services
+from src.config import READ_YOUR_WRITES_SECONDS
+from src.database import get_async_session, get_read_session, read_session_dependency
+from src.main import create_app
+from src.menu.models import menu as menu_tbl
+from src.replica import LAST_WRITE_COOKIE
+
+
+@pytest_asyncio.fixture(scope='function')
+async def replica_ac() -> AsyncGenerator[AsyncClient, None]:
+	"""Фикстура клиента, у которого чтения идут в реплику (вторую тестовую БД), а записи - в основную."""
+	app = create_app()
+	app.dependency_overrides[get_async_session] = override_get_async_session
+	app.dependency_overrides[get_read_session] = read_session_dependency(async_session_maker_test,
+																		  async_session_maker_replica_test)
+	async with AsyncClient(app=app, base_url='http://localhost:8000') as ac:
+		yield ac
+
+
+async def test_read_after_write_goes_to_primary(replica_ac: AsyncClient):
+	"""Проверка read-your-writes: чтение сразу после записи видит запись, которой нет в реплике."""
+	response = await replica_ac.post('/api/v1/menus', json=data_for_create_menu)
+	menu_id = response.json()["id"]
+	assert LAST_WRITE_COOKIE in response.cookies, "После записи не выставлен cookie последней записи."
+
+	await cache_services.cache_backend.clear()
+	response = await replica_ac.get(f'/api/v1/menus/{menu_id}')
+	assert response.status_code == HTTPStatus.OK, "Чтение после записи ушло в реплику."
+
+	replica_ac.cookies.set(LAST_WRITE_COOKIE, str(time.time() - READ_YOUR_WRITES_SECONDS - 1))
+	await cache_services.cache_backend.clear()
+	response = await replica_ac.get(f'/api/v1/menus/{menu_id}')
+	assert response.status_code == HTTPStatus.NOT_FOUND, "Чтение после окна read-your-writes ушло в основную БД."
+
+	await replica_ac.delete(f'/api/v1/menus/{menu_id}')
+
+
+async def test_replica_read_does_not_fill_cache(replica_ac: AsyncClient):
+	"""Проверка, что чтение из отстающей реплики сразу после записи не попадает в кэш (без сброса кэша)."""
+	menu_id = (await replica_ac.post('/api/v1/menus', json=data_for_create_menu)).json()["id"]
+	write_cookie = replica_ac.cookies[LAST_WRITE_COOKIE]
+
+	replica_ac.cookies.clear()
+	response = await replica_ac.get(f'/api/v1/menus/{menu_id}')
+	assert response.status_code == HTTPStatus.NOT_FOUND, "Чтение без записи ушло не в реплику."
+
+	replica_ac.cookies.set(LAST_WRITE_COOKIE, write_cookie)
+	sticky_response = await replica_ac.get(f'/api/v1/menus/{menu_id}')
+	assert sticky_response.status_code == HTTPStatus.OK, "Клиент с записью получил данные реплики."
+
+	await asyncio.gather(*cache_services._refreshes)
+	replica_ac.cookies.clear()
+	response = await replica_ac.get(f'/api/v1/menus/{menu_id}')
+	assert response.status_code == HTTPStatus.OK, "Кэш не заполнен из основной БД."
+	assert response.headers["etag"] == sticky_response.headers["etag"], "ETag в кэше не из основной БД."
+
+	replica_ac.cookies.set(LAST_WRITE_COOKIE, write_cookie)
+	await replica_ac.delete(f'/api/v1/menus/{menu_id}')
+
+
+async def test_replica_body_matches_cached_etag(replica_ac: AsyncClient):
+	"""Проверка, что ETag из кэша (основной БД) не отдаётся с телом из отстающей реплики."""
+	menu_id = (await replica_ac.post('/api/v1/menus', json=data_for_create_menu)).json()["id"]
+	write_cookie = replica_ac.cookies[LAST_WRITE_COOKIE]
+	await cache_services.cache_backend.clear()
+
+	# Запрос с записью получает 304: в кэш попадает только ETag, тело menu в кэше отсутствует.
+	response = await replica_ac.get(f'/api/v1/menus/{menu_id}', headers={"If-None-Match": "*"})
+	assert response.status_code == HTTPStatus.NOT_MODIFIED, "Статус ответа не 304."
+	etag = response.headers["etag"]
+
+	replica_ac.cookies.clear()
+	response = await replica_ac.get(f'/api/v1/menus/{menu_id}')
+	assert response.status_code == HTTPStatus.OK, "Тело отдано из реплики под ETag из основной БД."
+	assert response.headers["etag"] == etag and response.json()["id"] == menu_id, \
+		"ETag и тело ответа не соответствуют друг другу."
+
+	replica_ac.cookies.set(LAST_WRITE_COOKIE, write_cookie)
+	await replica_ac.delete(f'/api/v1/menus/{menu_id}')
+
+
+async def test_read_without_write_goes_to_replica(replica_ac: AsyncClient):
+	"""Проверка, что чтения клиента без записей идут в реплику."""
+	menu_id = (await replica_ac.post('/api/v1/menus', json=data_for_create_menu)).json()["id"]
+	async with async_session_maker_replica_test() as session:
+		await session.execute(insert(menu_tbl).values(id=menu_id, title="Replica menu", description="Replica"))
+		await session.commit()
+
+	replica_ac.cookies.clear()
+	await cache_services.cache_backend.clear()
+	response = await replica_ac.get(f'/api/v1/menus/{menu_id}')
+	assert response.status_code == HTTPStatus.OK, "Статус ответа не 200."
+	assert response.json()["title"] == "Replica menu", "Чтение без записи ушло в основную БД."
+
+	await replica_ac.delete(f'/api/v1/menus/{menu_id}')
+	async with async_session_maker_replica_test() as session:
+		await session.execute(menu_tbl.delete().where(menu_tbl.c.id == menu_id))
+		await session.commit()
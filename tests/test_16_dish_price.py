@@ -0,0 +1,63 @@
+from http import HTTPStatus
+
+from httpx import AsyncClient
+
+from data_for_tests.data_menu import data_for_create_menu
+from data_for_tests.data_submenu import data_for_create_submenu
+
+PRICES = ["30", "5.5", "12.345", "12.50", "0.99", "100", "12.5"]
+
+
+async def create_dishes(ac: AsyncClient) -> tuple[str, str]:
+	"""Функция, которая создаёт menu и submenu с dish по ценам из PRICES и возвращает url списка dish и menu."""
+	menu_id = (await ac.post('/api/v1/menus', json=data_for_create_menu)).json()["id"]
+	submenu_id = (await ac.post(f"/api/v1/menus/{menu_id}/submenus", json=data_for_create_submenu)).json()["id"]
+	dishes_url = f"/api/v1/menus/{menu_id}/submenus/{submenu_id}/dishes"
+	for number, price in enumerate(PRICES):
+		await ac.post(dishes_url, json={"title": f"dish {number}", "description": "price", "price": price})
+	return dishes_url, f"/api/v1/menus/{menu_id}"
+
+
+async def test_price_format(ac: AsyncClient):
+	"""Проверка на формат цены с двумя знаками после запятой и отказ для некорректной цены."""
+	dishes_url, menu_url = await create_dishes(ac)
+	response = await ac.get(dishes_url, params={"sort": "price"})
+	assert [dish["price"] for dish in response.json()] == ["0.99", "5.50", "12.35", "12.50", "12.50", "30.00", "100.00"], \
+		"Цены не соответствуют ожидаемым."
+
+	for price in ("abc", "-1", "NaN", "100000000"):
+		response = await ac.post(dishes_url, json={"title": "bad", "description": "price", "price": price})
+		assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY, f"Цена {price} принята."
+	await ac.delete(menu_url)
+
+
+async def test_price_filter_and_sort(ac: AsyncClient):
+	"""Проверка фильтра по цене и сортировки по цене с постраничным выводом."""
+	dishes_url, menu_url = await create_dishes(ac)
+	params = {"min_price": "5.5", "max_price": "30", "sort": "price", "limit": 2}
+	prices, cursor = [], None
+	while True:
+		response = await ac.get(dishes_url, params=dict(params, cursor=cursor) if cursor else params)
+		assert response.status_code == HTTPStatus.OK, "Статус ответа не 200."
+		prices.extend(dish["price"] for dish in response.json())
+		cursor = response.headers.get("x-next-cursor")
+		if cursor is None:
+			break
+	assert prices == ["5.50", "12.35", "12.50", "12.50", "30.00"], "Фильтр или сортировка по цене работает неверно."
+
+	response = await ac.get(dishes_url, params={"max_price": "1"})
+	assert [dish["price"] for dish in response.json()] == ["0.99"], "Фильтр max_price работает неверно."
+
+	response = await ac.get(dishes_url, params={"sort": "title"})
+	assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY, "Неизвестная сортировка принята."
+	await ac.delete(menu_url)
+
+
+async def test_zero_price_bound_is_cached_separately(ac: AsyncClient):
+	"""Проверка, что max_price=0 не отдаёт закэшированный список без фильтра и наоборот."""
+	dishes_url, menu_url = await create_dishes(ac)
+	assert len((await ac.get(dishes_url)).json()) == len(PRICES), "Кол-во dish не соответствует ожидаемому."
+	assert (await ac.get(dishes_url, params={"max_price": "0"})).json() == [], \
+		"Для max_price=0 отдан закэшированный список без фильтра."
+	assert len((await ac.get(dishes_url)).json()) == len(PRICES), "Список без фильтра изменился после max_price=0."
+	await ac.delete(menu_url)
@@ -0,0 +1,65 @@
+from http import HTTPStatus
+
+from httpx import AsyncClient
+
+
+async def create_catalog(ac: AsyncClient) -> dict[str, str]:
+	"""Функция, которая создаёт menu, submenu и dish со словом pancake и возвращает их id."""
+	menu_id = (await ac.post('/api/v1/menus', json={"title": "Breakfast pancake menu", "description": "menu"})).json()["id"]
+	submenu_id = (await ac.post(f"/api/v1/menus/{menu_id}/submenus",
+								json={"title": "Sweet", "description": "submenu"})).json()["id"]
+	dishes_url = f"/api/v1/menus/{menu_id}/submenus/{submenu_id}/dishes"
+	dish_id = (await ac.post(dishes_url, json={"title": "Pancake", "description": "pancake with maple syrup",
+												"price": "5"})).json()["id"]
+	described_id = (await ac.post(dishes_url, json={"title": "Waffle", "description": "served with a pancake",
+													 "price": "6"})).json()["id"]
+	return {"menu_id": menu_id, "submenu_id": submenu_id, "dish_id": dish_id, "described_id": described_id}
+
+
+async def test_search_hits_with_path(ac: AsyncClient):
+	"""Проверка поиска по menu, submenu, dish и пути до найденного объекта."""
+	ids = await create_catalog(ac)
+	response = await ac.get('/api/v1/search', params={"q": "pancake"})
+	assert response.status_code == HTTPStatus.OK, "Статус ответа не 200."
+	hits = response.json()
+	# Совпадение в названии и описании dish выше совпадения в названии menu, совпадение только в описании - ниже.
+	assert [(hit["type"], hit["id"]) for hit in hits] == [
+		("dish", ids["dish_id"]), ("menu", ids["menu_id"]), ("dish", ids["described_id"])
+	], "Найденные объекты или их порядок не соответствуют ожидаемым."
+	assert [hit["rank"] for hit in hits] == sorted((hit["rank"] for hit in hits), reverse=True), \
+		"Результаты не отсортированы по рангу."
+
+	dish = hits[0]
+	assert (dish["menu_id"], dish["menu_title"], dish["submenu_id"], dish["submenu_title"]) == (
+		ids["menu_id"], "Breakfast pancake menu", ids["submenu_id"], "Sweet"), "Путь до dish не соответствует ожидаемому."
+	menu = next(hit for hit in hits if hit["type"] == "menu")
+	assert menu["menu_id"] is None and menu["submenu_id"] is None, "У menu не должно быть родителей."
+
+	response = await ac.get('/api/v1/search', params={"q": "sweet"})
+	assert [(hit["type"], hit["menu_id"]) for hit in response.json()] == [("submenu", ids["menu_id"])], \
+		"Поиск по submenu работает неверно."
+	response = await ac.get('/api/v1/search', params={"q": "pancake -syrup"})
+	assert ids["dish_id"] not in [hit["id"] for hit in response.json()], "Исключение слова не работает."
+	await ac.delete(f"/api/v1/menus/{ids['menu_id']}")
+
+
+async def test_search_pagination(ac: AsyncClient):
+	"""Проверка постраничного вывода результатов поиска по курсору."""
+	ids = await create_catalog(ac)
+	first = await ac.get('/api/v1/search', params={"q": "pancake"})
+	hits, cursor = [], None
+	while True:
+		params = {"q": "pancake", "limit": 1}
+		response = await ac.get('/api/v1/search', params=dict(params, cursor=cursor) if cursor else params)
+		assert response.status_code == HTTPStatus.OK, "Статус ответа не 200."
+		hits.extend(response.json())
+		cursor = response.headers.get("x-next-cursor")
+		if cursor is None:
+			break
+	assert hits == first.json(), "Постраничный вывод не совпадает с полным списком."
+
+	response = await ac.get('/api/v1/search', params={"q": ""})
+	assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY, "Пустой запрос принят."
+	response = await ac.get('/api/v1/search', params={"q": "pancake", "cursor": "broken"})
+	assert response.status_code == HTTPStatus.BAD_REQUEST, "Некорректный курсор принят."
+	await ac.delete(f"/api/v1/menus/{ids['menu_id']}")
@@ -0,0 +1,60 @@
+from http import HTTPStatus
+
+from httpx import AsyncClient
+
+from src.autocomplete.services import suggestions_cache
+
+
+async def create_catalog(ac: AsyncClient) -> tuple[str, str]:
+	"""Функция, которая создаёт menu с двумя submenu и dish и возвращает url menu и url списка dish."""
+	menu_url = f"/api/v1/menus/{(await ac.post('/api/v1/menus', json={'title': 'Menu', 'description': 'menu'})).json()['id']}"
+	dishes_urls = []
+	for title in ("Chicken dishes", "Desserts"):
+		submenu_id = (await ac.post(f"{menu_url}/submenus", json={"title": title, "description": "submenu"})).json()["id"]
+		dishes_urls.append(f"{menu_url}/submenus/{submenu_id}/dishes")
+	for title in ("Chicken soup", "Chicken curry", "Grilled chicken"):
+		await ac.post(dishes_urls[0], json={"title": title, "description": "dish", "price": "10"})
+	for title in ("Chicken soup", "Tiramisu"):
+		await ac.post(dishes_urls[1], json={"title": title, "description": "dish", "price": "10"})
+	return menu_url, dishes_urls[0]
+
+
+async def test_autocomplete(ac: AsyncClient):
+	"""Проверка подсказок по префиксу и нечёткому совпадению названий submenu и dish."""
+	await suggestions_cache.clear()
+	menu_url, _ = await create_catalog(ac)
+	response = await ac.get('/api/v1/autocomplete', params={"prefix": "CHI"})
+	assert response.status_code == HTTPStatus.OK, "Статус ответа не 200."
+	suggestions = response.json()
+	assert sorted((hit["type"], hit["title"]) for hit in suggestions[:3]) == [
+		("dish", "Chicken curry"), ("dish", "Chicken soup"), ("submenu", "Chicken dishes")
+	], "Совпадения по началу названия не на первых местах или повторяются."
+	assert suggestions[3:] == [{"type": "dish", "title": "Grilled chicken"}], "Нечёткое совпадение не найдено."
+
+	response = await ac.get('/api/v1/autocomplete', params={"prefix": "chiken"})
+	assert {hit["title"] for hit in response.json()} == {"Chicken curry", "Chicken soup", "Chicken dishes",
+														"Grilled chicken"}, "Подсказки с опечаткой не найдены."
+	response = await ac.get('/api/v1/autocomplete', params={"prefix": "chi", "limit": 2})
+	assert len(response.json()) == 2, "Кол-во подсказок больше limit."
+	response = await ac.get('/api/v1/autocomplete', params={"prefix": "%"})
+	assert response.json() == [], "Спецсимволы LIKE в префиксе не экранируются."
+	await ac.delete(menu_url)
+
+
+async def test_autocomplete_cache(ac: AsyncClient):
+	"""Проверка кэша популярных префиксов."""
+	await suggestions_cache.clear()
+	menu_url, dishes_url = await create_catalog(ac)
+	first = (await ac.get('/api/v1/autocomplete', params={"prefix": "tira"})).json()
+	await ac.post(dishes_url, json={"title": "Tiramisu classic", "description": "dish", "price": "10"})
+	response = await ac.get('/api/v1/autocomplete', params={"prefix": " Tira "})
+	assert response.json() == first, "Префикс, отличающийся регистром и пробелами, не взят из кэша."
+
+	await suggestions_cache.clear()
+	response = await ac.get('/api/v1/autocomplete', params={"prefix": "tira"})
+	assert len(response.json()) == len(first) + 1, "После сброса кэша подсказки не обновились."
+
+	for params in ({"prefix": ""}, {"prefix": "chi", "limit": 0}, {"prefix": "chi", "limit": 1000}):
+		response = await ac.get('/api/v1/autocomplete', params=params)
+		assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY, f"Параметры {params} приняты."
+	await ac.delete(menu_url)
@@ -0,0 +1,47 @@
+import gzip
+import json
+from http import HTTPStatus
+
+from httpx import AsyncClient
+
+from data_for_tests.data_dish import data_for_create_some_dish
+from data_for_tests.data_menu import data_for_create_menu
+from data_for_tests.data_submenu import data_for_create_submenu
+from src.export import services as export_services
+
+
+async def test_export_ndjson(ac: AsyncClient, monkeypatch):
+	"""Проверка потоковой выгрузки каталога в NDJSON: родители раньше потомков, у потомков - id родителя."""
+	# Порции по 1 строке, чтобы выгрузка прошла через несколько выборок из серверного курсора.
+	monkeypatch.setattr(export_services, "EXPORT_FETCH_SIZE", 1)
+	menu_id = (await ac.post('/api/v1/menus', json=data_for_create_menu)).json()["id"]
+	submenu_id = (await ac.post(f"/api/v1/menus/{menu_id}/submenus", json=data_for_create_submenu)).json()["id"]
+	await ac.post(f"/api/v1/menus/{menu_id}/submenus/{submenu_id}/dishes/bulk", json=data_for_create_some_dish)
+
+	response = await ac.get('/api/v1/export', headers={"Accept-Encoding": "identity"})
+	assert response.status_code == HTTPStatus.OK, "Статус ответа не 200."
+	assert response.headers["content-type"] == "application/x-ndjson", "Тип ответа не NDJSON."
+	assert "content-encoding" not in response.headers, "Ответ сжат, хотя клиент не принимает gzip."
+	records = [json.loads(line) for line in response.content.splitlines()]
+	types = [record["type"] for record in records]
+	assert types == sorted(types, key=["menu", "submenu", "dish"].index), "Потомки выгружены раньше родителей."
+
+	menu = next(record for record in records if record["id"] == menu_id)
+	assert menu["title"] == data_for_create_menu["title"], "Выгруженное menu не соответствует ожидаемому."
+	submenu = next(record for record in records if record["id"] == submenu_id)
+	assert submenu["menu_id"] == menu_id, "У submenu не выгружен id menu."
+	dishes = [record for record in records if record["type"] == "dish" and record["submenu_id"] == submenu_id]
+	assert sorted(dish["title"] for dish in dishes) == sorted(dish["title"] for dish in data_for_create_some_dish), \
+		"Выгружены не все dish."
+	await ac.delete(f"/api/v1/menus/{menu_id}")
+
+
+async def test_export_gzip(ac: AsyncClient):
+	"""Проверка сжатия выгрузки в gzip для клиента, который его принимает."""
+	menu_id = (await ac.post('/api/v1/menus', json=data_for_create_menu)).json()["id"]
+	async with ac.stream('GET', '/api/v1/export', headers={"Accept-Encoding": "gzip"}) as response:
+		raw = b''.join([chunk async for chunk in response.aiter_raw()])
+	assert response.headers["content-encoding"] == "gzip", "Ответ не сжат."
+	assert menu_id in [json.loads(line)["id"] for line in gzip.decompress(raw).splitlines()], \
+		"Сжатая выгрузка не содержит menu."
+	await ac.delete(f"/api/v1/menus/{menu_id}")
@@ -0,0 +1,119 @@
+import csv
+import io
+from http import HTTPStatus
+
+from httpx import AsyncClient
+from openpyxl import Workbook
+
+from src.importer.services import IMPORT_COLUMNS
+
+XLSX = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+CATALOG = [
+	("Breakfast", "morning", "Pancakes", "sweet", "Classic", "with syrup", "5"),
+	("Breakfast", "morning", "Pancakes", "sweet", "Berry", "with berries", "6.50"),
+	("Breakfast", "morning", "Eggs", "", "Omelette", "three eggs", "4"),
+	("Dinner", "evening", "", "", "", "", ""),
+]
+
+
+def to_csv(rows: list[tuple]) -> bytes:
+	"""Функция, которая формирует файл импорта CSV с заголовком IMPORT_COLUMNS."""
+	buffer = io.StringIO()
+	csv.writer(buffer).writerows([IMPORT_COLUMNS, *rows])
+	return buffer.getvalue().encode()
+
+
+async def import_csv(ac: AsyncClient, rows: list[tuple], allow_empty: bool = False):
+	return await ac.post('/api/v1/import', content=to_csv(rows), headers={"Content-Type": "text/csv"},
+						 params={"allow_empty": allow_empty})
+
+
+async def get_catalog(ac: AsyncClient) -> dict[str, dict]:
+	"""Функция, которая возвращает каталог из API: menu по названию со счётчиками, submenu и dish с ценами."""
+	catalog = {}
+	for menu in (await ac.get('/api/v1/menus')).json():
+		submenus = {}
+		for submenu in (await ac.get(f"/api/v1/menus/{menu['id']}/submenus")).json():
+			dishes = (await ac.get(f"/api/v1/menus/{menu['id']}/submenus/{submenu['id']}/dishes")).json()
+			submenus[submenu["title"]] = (submenu["dishes_count"], {dish["title"]: dish["price"] for dish in dishes})
+		catalog[menu["title"]] = (menu["submenus_count"], menu["dishes_count"], submenus)
+	return catalog
+
+
+async def test_import_diff(ac: AsyncClient):
+	"""Проверка импорта: добавление, повторный импорт без изменений, изменение и удаление строк, счётчики."""
+	response = await import_csv(ac, CATALOG)
+	assert response.status_code == HTTPStatus.OK, "Статус ответа не 200."
+	summary = response.json()
+	assert summary["rows"] == 4, "Кол-во строк файла не соответствует ожидаемому."
+	assert [summary[name]["inserted"] for name in ("menu", "submenu", "dish")] == [2, 2, 3], \
+		"Кол-во добавленных строк не соответствует ожидаемому."
+	assert await get_catalog(ac) == {
+		"Breakfast": (2, 3, {"Pancakes": (2, {"Classic": "5.00", "Berry": "6.50"}), "Eggs": (1, {"Omelette": "4.00"})}),
+		"Dinner": (0, 0, {}),
+	}, "Каталог после импорта не соответствует файлу."
+
+	response = await import_csv(ac, CATALOG)
+	unchanged = {"inserted": 0, "updated": 0, "deleted": 0}
+	assert [response.json()[name] for name in ("menu", "submenu", "dish")] == [unchanged] * 3, \
+		"Повторный импорт того же файла изменил каталог."
+
+	changed = [CATALOG[0][:6] + ("5.50",), CATALOG[2], ("Dinner", "evening", "Soups", "", "Borsch", "", "7")]
+	summary = (await import_csv(ac, changed)).json()
+	assert summary["dish"] == {"inserted": 1, "updated": 1, "deleted": 1}, "Изменения dish не соответствуют ожидаемым."
+	assert summary["submenu"] == {"inserted": 1, "updated": 0, "deleted": 0}, \
+		"Изменения submenu не соответствуют ожидаемым."
+	assert await get_catalog(ac) == {
+		"Breakfast": (2, 2, {"Pancakes": (1, {"Classic": "5.50"}), "Eggs": (1, {"Omelette": "4.00"})}),
+		"Dinner": (1, 1, {"Soups": (1, {"Borsch": "7.00"})}),
+	}, "Каталог после импорта изменений не соответствует файлу."
+
+	for rows in ([], [("", "", "", "", "", "", "")]):
+		response = await import_csv(ac, rows)
+		assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY, "Файл без строк принят без allow_empty."
+	assert len(await get_catalog(ac)) == 2, "Каталог изменён файлом без строк."
+	summary = (await import_csv(ac, [], allow_empty=True)).json()
+	assert summary["menu"]["deleted"] == 2 and summary["dish"]["deleted"] == 3, "Пустой файл не очистил каталог."
+	assert (await ac.get('/api/v1/menus')).json() == [], "Каталог не пуст после импорта пустого файла."
+
+
+async def test_import_xlsx(ac: AsyncClient):
+	"""Проверка импорта из XLSX с произвольным порядком колонок и числовыми ячейками."""
+	workbook = Workbook()
+	columns = list(reversed(IMPORT_COLUMNS))
+	workbook.active.append(columns)
+	for row in CATALOG[:3]:
+		values = dict(zip(IMPORT_COLUMNS, row), dish_price=float(row[-1]))
+		workbook.active.append([values[column] for column in columns])
+	buffer = io.BytesIO()
+	workbook.save(buffer)
+
+	response = await ac.post('/api/v1/import', content=buffer.getvalue(), headers={"Content-Type": XLSX})
+	assert response.status_code == HTTPStatus.OK, "Статус ответа не 200."
+	assert (await get_catalog(ac))["Breakfast"][2]["Pancakes"] == (2, {"Classic": "5.00", "Berry": "6.50"}), \
+		"Каталог после импорта XLSX не соответствует файлу."
+	await import_csv(ac, [], allow_empty=True)
+
+
+async def test_import_errors(ac: AsyncClient):
+	"""Проверка отказа в импорте некорректного файла без изменения каталога."""
+	await import_csv(ac, CATALOG)
+	rows = [*CATALOG, ("Breakfast", "", "Pancakes", "", "Classic", "", "1"), ("Lunch", "", "", "", "Soup", "", "1"),
+			("Lunch", "", "Soups", "", "Soup", "", "free")]
+	response = await import_csv(ac, rows)
+	assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY, "Некорректный файл принят."
+	assert [error["line"] for error in response.json()["detail"]] == [6, 7, 8], \
+		"Номера строк с ошибками не соответствуют ожидаемым."
+	assert len(await get_catalog(ac)) == 2, "Каталог изменён некорректным файлом."
+
+	response = await ac.post('/api/v1/import', content=b'title\nx', headers={"Content-Type": "text/csv"})
+	assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY, "Файл без нужных колонок принят."
+	for content, line in ((to_csv(CATALOG) + b'Lunch,\xff\n', 6), (to_csv(CATALOG).replace(b'Dinner', b'x' * 200_000), 5)):
+		response = await ac.post('/api/v1/import', content=content, headers={"Content-Type": "text/csv"})
+		assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY, "Нечитаемый файл принят."
+		assert [error["line"] for error in response.json()["detail"]] == [line], \
+			"Номер строки, на которой остановилось чтение файла, не соответствует ожидаемому."
+	response = await ac.post('/api/v1/import', content=to_csv(CATALOG), headers={"Content-Type": "application/json"})
+	assert response.status_code == HTTPStatus.UNSUPPORTED_MEDIA_TYPE, "Файл неизвестного формата принят."
+	await import_csv(ac, [], allow_empty=True)
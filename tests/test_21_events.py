@@ -0,0 +1,87 @@
+import asyncio
+
+import orjson
+import pytest_asyncio
+from httpx import AsyncClient
+
+from conftest import engine_test
+from data_for_tests.data_dish import data_for_create_dish, data_for_create_some_dish, data_for_update_dish
+from data_for_tests.data_menu import data_for_create_menu
+from data_for_tests.data_submenu import data_for_create_submenu
+from src.events import services as events_services
+from src.events.services import EVENTS_CHANNEL, EventBroadcaster, event_stream
+
+
+@pytest_asyncio.fixture
+async def broadcaster():
+	"""Фикстура рассылки событий, которая слушает тестовую БД."""
+	broadcaster = EventBroadcaster(engine_test.url)
+	yield broadcaster
+	await broadcaster.close()
+
+
+async def next_event(queue: asyncio.Queue) -> dict:
+	"""Функция, которая возвращает payload следующего события подписчика."""
+	event = await asyncio.wait_for(queue.get(), 5)
+	return orjson.loads(event.message.split(b'data: ', 1)[1])
+
+
+async def test_write_notifications(ac: AsyncClient, broadcaster: EventBroadcaster):
+	"""Проверка событий о записи menu, submenu и dish с id родителей."""
+	queue = await broadcaster.subscribe()
+	menu_id = (await ac.post('/api/v1/menus', json=data_for_create_menu)).json()["id"]
+	assert await next_event(queue) == {"action": "create", "type": "menu", "id": menu_id, "menu_id": menu_id}, \
+		"Событие создания menu не соответствует ожидаемому."
+
+	submenu_id = (await ac.post(f"/api/v1/menus/{menu_id}/submenus", json=data_for_create_submenu)).json()["id"]
+	assert await next_event(queue) == {"action": "create", "type": "submenu", "id": submenu_id, "menu_id": menu_id}, \
+		"Событие создания submenu не соответствует ожидаемому."
+
+	dishes_url = f"/api/v1/menus/{menu_id}/submenus/{submenu_id}/dishes"
+	dish_id = (await ac.post(dishes_url, json=data_for_create_dish)).json()["id"]
+	parents = {"submenu_id": submenu_id, "menu_id": menu_id}
+	assert await next_event(queue) == {"action": "create", "type": "dish", "id": dish_id, **parents}, \
+		"Событие создания dish не соответствует ожидаемому."
+	await ac.patch(f"{dishes_url}/{dish_id}", json=data_for_update_dish)
+	assert await next_event(queue) == {"action": "update", "type": "dish", "id": dish_id, **parents}, \
+		"Событие изменения dish не соответствует ожидаемому."
+	await ac.post(f"{dishes_url}/bulk", json=data_for_create_some_dish)
+	assert await next_event(queue) == {"action": "create", "type": "dish", "count": 2, **parents}, \
+		"Событие создания пачки dish не соответствует ожидаемому."
+	await ac.delete(f"{dishes_url}/{dish_id}")
+	assert await next_event(queue) == {"action": "delete", "type": "dish", "id": dish_id, **parents}, \
+		"Событие удаления dish не соответствует ожидаемому."
+
+	await ac.delete(f"/api/v1/menus/{menu_id}")
+	assert await next_event(queue) == {"action": "delete", "type": "menu", "id": menu_id, "menu_id": menu_id}, \
+		"Событие удаления menu не соответствует ожидаемому."
+	assert queue.empty(), "Лишние события."
+
+
+async def test_failed_write_is_not_notified(ac: AsyncClient, broadcaster: EventBroadcaster):
+	"""Проверка, что неудавшаяся запись (откат транзакции) не отправляет событий."""
+	queue = await broadcaster.subscribe()
+	await ac.patch('/api/v1/menus/00000000-0000-4000-8000-000000000000', json={"title": "missing"})
+	menu_id = (await ac.post('/api/v1/menus', json=data_for_create_menu)).json()["id"]
+	assert (await next_event(queue))["id"] == menu_id, "Событие отправлено для несуществующего menu."
+	await ac.delete(f"/api/v1/menus/{menu_id}")
+
+
+async def test_event_stream(broadcaster: EventBroadcaster, monkeypatch):
+	"""Проверка формата Server-Sent Events, фильтра по menu, keepalive и отключения медленного подписчика."""
+	monkeypatch.setattr(events_services, "EVENTS_KEEPALIVE_SECONDS", 0.01)
+	monkeypatch.setattr(events_services, "EVENTS_QUEUE_SIZE", 2)
+	queue = await broadcaster.subscribe()
+	stream = event_stream(broadcaster, queue, menu_id="a")
+	assert (await stream.__anext__()).startswith(b'retry: '), "Поток не начинается с паузы переподключения."
+	assert await stream.__anext__() == b': keepalive\n\n', "Нет keepalive без событий."
+
+	for payload in ('{"type": "menu", "menu_id": "b"}', '{"type": "dish", "menu_id": "a"}'):
+		broadcaster._on_notification(None, 0, EVENTS_CHANNEL, payload)
+	assert await stream.__anext__() == b'event: dish\ndata: {"type": "dish", "menu_id": "a"}\n\n', \
+		"Событие другого menu не отфильтровано."
+
+	for payload in ('{"type": "menu"}', '{"type": "menu"}', '{"type": "menu"}'):
+		broadcaster._on_notification(None, 0, EVENTS_CHANNEL, payload)
+	assert queue not in broadcaster.subscribers, "Медленный подписчик не отключён."
+	assert [chunk async for chunk in stream] == [], "Поток медленного подписчика не закрыт."
@@ -0,0 +1,119 @@
+import asyncio
+import uuid
+from http import HTTPStatus
+from typing import AsyncGenerator
+
+import pytest_asyncio
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy import text
+
+from conftest import async_session_maker_test, engine_test, override_get_async_session
+from data_for_tests.data_dish import data_for_create_dish, data_for_update_dish
+from data_for_tests.data_menu import data_for_create_menu
+from data_for_tests.data_submenu import data_for_create_submenu
+from src import main
+from src.cache import bus as bus_module
+from src.cache.backends import MemoryCache
+from src.cache.keys import ETAG_FIELD, dish_key, dishes_key, event_keys, menu_key, menus_key, submenu_key, \
+	submenus_key
+from src.database import get_async_session, get_read_session
+from src.events.services import EventBroadcaster
+
+
+class Worker:
+	"""Воркер приложения: create_app() со своим кэшем в памяти, запущенный так же, как при старте сервера."""
+
+	def __init__(self):
+		self.cache = MemoryCache()
+		self.app: FastAPI = main.create_app(catalog_in_memory=False, cache_backend=self.cache)
+		self.app.dependency_overrides[get_async_session] = override_get_async_session
+		self.app.dependency_overrides[get_read_session] = override_get_async_session
+		self.client = AsyncClient(app=self.app, base_url='http://localhost:8000')
+
+	async def get(self, url: str):
+		return await self.client.get(url)
+
+	async def wait_evicted(self, key: str) -> None:
+		"""Функция, которая ждёт, пока ключ пропадёт из кэша воркера (событие записи приходит асинхронно)."""
+		for _ in range(50):
+			if await self.cache.get(key, ETAG_FIELD) is None and await self.cache.get(key) is None:
+				return
+			await asyncio.sleep(0.1)
+		raise AssertionError(f"Ключ {key} не удалён из кэша воркера.")
+
+
+@pytest_asyncio.fixture
+async def workers(monkeypatch) -> AsyncGenerator[tuple[Worker, Worker], None]:
+	"""Фикстура двух воркеров с общей тестовой БД и собственными кэшами."""
+	monkeypatch.setattr(main, "broadcaster", EventBroadcaster(engine_test.url))
+	pair = Worker(), Worker()
+	for worker in pair:
+		await worker.app.router.startup()
+	yield pair
+	for worker in pair:
+		await worker.client.aclose()
+		await worker.app.router.shutdown()
+
+
+def test_event_keys():
+	"""Проверка ключей, устаревших после события записи, и сброса всего кэша при каскадном удалении и импорте."""
+	menu_id, submenu_id, dish_id = (str(uuid.uuid4()) for _ in range(3))
+	assert event_keys({"action": "update", "type": "menu", "id": menu_id, "menu_id": menu_id}) == \
+		[menus_key(), menu_key(menu_id)], "Ключи после изменения menu не соответствуют."
+	assert event_keys({"action": "update", "type": "dish", "id": dish_id, "submenu_id": submenu_id,
+					   "menu_id": menu_id}) == [dish_key(dish_id), dishes_key(submenu_id)], \
+		"Ключи после изменения dish не соответствуют."
+	assert set(event_keys({"action": "create", "type": "dish", "count": 2, "submenu_id": submenu_id,
+						   "menu_id": menu_id})) == {menus_key(), menu_key(menu_id), submenus_key(menu_id),
+													 submenu_key(submenu_id), dishes_key(submenu_id)}, \
+		"Ключи после создания пачки dish не соответствуют."
+	assert event_keys({"action": "delete", "type": "submenu", "id": submenu_id, "menu_id": menu_id}) is None, \
+		"Удаление submenu не сбрасывает кэш с его dish."
+	assert event_keys({"action": "import", "type": "catalog"}) is None, "Импорт не сбрасывает весь кэш."
+
+
+async def test_write_invalidates_other_worker(workers):
+	"""Проверка, что запись через один воркер удаляет устаревшие ключи из кэша другого."""
+	writer, reader = workers
+	menu_id = (await writer.client.post('/api/v1/menus', json=data_for_create_menu)).json()["id"]
+	submenu_id = (await writer.client.post(f'/api/v1/menus/{menu_id}/submenus', json=data_for_create_submenu)).json()["id"]
+	dishes_url = f'/api/v1/menus/{menu_id}/submenus/{submenu_id}/dishes'
+	dish_id = (await writer.client.post(dishes_url, json=data_for_create_dish)).json()["id"]
+
+	for url in (f'/api/v1/menus/{menu_id}', dishes_url, f'{dishes_url}/{dish_id}'):
+		assert (await reader.get(url)).status_code == HTTPStatus.OK, "Статус ответа не 200."
+	assert await reader.cache.get(dish_key(dish_id), ETAG_FIELD) is not None, "dish не попал в кэш читающего воркера."
+
+	await writer.client.patch(f'{dishes_url}/{dish_id}', json=data_for_update_dish)
+	await reader.wait_evicted(dish_key(dish_id))
+	await reader.wait_evicted(dishes_key(submenu_id))
+	response = await reader.get(f'{dishes_url}/{dish_id}')
+	assert response.json()["title"] == data_for_update_dish["title"], "Другой воркер отдаёт dish из устаревшего кэша."
+
+	await writer.client.delete(f'/api/v1/menus/{menu_id}')
+	await reader.wait_evicted(dish_key(dish_id))
+	assert (await reader.get(f'{dishes_url}/{dish_id}')).status_code == HTTPStatus.NOT_FOUND, \
+		"Другой воркер отдаёт каскадно удалённый dish."
+
+
+async def test_resubscribe_clears_cache(workers, monkeypatch):
+	"""Проверка, что после потери соединения с LISTEN воркер сбрасывает кэш и снова получает события."""
+	monkeypatch.setattr(bus_module, "CACHE_BUS_RECONNECT_SECONDS", 0.01)
+	writer, reader = workers
+	await reader.cache.set(menus_key(), b'stale', 60)
+	async with async_session_maker_test() as session:
+		await session.execute(text('SELECT pg_terminate_backend(:pid)'),
+							  {'pid': main.broadcaster._connection.get_server_pid()})
+	await reader.wait_evicted(menus_key())
+	for _ in range(50):
+		if reader.app.state.invalidation_bus.connected:
+			break
+		await asyncio.sleep(0.1)
+	assert reader.app.state.invalidation_bus.connected, "Воркер не подписался на события снова."
+
+	await reader.get('/api/v1/menus')
+	assert await reader.cache.get(menus_key(), ETAG_FIELD) is not None, "Список menu не попал в кэш."
+	menu_id = (await writer.client.post('/api/v1/menus', json=data_for_create_menu)).json()["id"]
+	await reader.wait_evicted(menus_key())
+	await writer.client.delete(f'/api/v1/menus/{menu_id}')
@@ -0,0 +1,135 @@
+import asyncio
+from http import HTTPStatus
+
+import pytest
+from fastapi import HTTPException
+from httpx import AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from conftest import engine_test
+from data_for_tests.data_menu import data_for_create_menu
+from src.cache import services as cache_services
+from src.cache.backends import MemoryCache
+from src.cache.services import invalidate, read_through
+
+CONCURRENCY = 20
+# Сессия основной БД без соединения: загрузчики тестов к БД не обращаются.
+session = AsyncSession()
+
+
+class Loader:
+	"""Загрузчик значения, который считает вызовы и ждёт разрешения завершиться."""
+
+	def __init__(self, value=b'value', error: Exception = None):
+		self.value = value
+		self.error = error
+		self.calls = 0
+		self.release = asyncio.Event()
+
+	async def __call__(self, session):
+		self.calls += 1
+		await self.release.wait()
+		if self.error is not None:
+			raise self.error
+		return self.value
+
+
+async def load_other(session) -> bytes:
+	"""Загрузчик, результат которого означает, что значения в кэше не было."""
+	return b'other'
+
+
+@pytest.fixture(autouse=True)
+def memory_cache(monkeypatch):
+	"""Фикстура чистого кэша в памяти для каждого теста."""
+	monkeypatch.setattr(cache_services, "cache_backend", MemoryCache())
+
+
+async def start_readers(key: str, loader: Loader, count: int = CONCURRENCY) -> list[asyncio.Task]:
+	"""Функция, которая запускает одновременные чтения ключа и ждёт, пока все они дойдут до загрузки."""
+	tasks = [asyncio.create_task(read_through(key, bytes, loader, session)) for _ in range(count)]
+	await asyncio.sleep(0.01)
+	return tasks
+
+
+async def test_concurrent_misses_share_one_load():
+	"""Проверка, что одновременные промахи по ключу выполняют одну загрузку и получают её результат."""
+	loader = Loader()
+	tasks = await start_readers('single-flight', loader)
+	loader.release.set()
+	assert await asyncio.gather(*tasks) == [b'value'] * CONCURRENCY, "Результат загрузки не передан ожидающим."
+	assert loader.calls == 1, "Одновременные промахи выполнили несколько загрузок."
+	assert await read_through('single-flight', bytes, load_other, session) == b'value', "Значение не записано в кэш."
+
+
+async def test_error_is_shared_and_not_cached():
+	"""Проверка, что ошибка загрузки передаётся всем ожидающим и не кэшируется."""
+	loader = Loader(error=HTTPException(status_code=404, detail="menu not found"))
+	tasks = await start_readers('single-flight', loader)
+	loader.release.set()
+	results = await asyncio.gather(*tasks, return_exceptions=True)
+	assert all(isinstance(result, HTTPException) and result.status_code == 404 for result in results), \
+		"Ошибка загрузки не передана ожидающим."
+	assert loader.calls == 1, "Ожидающие повторили загрузку после ошибки."
+
+	retry = Loader()
+	retry.release.set()
+	assert await read_through('single-flight', bytes, retry, session) == b'value', "После ошибки загрузка не повторяется."
+
+
+async def test_wait_is_bounded(monkeypatch):
+	"""Проверка, что ожидающий загружает значение сам, если общая загрузка дольше SINGLE_FLIGHT_TIMEOUT."""
+	monkeypatch.setattr(cache_services, "SINGLE_FLIGHT_TIMEOUT", 0.01)
+	slow = Loader(b'slow')
+	leader = (await start_readers('single-flight', slow, 1))[0]
+	fast = Loader(b'fast')
+	fast.release.set()
+	assert await read_through('single-flight', bytes, fast, session) == b'fast', "Ожидание общей загрузки не ограничено."
+	slow.release.set()
+	assert await leader == b'slow', "Первый запрос не получил свой результат."
+
+
+async def test_cancelled_leader():
+	"""Проверка, что при отмене первого запроса ожидающие загружают значение сами."""
+	abandoned = Loader()
+	leader = (await start_readers('single-flight', abandoned, 1))[0]
+	loader = Loader(b'own')
+	waiter = asyncio.create_task(read_through('single-flight', bytes, loader, session))
+	await asyncio.sleep(0.01)
+	leader.cancel()
+	loader.release.set()
+	assert await waiter == b'own', "Ожидающий не загрузил значение после отмены первого запроса."
+
+
+async def test_invalidation_during_load():
+	"""Проверка, что загрузка, начатая до записи, не попадает в кэш и не передаётся новым запросам."""
+	stale = Loader(b'stale')
+	tasks = await start_readers('single-flight', stale, 2)
+	await invalidate('single-flight')
+	fresh = Loader(b'fresh')
+	fresh.release.set()
+	assert await read_through('single-flight', bytes, fresh, session) == b'fresh', "Новый запрос получил загрузку до записи."
+	stale.release.set()
+	assert await asyncio.gather(*tasks) == [b'stale'] * 2, "Загрузка до записи не передана её ожидающим."
+	assert await read_through('single-flight', bytes, load_other, session) == b'fresh', \
+		"Загрузка до записи попала в кэш."
+
+
+async def test_concurrent_requests_run_one_query(ac: AsyncClient):
+	"""Проверка, что одновременные GET одного menu выполняют запросы к БД один раз."""
+	response = await ac.post('/api/v1/menus', json=data_for_create_menu)
+	menu_id = response.json()["id"]
+	await cache_services.cache_backend.clear()
+
+	statements = []
+	listener = lambda *args: statements.append(args[2])  # noqa: E731
+	event.listen(engine_test.sync_engine, 'before_cursor_execute', listener)
+	try:
+		responses = await asyncio.gather(*(ac.get(f'/api/v1/menus/{menu_id}') for _ in range(CONCURRENCY)))
+	finally:
+		event.remove(engine_test.sync_engine, 'before_cursor_execute', listener)
+	assert all(response.status_code == HTTPStatus.OK for response in responses), "Статус ответа не 200."
+	# ETag menu и само menu.
+	assert len(statements) == 2, f"{CONCURRENCY} одновременных запросов выполнили {len(statements)} выражений."
+	await ac.delete(f'/api/v1/menus/{menu_id}')
@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import update
+
+from conftest import async_session_maker_test
+from data_for_tests.data_menu import data_for_create_menu
+from src.cache import services as cache_services
+from src.cache.backends import MemoryCache
+from src.cache.services import read_through
+from src.config import CACHE_SOFT_TTL, CACHE_TTL
+from src.menu.models import menu as menu_tbl
+
+
+class FakeClock:
+	"""Поддельные часы: время меняется только явно."""
+
+	def __init__(self):
+		self.now = 1000.0
+
+	def __call__(self) -> float:
+		return self.now
+
+
+class Loader:
+	"""Загрузчик, который возвращает номер вызова и может «выполняться» заданное кол-во секунд по поддельным часам."""
+
+	def __init__(self, clock: FakeClock, duration: float = 0):
+		self.clock = clock
+		self.duration = duration
+		self.calls = 0
+
+	async def __call__(self, session) -> bytes:
+		self.calls += 1
+		self.clock.now += self.duration
+		return str(self.calls).encode()
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+	"""Фикстура поддельных часов для мягкого TTL и кэша в памяти, без досрочного обновления."""
+	fake = FakeClock()
+	monkeypatch.setattr(cache_services, "clock", fake)
+	monkeypatch.setattr(cache_services, "cache_backend", MemoryCache(clock=fake))
+	monkeypatch.setattr(cache_services, "CACHE_EARLY_REFRESH_BETA", 0)
+	return fake
+
+
+async def wait_refreshes():
+	"""Функция, которая ждёт завершения фоновых обновлений кэша."""
+	await asyncio.gather(*cache_services._refreshes)
+
+
+async def test_soft_and_hard_ttl(clock: FakeClock):
+	"""Проверка: до мягкого TTL - значение из кэша, после - устаревшее с фоновым обновлением, после жёсткого - загрузка."""
+	loader = Loader(clock)
+	session = async_session_maker_test()
+	created_at = clock.now
+	assert await read_through('swr', bytes, loader, session) == b'1', "Значение не загружено при промахе."
+
+	clock.now += CACHE_SOFT_TTL - 1
+	assert await read_through('swr', bytes, loader, session) == b'1', "Свежее значение загружено повторно."
+	assert loader.calls == 1, "Свежее значение загружено повторно."
+
+	clock.now += 2
+	stale = await asyncio.gather(*(read_through('swr', bytes, loader, session) for _ in range(10)))
+	assert stale == [b'1'] * 10, "Устаревшее значение не отдано сразу."
+	await wait_refreshes()
+	assert loader.calls == 2, "Устаревшее значение обновлено не одной фоновой задачей."
+	assert await read_through('swr', bytes, loader, session) == b'2', "Фоновое обновление не записано в кэш."
+
+	clock.now = created_at + CACHE_TTL + 1
+	assert await read_through('swr', bytes, loader, session) == b'2', \
+		"Обновлённое значение удалено по жёсткому TTL исходной записи."
+	await wait_refreshes()
+	assert loader.calls == 3, "Устаревшее значение не обновлено в фоне."
+
+	clock.now += CACHE_TTL
+	assert await read_through('swr', bytes, loader, session) == b'4', "Значение после жёсткого TTL не загружено."
+	assert not cache_services._refreshes, "После жёсткого TTL запущено фоновое обновление."
+
+
+@pytest.mark.parametrize("uniform, refreshed", [(0.1, False), (0.9, True)])
+async def test_early_refresh_jitter(clock: FakeClock, monkeypatch, uniform, refreshed):
+	"""Проверка досрочного обновления: вероятность растёт с длительностью загрузки и близостью мягкого TTL."""
+	monkeypatch.setattr(cache_services, "CACHE_EARLY_REFRESH_BETA", 1)
+	monkeypatch.setattr(cache_services.random, "random", lambda: uniform)
+	loader = Loader(clock, duration=2)
+	session = async_session_maker_test()
+	await read_through('swr', bytes, loader, session)
+
+	# До мягкого TTL 1 секунда; сдвиг -2 * ln(1 - uniform): 0.21 с при 0.1 и 4.6 с при 0.9.
+	clock.now += CACHE_SOFT_TTL - 1
+	assert await read_through('swr', bytes, loader, session) == b'1', "Не отдано значение из кэша."
+	await wait_refreshes()
+	assert (loader.calls == 2) is refreshed, "Досрочное обновление не соответствует ожидаемому."
+
+
+async def test_stale_menu_is_refreshed(ac: AsyncClient, clock: FakeClock):
+	"""Проверка stale-while-revalidate через API: изменение в БД мимо сервиса видно после фонового обновления."""
+	menu_id = (await ac.post('/api/v1/menus', json=data_for_create_menu)).json()["id"]
+	assert (await ac.get(f'/api/v1/menus/{menu_id}')).json()["title"] == data_for_create_menu["title"], \
+		"Menu не соответствует созданному."
+	async with async_session_maker_test() as session:
+		await session.execute(update(menu_tbl).where(menu_tbl.c.id == menu_id).values(title='changed'))
+		await session.commit()
+
+	clock.now += CACHE_SOFT_TTL - 1
+	assert (await ac.get(f'/api/v1/menus/{menu_id}')).json()["title"] == data_for_create_menu["title"], \
+		"Свежее значение не взято из кэша."
+	clock.now += 2
+	assert (await ac.get(f'/api/v1/menus/{menu_id}')).json()["title"] == data_for_create_menu["title"], \
+		"Устаревшее значение не отдано сразу."
+	await wait_refreshes()
+	assert (await ac.get(f'/api/v1/menus/{menu_id}')).json()["title"] == 'changed', \
+		"Устаревшее значение не обновлено в фоне."
+	await ac.delete(f'/api/v1/menus/{menu_id}')
@@ -0,0 +1,109 @@
+import gzip
+from http import HTTPStatus
+from typing import Optional
+
+from httpx import AsyncClient
+from starlette.requests import Request
+
+from data_for_tests.data_dish import data_for_update_dish
+from data_for_tests.data_menu import data_for_create_menu
+from data_for_tests.data_submenu import data_for_create_submenu
+from src import rendering
+from src.cache.backends import MemoryCache
+from src.config import GZIP_MIN_SIZE
+from src.etag import is_not_modified, not_modified
+from src.rendering import accepts_gzip, versioned_json_response
+
+BODY = b'[' + b','.join(b'{"title": "dish %d"}' % number for number in range(GZIP_MIN_SIZE)) + b']'
+
+
+def make_request(accept_encoding: str = 'gzip, deflate', if_none_match: Optional[str] = None) -> Request:
+	"""Функция, которая создаёт запрос GET к списку dish с заданными Accept-Encoding и If-None-Match."""
+	headers = [(b'accept-encoding', accept_encoding.encode())]
+	if if_none_match is not None:
+		headers.append((b'if-none-match', if_none_match.encode()))
+	return Request({'type': 'http', 'method': 'GET', 'path': '/api/v1/dishes', 'query_string': b'limit=100',
+					'headers': headers})
+
+
+async def test_memory_cache_evicts_by_size():
+	"""Проверка на вытеснение самых давно использованных ключей при превышении суммарного размера."""
+	cache = MemoryCache(max_size=100, max_bytes=10)
+	await cache.set('a', b'1234', 60)
+	await cache.set('b', b'1234', 60)
+	await cache.get('a')
+	await cache.set('c', b'1234', 60)
+	assert await cache.get('b') is None, "Ключ 'b' не был вытеснен."
+	assert await cache.get('a') == b'1234' and await cache.get('c') == b'1234', "Вытеснен недавно использованный ключ."
+	await cache.set('a', b'12', 60)
+	assert cache.size == 6, "Размер кэша не учитывает замену значения."
+	await cache.set('d', b'12345678901', 60)
+	assert await cache.get('d') is None and cache.size == 6, "Значение больше лимита осталось в кэше."
+
+
+async def test_versioned_response_is_compressed_once(monkeypatch):
+	"""Проверка, что тело сжимается один раз для версии и заново - после её изменения."""
+	monkeypatch.setattr(rendering, "gzip_cache", MemoryCache())
+	response = await versioned_json_response(make_request(), BODY, '"1"')
+	assert response.headers['content-encoding'] == 'gzip', "Тело не сжато."
+	assert response.headers['vary'] == 'Accept-Encoding', "Нет заголовка Vary."
+	assert response.headers['etag'] == '"1-gzip"', "ETag сжатого тела не отличается от ETag исходного."
+	assert gzip.decompress(response.body) == BODY, "Сжатое тело не соответствует исходному."
+
+	calls = []
+	monkeypatch.setattr(rendering.gzip, "compress", lambda *args, **kwargs: calls.append(args) or b'compressed')
+	repeated = await versioned_json_response(make_request(), BODY, '"1"')
+	assert repeated.body == response.body and not calls, "Тело той же версии сжато повторно."
+	changed = await versioned_json_response(make_request(), BODY, '"2"')
+	assert changed.body == b'compressed' and len(calls) == 1, "Тело новой версии не сжато."
+
+
+async def test_versioned_response_without_gzip():
+	"""Проверка, что тело не сжимается без gzip в Accept-Encoding и для маленьких тел."""
+	response = await versioned_json_response(make_request('identity'), BODY, '"1"')
+	assert 'content-encoding' not in response.headers and response.body == BODY, "Тело сжато без gzip у клиента."
+	assert response.headers['etag'] == '"1"', "ETag не соответствует версии."
+	response = await versioned_json_response(make_request('gzip;q=0, identity'), BODY, '"1"')
+	assert 'content-encoding' not in response.headers, "Тело сжато, хотя клиент отказался от gzip."
+	response = await versioned_json_response(make_request(), b'[]', '"1"')
+	assert 'content-encoding' not in response.headers and response.body == b'[]', "Маленькое тело сжато."
+
+
+def test_accepts_gzip():
+	"""Проверка разбора Accept-Encoding с весами."""
+	assert accepts_gzip('gzip') and accepts_gzip('deflate, GZIP;q=0.5') and accepts_gzip('*'), \
+		"gzip не принят, хотя клиент его принимает."
+	assert not accepts_gzip('') and not accepts_gzip('identity') and not accepts_gzip('gzip;q=0') \
+		and not accepts_gzip('*, gzip;q=0.0') and not accepts_gzip('gzipped'), "gzip принят, хотя клиент от него отказался."
+
+
+def test_not_modified_variants():
+	"""Проверка 304 для исходного и сжатого представлений одной версии."""
+	assert is_not_modified(make_request(if_none_match='"1-gzip"'), '"1"'), "ETag сжатого тела не принят."
+	assert not is_not_modified(make_request(if_none_match='"2-gzip"'), '"1"'), "ETag другой версии принят."
+	response = not_modified(make_request(if_none_match='W/"1-gzip"'), '"1"')
+	assert response.headers['etag'] == '"1-gzip"', "ETag ответа 304 не соответствует представлению клиента."
+	assert response.headers['vary'] == 'Accept-Encoding', "Нет заголовка Vary в ответе 304."
+	assert not_modified(make_request(if_none_match='*'), '"1"').headers['etag'] == '"1"', \
+		"ETag ответа 304 не соответствует версии."
+
+
+async def test_dishes_are_compressed(ac: AsyncClient):
+	"""Проверка сжатого списка dish через API и его обновления после записи."""
+	menu_id = (await ac.post('/api/v1/menus', json=data_for_create_menu)).json()["id"]
+	submenu_id = (await ac.post(f'/api/v1/menus/{menu_id}/submenus', json=data_for_create_submenu)).json()["id"]
+	url = f'/api/v1/menus/{menu_id}/submenus/{submenu_id}/dishes'
+	dishes = [{"title": f"dish {number}", "description": "description " * 10, "price": "10.00"} for number in range(50)]
+	await ac.post(f'{url}/bulk', json=dishes)
+
+	response = await ac.get(url, headers={'Accept-Encoding': 'gzip'})
+	assert response.status_code == HTTPStatus.OK, "Статус ответа не 200."
+	assert response.headers['content-encoding'] == 'gzip', "Список dish не сжат."
+	assert len(response.json()) == 50, "Кол-во dish не соответствует ожидаемому."
+
+	dish_id = response.json()[0]["id"]
+	await ac.patch(f'{url}/{dish_id}', json=data_for_update_dish)
+	response = await ac.get(url, headers={'Accept-Encoding': 'gzip'})
+	titles = {dish["title"] for dish in response.json()}
+	assert data_for_update_dish["title"] in titles, "После записи отдано сжатое тело прежней версии."
+	await ac.delete(f'/api/v1/menus/{menu_id}')
@@ -0,0 +1,142 @@
+import asyncio
+import uuid
+from decimal import Decimal
+from typing import AsyncGenerator
+
+import orjson
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+from httpx import AsyncClient
+
+from conftest import async_session_maker_test, engine_test, override_get_async_session
+from data_for_tests.data_dish import data_for_create_dish, data_for_create_some_dish, data_for_update_dish
+from data_for_tests.data_menu import data_for_create_menu, data_for_update_menu
+from data_for_tests.data_submenu import data_for_create_submenu
+from src.catalog.services import CatalogIndex, CatalogReplica, DishRecord, MenuRecord, SubmenuRecord, \
+	get_catalog_replica
+from src.database import get_async_session, get_read_session
+from src.dish.schemas import DishFilters
+from src.events.services import EventBroadcaster
+from src.main import create_app
+from src.pagination import PageParams
+
+MENU_ID, SUBMENU_ID = uuid.UUID(int=1), uuid.UUID(int=2)
+DISH_IDS = [uuid.UUID(int=number) for number in (10, 11, 12)]
+
+
+def build_index() -> CatalogIndex:
+	"""Функция, которая строит индексы из menu с одним submenu и тремя dish (цены по убыванию id)."""
+	return CatalogIndex.build(
+		[MenuRecord(MENU_ID, 'menu', 'menu description', 3)],
+		[SubmenuRecord(SUBMENU_ID, 'submenu', None, 4, MENU_ID)],
+		[DishRecord(dish_id, f'dish {number}', '', Decimal(price), version, SUBMENU_ID)
+		 for number, (dish_id, price, version) in enumerate(zip(DISH_IDS, ('3.00', '2.00', '1.50'), (5, 6, 7)))],
+	)
+
+
+def test_index_objects_and_etags():
+	"""Проверка объектов, счётчиков и ETag из индексов: те же поля и правила, что и в ответах из БД."""
+	index = build_index()
+	assert orjson.loads(index.menu(MENU_ID)) == {
+		"id": str(MENU_ID), "title": "menu", "description": "menu description", "submenus_count": 1, "dishes_count": 3
+	}, "menu из реплики не соответствует ожидаемому."
+	assert orjson.loads(index.submenu(SUBMENU_ID))["dishes_count"] == 3, "Кол-во dish в submenu не соответствует."
+	assert orjson.loads(index.dish(DISH_IDS[2]))["price"] == "1.50", "Цена dish отдаётся не строкой."
+	assert index.menu_etag(MENU_ID) == '"3"', "ETag menu не соответствует версии строки."
+	assert index.dishes_etag(SUBMENU_ID) == '"3-7"', "ETag списка dish не соответствует кол-ву и версии."
+	assert index.submenus_etag(uuid.uuid4()) == '"0-0"', "ETag пустого списка не соответствует."
+	assert index.dish_etag(uuid.uuid4()) is None, "ETag несуществующего dish не None."
+	with pytest.raises(HTTPException) as error:
+		index.dish(uuid.uuid4())
+	assert error.value.detail == "dish not found", "Нет 404 для несуществующего dish."
+
+
+def test_index_pagination():
+	"""Проверка keyset-пагинации по id и по цене, фильтра по цене и курсоров, совместимых с режимом БД."""
+	index = build_index()
+	filters = DishFilters(min_price=None, max_price=None, sort='id')
+	page = index.dishes_page(SUBMENU_ID, PageParams(limit=2, cursor=None), filters)
+	assert [dish["id"] for dish in orjson.loads(page.body)] == [str(DISH_IDS[0]), str(DISH_IDS[1])], \
+		"Первая страница не соответствует."
+	page = index.dishes_page(SUBMENU_ID, PageParams(limit=2, cursor=page.next_cursor), filters)
+	assert [dish["id"] for dish in orjson.loads(page.body)] == [str(DISH_IDS[2])], "Вторая страница не соответствует."
+	assert page.next_cursor is None, "Курсор после последней страницы."
+
+	filters = DishFilters(min_price=Decimal('1.60'), max_price=None, sort='price')
+	page = index.dishes_page(SUBMENU_ID, PageParams(limit=1, cursor=None), filters)
+	assert orjson.loads(page.body)[0]["price"] == "2.00", "Сортировка или фильтр по цене не соответствуют."
+	page = index.dishes_page(SUBMENU_ID, PageParams(limit=1, cursor=page.next_cursor), filters)
+	assert orjson.loads(page.body)[0]["price"] == "3.00", "Курсор по цене не соответствует."
+	assert page.next_cursor is None, "Курсор после последней страницы."
+
+	with pytest.raises(HTTPException):
+		index.menus_page(PageParams(limit=1, cursor='!'))
+
+
+def test_index_updates():
+	"""Проверка изменения индексов: добавление, замена пачки dish и каскадное удаление."""
+	index = build_index()
+	new_id = uuid.UUID(int=5)
+	index.put_dish(DishRecord(new_id, 'new', '', Decimal('1.00'), 8, SUBMENU_ID))
+	assert index.dish_ids[SUBMENU_ID][0] == new_id, "Новый dish не вставлен по порядку id."
+	index.replace_dishes(SUBMENU_ID, [DishRecord(DISH_IDS[0], 'only', '', Decimal('1.00'), 9, SUBMENU_ID)])
+	assert index.dish_ids[SUBMENU_ID] == [DISH_IDS[0]], "Пачка dish не заменила прежние."
+	index.remove_submenu(SUBMENU_ID)
+	assert not index.dishes and not index.submenu_ids[MENU_ID], "Удаление submenu не удалило его dish."
+	assert orjson.loads(index.menu(MENU_ID))["submenus_count"] == 0, "Счётчик menu не учитывает удаление."
+	index.remove_menu(MENU_ID)
+	assert index.menus_tree() == b'[]', "menu не удалено."
+
+
+@pytest_asyncio.fixture(scope='function')
+async def replica_ac() -> AsyncGenerator[AsyncClient, None]:
+	"""Фикстура клиента приложения в режиме реплики каталога, которая следит за тестовой БД."""
+	replica = CatalogReplica(async_session_maker_test, EventBroadcaster(engine_test.url))
+	await replica.start()
+	app = create_app(catalog_in_memory=True)
+	app.dependency_overrides[get_async_session] = override_get_async_session
+	app.dependency_overrides[get_read_session] = override_get_async_session
+	app.dependency_overrides[get_catalog_replica] = lambda: replica
+	async with AsyncClient(app=app, base_url='http://localhost:8000') as ac:
+		yield ac
+	await replica.close()
+	await replica.broadcaster.close()
+
+
+async def assert_same(ac: AsyncClient, replica_ac: AsyncClient, url: str):
+	"""Функция, которая ждёт, пока реплика применит изменения, и сверяет её ответ с ответом из БД."""
+	expected = await ac.get(url)
+	for _ in range(50):
+		response = await replica_ac.get(url)
+		if response.status_code == expected.status_code and response.json() == expected.json():
+			break
+		await asyncio.sleep(0.1)
+	assert response.status_code == expected.status_code, f"Статус ответа реплики на {url} не соответствует БД."
+	assert response.json() == expected.json(), f"Ответ реплики на {url} не соответствует БД."
+	assert response.headers.get("etag") == expected.headers.get("etag"), f"ETag реплики на {url} не соответствует БД."
+	assert response.headers.get("x-next-cursor") == expected.headers.get("x-next-cursor"), \
+		f"Курсор реплики на {url} не соответствует БД."
+
+
+async def test_replica_follows_writes(ac: AsyncClient, replica_ac: AsyncClient):
+	"""Проверка, что GET-ответы реплики совпадают с ответами из БД после каждой записи."""
+	menu_id = (await replica_ac.post('/api/v1/menus', json=data_for_create_menu)).json()["id"]
+	submenu_id = (await ac.post(f"/api/v1/menus/{menu_id}/submenus", json=data_for_create_submenu)).json()["id"]
+	dishes_url = f"/api/v1/menus/{menu_id}/submenus/{submenu_id}/dishes"
+	dish_id = (await ac.post(dishes_url, json=data_for_create_dish)).json()["id"]
+	await ac.post(f"{dishes_url}/bulk", json=data_for_create_some_dish)
+	await ac.patch(f"{dishes_url}/{dish_id}", json=data_for_update_dish)
+	await ac.patch(f"/api/v1/menus/{menu_id}", json=data_for_update_menu)
+	for url in ('/api/v1/menus', f'/api/v1/menus/{menu_id}', f'/api/v1/menus/{menu_id}/submenus',
+				f'/api/v1/menus/{menu_id}/submenus/{submenu_id}', f'{dishes_url}?limit=2',
+				f'{dishes_url}?sort=price&max_price=13', f'{dishes_url}/{dish_id}', f'/api/v1/menus/{menu_id}/tree',
+				f'/api/v1/dishes:batchGet?ids={dish_id}&ids={uuid.uuid4()}', f'/api/v1/submenus:batchGet?ids={submenu_id}'):
+		await assert_same(ac, replica_ac, url)
+
+	await ac.delete(f"{dishes_url}/{dish_id}")
+	await assert_same(ac, replica_ac, f'{dishes_url}/{dish_id}')
+	await assert_same(ac, replica_ac, f'/api/v1/menus/{menu_id}')
+	await ac.delete(f"/api/v1/menus/{menu_id}")
+	await assert_same(ac, replica_ac, f'/api/v1/menus/{menu_id}/submenus/{submenu_id}')
+	await assert_same(ac, replica_ac, '/api/v1/menus')
@@ -0,0 +1,48 @@
+import uuid
+from http import HTTPStatus
+
+from httpx import AsyncClient
+
+from data_for_tests.data_dish import data_for_create_some_dish
+from data_for_tests.data_menu import data_for_create_menu
+from data_for_tests.data_submenu import data_for_create_submenu
+from src.config import BATCH_GET_MAX_IDS
+
+
+async def test_batch_get_dishes(ac: AsyncClient):
+	"""Проверка получения нескольких dish одним запросом: порядок запроса, повторы и ненайденные id."""
+	menu_id = (await ac.post('/api/v1/menus', json=data_for_create_menu)).json()["id"]
+	submenu_id = (await ac.post(f"/api/v1/menus/{menu_id}/submenus", json=data_for_create_submenu)).json()["id"]
+	dishes = (await ac.post(f"/api/v1/menus/{menu_id}/submenus/{submenu_id}/dishes/bulk",
+							json=data_for_create_some_dish)).json()
+	missing_id = str(uuid.uuid4())
+
+	ids = [dishes[1]["id"], missing_id, dishes[0]["id"], dishes[1]["id"]]
+	response = await ac.get('/api/v1/dishes:batchGet', params={"ids": ids})
+	assert response.status_code == HTTPStatus.OK, "Статус ответа не 200."
+	assert response.json() == [
+		{"id": dishes[1]["id"], "found": True, "dish": dishes[1]},
+		{"id": missing_id, "found": False, "dish": None},
+		{"id": dishes[0]["id"], "found": True, "dish": dishes[0]},
+		{"id": dishes[1]["id"], "found": True, "dish": dishes[1]},
+	], "Ответ batchGet не соответствует порядку запроса или объектам dish."
+
+	response = await ac.get('/api/v1/submenus:batchGet', params={"ids": [missing_id, submenu_id]})
+	assert response.status_code == HTTPStatus.OK, "Статус ответа не 200."
+	submenu = (await ac.get(f"/api/v1/menus/{menu_id}/submenus/{submenu_id}")).json()
+	assert response.json() == [
+		{"id": missing_id, "found": False, "submenu": None},
+		{"id": submenu_id, "found": True, "submenu": submenu},
+	], "Ответ batchGet не соответствует порядку запроса или объекту submenu."
+
+	await ac.delete(f"/api/v1/menus/{menu_id}")
+
+
+async def test_batch_get_limits(ac: AsyncClient):
+	"""Проверка пустого запроса и ограничения кол-ва id."""
+	response = await ac.get('/api/v1/dishes:batchGet')
+	assert response.status_code == HTTPStatus.OK and response.json() == [], "Пустой batchGet не возвращает []."
+	response = await ac.get('/api/v1/dishes:batchGet', params={"ids": [str(uuid.uuid4())] * (BATCH_GET_MAX_IDS + 1)})
+	assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY, "Нет ограничения кол-ва id."
+	response = await ac.get('/api/v1/submenus:batchGet', params={"ids": "not-a-uuid"})
+	assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY, "Некорректный id не отклонён."